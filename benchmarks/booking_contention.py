@@ -0,0 +1,141 @@
+"""Бенчмарк конкурентного бронирования: bookings/sec на одном «горячем» номере и на многих.
+
+Нужна рабочая БД (настройки из .env). Скрипт создаёт временные отель, номера и
+пользователя, гоняет BookingsRepository.add_booking() с N параллельными воркерами
+и удаляет всё за собой.
+
+    uv run python -m benchmarks.booking_contention --workers 32 --bookings 2000 --rooms 50
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+
+from sqlalchemy import delete
+
+from src.database import async_session_maker, engine
+from src.exceptions import AllRoomsAreBookedException
+from src.models.bookings import BookingsOrm
+from src.models.hotels import HotelsOrm
+from src.models.room_inventory import RoomInventoryOrm
+from src.models.rooms import RoomsOrm
+from src.models.users import UsersOrm
+from src.schemas.hotels import HotelAdd
+from src.schemas.rooms import RoomAdd
+from src.schemas.users import UserAdd
+from src.utils.db_manager import DBManager
+
+# Запас единиц номера: в бенчмарке меряем пропускную способность, а не отказы
+_QUANTITY = 1_000_000
+
+
+@dataclass
+class Result:
+    scenario: str
+    booked: int = 0
+    rejected: int = 0
+    elapsed: float = 0.0
+    latencies: list[float] = field(default_factory=list)
+
+    def report(self) -> str:
+        lat = sorted(self.latencies) or [0.0]
+        p95 = lat[min(len(lat) - 1, int(len(lat) * 0.95))]
+        return (
+            f"{self.scenario:<10} booked={self.booked:<6} rejected={self.rejected:<5} "
+            f"{self.booked / self.elapsed:8.1f} bookings/s  "
+            f"p50={statistics.median(lat) * 1000:6.1f}ms  p95={p95 * 1000:6.1f}ms"
+        )
+
+
+async def _setup(rooms: int) -> tuple[int, int, list[int]]:
+    suffix = uuid.uuid4().hex[:8]
+    async with DBManager(session_factory=async_session_maker) as db:
+        user = await db.users.add(UserAdd(email=f"bench-{suffix}@example.com"))
+        hotel = await db.hotels.add(HotelAdd(title=f"Bench {suffix}", city="Bench"))
+        room_ids = []
+        for i in range(rooms):
+            room = await db.rooms.add(
+                RoomAdd(hotel_id=hotel.id, title=f"Room {i}", price=1000, quantity=_QUANTITY)
+            )
+            room_ids.append(room.id)
+        await db.commit()
+    return user.id, hotel.id, room_ids
+
+
+async def _teardown(user_id: int, hotel_id: int, room_ids: list[int]) -> None:
+    async with DBManager(session_factory=async_session_maker) as db:
+        await db.session.execute(delete(BookingsOrm).where(BookingsOrm.room_id.in_(room_ids)))
+        await db.session.execute(
+            delete(RoomInventoryOrm).where(RoomInventoryOrm.room_id.in_(room_ids))
+        )
+        await db.session.execute(delete(RoomsOrm).where(RoomsOrm.id.in_(room_ids)))
+        await db.session.execute(delete(HotelsOrm).where(HotelsOrm.id == hotel_id))
+        await db.session.execute(delete(UsersOrm).where(UsersOrm.id == user_id))
+        await db.commit()
+
+
+async def _run(
+    scenario: str, user_id: int, room_ids: list[int], workers: int, bookings: int, nights: int
+) -> Result:
+    result = Result(scenario)
+    start = date.today() + timedelta(days=30)
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for _ in range(bookings):
+        queue.put_nowait(random.choice(room_ids))
+
+    async def worker() -> None:
+        while not queue.empty():
+            room_id = queue.get_nowait()
+            began = time.perf_counter()
+            async with DBManager(session_factory=async_session_maker) as db:
+                try:
+                    await db.bookings.add_booking(
+                        user_id, room_id, start, start + timedelta(days=nights)
+                    )
+                    await db.commit()
+                    result.booked += 1
+                except AllRoomsAreBookedException:
+                    result.rejected += 1
+            result.latencies.append(time.perf_counter() - began)
+
+    began = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    result.elapsed = time.perf_counter() - began
+    return result
+
+
+async def main(workers: int, bookings: int, rooms: int, nights: int, output: str | None) -> None:
+    user_id, hotel_id, room_ids = await _setup(rooms)
+    try:
+        results = [
+            # Все воркеры бронируют одни и те же ночи одного номера
+            await _run("hot-room", user_id, room_ids[:1], workers, bookings, nights),
+            # Те же даты, но номера выбираются случайно — конфликты редки
+            await _run("spread", user_id, room_ids, workers, bookings, nights),
+        ]
+    finally:
+        await _teardown(user_id, hotel_id, room_ids)
+        await engine.dispose()
+
+    header = f"workers={workers} bookings={bookings} rooms={rooms} nights={nights}"
+    lines = [header, *(r.report() for r in results)]
+    print("\n".join(lines))
+    if output:
+        with open(output, "a", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--bookings", type=int, default=2000)
+    parser.add_argument("--rooms", type=int, default=50)
+    parser.add_argument("--nights", type=int, default=3)
+    parser.add_argument("--output", default=None, help="дописать результат в файл")
+    args = parser.parse_args()
+    asyncio.run(main(args.workers, args.bookings, args.rooms, args.nights, args.output))
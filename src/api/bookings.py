@@ -1,10 +1,20 @@
-from fastapi import APIRouter, Query, Request, Response, status
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query, Request, Response, status
 
 from src.middleware.prometheus import BOOKINGS_CANCELLED, BOOKINGS_CREATED, BOOKINGS_FAILED
 from src.services.bookings import BookingService
 from src.exceptions import (
     AllRoomsAreBookedException,
     AllRoomsAreBookedHTTPException,
+    BookingHoldNotFoundException,
+    BookingHoldNotFoundHTTPException,
+    BookingQueueDisabledException,
+    BookingQueueDisabledHTTPException,
+    BookingTicketNotFoundException,
+    BookingTicketNotFoundHTTPException,
+    InvalidCursorException,
+    InvalidCursorHTTPException,
     InvalidDateRangeException,
     InvalidDateRangeHTTPException,
     RoomNotFoundException,
@@ -12,21 +22,44 @@ from src.exceptions import (
     ObjectNotFoundException,
     ObjectNotFoundHTTPException,
 )
-from src.api.dependencies import DBDep, UserIdDep
-from src.schemas.bookings import Booking, BookingAddRequest, BookingPatchRequest
-from src.schemas.common import PaginatedResponse
+from src.api.dependencies import DBDep, UserIdDep, get_booking_queue_service
+from src.schemas.bookings import (
+    Booking,
+    BookingAddRequest,
+    BookingBatchRequest,
+    BookingHold,
+    BookingPatchRequest,
+    BookingQueueTicket,
+)
+from src.schemas.common import CountStrategy, CursorPage, PaginatedResponse
+from src.services.booking_queue import BookingQueueService
 
 router = APIRouter(prefix="/bookings", tags=["Bookings"])
 
+BookingQueueDep = Annotated[BookingQueueService, Depends(get_booking_queue_service)]
+
 
-@router.get("/me", summary="Мои бронирования", response_model=PaginatedResponse[Booking])
+@router.get(
+    "/me",
+    summary="Мои бронирования",
+    response_model=PaginatedResponse[Booking] | CursorPage[Booking],
+)
 async def get_my_bookings(
     db: DBDep,
     user_id: UserIdDep,
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(
+        None, description="Keyset-пагинация: пустая строка — первая страница"
+    ),
+    count: CountStrategy | None = Query(None, description="Стратегия подсчёта total"),
 ):
-    return await BookingService(db).get_my_bookings(user_id, page=page, per_page=per_page)
+    try:
+        return await BookingService(db).get_my_bookings(
+            user_id, page=page, per_page=per_page, cursor=cursor, count=count
+        )
+    except InvalidCursorException:
+        raise InvalidCursorHTTPException()
 
 
 @router.get("/{booking_id}", summary="Бронирование по ID", response_model=Booking)
@@ -63,6 +96,128 @@ async def add_booking(
     return booking
 
 
+@router.post(
+    "/batch",
+    summary="Групповое бронирование (всё или ничего)",
+    response_model=list[Booking],
+    status_code=status.HTTP_201_CREATED,
+)
+async def add_bookings_batch(
+    user_id: UserIdDep,
+    db: DBDep,
+    request: Request,
+    response: Response,
+    batch_data: BookingBatchRequest,
+):
+    try:
+        bookings = await BookingService(db).add_bookings_batch(user_id, batch_data)
+    except RoomNotFoundException:
+        BOOKINGS_FAILED.labels(app_name="hotel_booking").inc()
+        raise RoomNotFoundHTTPException()
+    except AllRoomsAreBookedException:
+        BOOKINGS_FAILED.labels(app_name="hotel_booking").inc()
+        raise AllRoomsAreBookedHTTPException()
+    BOOKINGS_CREATED.labels(app_name="hotel_booking").inc(len(bookings))
+    response.headers["Location"] = str(request.url_for("get_my_bookings"))
+    return bookings
+
+
+@router.post(
+    "/queue",
+    summary="Поставить бронирование в очередь",
+    description=(
+        "Режим для пиковой нагрузки (`BOOKING_QUEUE_ENABLED`): заявка попадает в очередь "
+        "номера и применяется consumer-ом, запрос не занимает соединение с БД. "
+        "Результат — по ссылке из `Location` (`GET /bookings/queue/{ticket}?wait=...`)."
+    ),
+    response_model=BookingQueueTicket,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def enqueue_booking(
+    user_id: UserIdDep,
+    queue: BookingQueueDep,
+    request: Request,
+    response: Response,
+    booking_data: BookingAddRequest,
+):
+    try:
+        ticket = await queue.enqueue(user_id, booking_data)
+    except BookingQueueDisabledException:
+        raise BookingQueueDisabledHTTPException()
+    response.headers["Location"] = str(request.url_for("get_queued_booking", ticket=ticket.ticket))
+    return ticket
+
+
+@router.get(
+    "/queue/{ticket}",
+    summary="Статус бронирования из очереди",
+    description="`wait` — long-poll: ждать результата до N секунд, пока статус `pending`.",
+    response_model=BookingQueueTicket,
+)
+async def get_queued_booking(
+    ticket: str,
+    user_id: UserIdDep,
+    queue: BookingQueueDep,
+    wait: float = Query(0, ge=0, le=30),
+):
+    try:
+        return await queue.get_status(user_id, ticket, wait=wait)
+    except BookingQueueDisabledException:
+        raise BookingQueueDisabledHTTPException()
+    except BookingTicketNotFoundException:
+        raise BookingTicketNotFoundHTTPException()
+
+
+@router.post(
+    "/holds",
+    summary="Временно удержать номер",
+    description=(
+        "Занимает номер на период на `BOOKING_HOLD_TTL_MINUTES` минут. "
+        "Подтверждение холда создаёт бронь без повторной проверки доступности; "
+        "неподтверждённый холд снимается автоматически."
+    ),
+    response_model=BookingHold,
+    status_code=status.HTTP_201_CREATED,
+)
+async def add_hold(user_id: UserIdDep, db: DBDep, hold_data: BookingAddRequest):
+    try:
+        return await BookingService(db).add_hold(user_id, hold_data)
+    except RoomNotFoundException:
+        raise RoomNotFoundHTTPException()
+    except AllRoomsAreBookedException:
+        raise AllRoomsAreBookedHTTPException()
+
+
+@router.post(
+    "/holds/{hold_id}/confirm",
+    summary="Подтвердить холд (создать бронь)",
+    response_model=Booking,
+    status_code=status.HTTP_201_CREATED,
+)
+async def confirm_hold(
+    hold_id: int, user_id: UserIdDep, db: DBDep, request: Request, response: Response
+):
+    try:
+        booking = await BookingService(db).confirm_hold(user_id, hold_id)
+    except BookingHoldNotFoundException:
+        raise BookingHoldNotFoundHTTPException()
+    BOOKINGS_CREATED.labels(app_name="hotel_booking").inc()
+    response.headers["Location"] = str(request.url_for("get_my_bookings"))
+    return booking
+
+
+@router.delete(
+    "/holds/{hold_id}",
+    summary="Отменить холд",
+    status_code=status.HTTP_204_NO_CONTENT,
+)
+async def cancel_hold(hold_id: int, user_id: UserIdDep, db: DBDep):
+    try:
+        await BookingService(db).cancel_hold(user_id, hold_id)
+    except BookingHoldNotFoundException:
+        raise BookingHoldNotFoundHTTPException()
+
+
 @router.patch("/{booking_id}", summary="Изменить даты бронирования", response_model=Booking)
 async def patch_booking(booking_id: int, user_id: UserIdDep, db: DBDep, data: BookingPatchRequest):
     try:
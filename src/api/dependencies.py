@@ -12,7 +12,10 @@ from src.exceptions import (
     ExpiredTokenException,
     InsufficientPermissionsHTTPException,
 )
+from src.config import settings
+from src.schemas.common import CountStrategy
 from src.services.auth import AuthService
+from src.services.booking_queue import BookingQueueService
 from src.services.confirmation import ConfirmationService
 from src.services.oauth import OAuthService
 from src.services.token_blacklist import TokenBlacklistService
@@ -23,6 +26,22 @@ from src.database import async_session_maker
 class PaginationParams(BaseModel):
     page: Annotated[int, Query(1, ge=1, description="Номер страницы")]
     per_page: Annotated[int, Query(10, ge=1, le=100, description="Элементов на странице")]
+    cursor: Annotated[
+        str | None,
+        Query(
+            None,
+            description="Keyset-пагинация: пустая строка — первая страница, "
+            "дальше next_cursor из ответа; page при этом игнорируется",
+        ),
+    ]
+    count: Annotated[
+        CountStrategy | None,
+        Query(
+            None,
+            description="Подсчёт total: exact, window (COUNT(*) OVER()), "
+            "estimate (оценка планировщика) или capped (до 1000); по умолчанию — свой у эндпоинта",
+        ),
+    ]
 
 
 PaginationDep = Annotated[PaginationParams, Depends()]
@@ -47,6 +66,16 @@ def get_confirmation_service() -> ConfirmationService:
     return ConfirmationService(redis=redis_manager)
 
 
+def get_booking_queue_service() -> BookingQueueService:
+    from src.init import redis_manager
+
+    return BookingQueueService(
+        redis=redis_manager,
+        enabled=settings.BOOKING_QUEUE_ENABLED,
+        result_ttl=settings.BOOKING_QUEUE_RESULT_TTL_SECONDS,
+    )
+
+
 def get_oauth_service() -> OAuthService:
     from src.init import redis_manager
 
@@ -1,29 +1,41 @@
 from fastapi import APIRouter, Body, Request, Response, status
-from fastapi_cache import FastAPICache
-from fastapi_cache.decorator import cache
 
+from src.cache import FACILITIES_TAG, cached
+from src.config import settings
 from src.exceptions import (
     FacilityTitleEmptyException,
     FacilityTitleEmptyHTTPException,
+    InvalidCursorException,
+    InvalidCursorHTTPException,
     ObjectAlreadyExistsException,
     ObjectAlreadyExistsHTTPException,
     ObjectNotFoundException,
     ObjectNotFoundHTTPException,
 )
 from src.services.facilities import FacilityService
-from src.schemas.common import PaginatedResponse
+from src.schemas.common import CursorPage, PaginatedResponse
 from src.schemas.facilities import FacilityAdd, Facility
 from src.api.dependencies import DBDep, PaginationDep, AdminDep
 
 router = APIRouter(prefix="/facilities", tags=["Facilities"])
 
 
-@router.get("", summary="Список удобств", response_model=PaginatedResponse[Facility])
-@cache(expire=300)
+@router.get(
+    "",
+    summary="Список удобств",
+    response_model=PaginatedResponse[Facility] | CursorPage[Facility],
+)
+@cached(settings.CACHE_TTL_SECONDS, FACILITIES_TAG)
 async def get_facilities(pagination: PaginationDep, db: DBDep):
-    return await FacilityService(db).get_facilities(
-        page=pagination.page, per_page=pagination.per_page
-    )
+    try:
+        return await FacilityService(db).get_facilities(
+            page=pagination.page,
+            per_page=pagination.per_page,
+            cursor=pagination.cursor,
+            count=pagination.count,
+        )
+    except InvalidCursorException:
+        raise InvalidCursorHTTPException()
 
 
 @router.post(
@@ -45,10 +57,6 @@ async def create_facility(
         raise FacilityTitleEmptyHTTPException()
     except ObjectAlreadyExistsException:
         raise ObjectAlreadyExistsHTTPException()
-    try:
-        await FastAPICache.clear()
-    except AssertionError:
-        pass
     response.headers["Location"] = str(request.url_for("get_facilities"))
     return facility
 
@@ -63,7 +71,3 @@ async def delete_facility(_: AdminDep, facility_id: int, db: DBDep):
         await FacilityService(db).facility_delete(facility_id)
     except ObjectNotFoundException:
         raise ObjectNotFoundHTTPException()
-    try:
-        await FastAPICache.clear()
-    except Exception:
-        pass
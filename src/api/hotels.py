@@ -2,31 +2,44 @@ from datetime import date
 from typing import Literal
 
 from fastapi import Query, APIRouter, Body, Request, Response, status
-from fastapi_cache.decorator import cache
 
 
+from src.cache import HOTEL_TAG, SEARCH_TAG, cached
+from src.config import settings
 from src.services.hotels import HotelService
 from src.exceptions import (
     CannotDeleteHotelWithRoomsException,
     CannotDeleteHotelWithRoomsHTTPException,
+    GeoPointRequiredException,
+    GeoPointRequiredHTTPException,
     HotelNotFoundException,
     HotelNotFoundHTTPException,
+    InvalidCursorException,
+    InvalidCursorHTTPException,
     InvalidDateRangeException,
     InvalidDateRangeHTTPException,
+    InvalidFacilityIdsException,
+    InvalidFacilityIdsHTTPException,
+    InvalidGeoPointException,
+    InvalidGeoPointHTTPException,
     ObjectNotFoundException,
     ObjectAlreadyExistsException,
     ObjectAlreadyExistsHTTPException,
 )
 from src.api.dependencies import PaginationDep, DBDep, AdminDep
 from src.middleware.prometheus import SEARCH_REQUESTS
-from src.schemas.common import PaginatedResponse
-from src.schemas.hotels import HotelPatch, HotelAdd, Hotel, AutocompleteResult
+from src.schemas.common import CursorPage, PaginatedResponse
+from src.schemas.hotels import HotelPatch, HotelAdd, Hotel, AutocompleteResult, HotelFacets
 
 router = APIRouter(prefix="/hotels", tags=["Hotels"])
 
 
-@router.get("", summary="Список доступных отелей", response_model=PaginatedResponse[Hotel])
-@cache(expire=10)
+@router.get(
+    "",
+    summary="Список доступных отелей",
+    response_model=PaginatedResponse[Hotel] | CursorPage[Hotel],
+)
+@cached(settings.CACHE_TTL_SECONDS, SEARCH_TAG)
 async def get_hotels(
     pagination: PaginationDep,
     db: DBDep,
@@ -35,9 +48,32 @@ async def get_hotels(
     search: str | None = Query(None, description="Поиск по городу, названию и адресу"),
     date_from: date | None = Query(None, examples=["2025-09-01"]),
     date_to: date | None = Query(None, examples=["2025-09-15"]),
-    sort_by: Literal["id", "title", "city"] = Query("id", description="Поле сортировки"),
+    sort_by: Literal["id", "title", "city", "relevance", "price", "distance"] | None = Query(
+        None,
+        description=(
+            "Поле сортировки (по умолчанию id, с near — distance); relevance — по сходству "
+            "с search, price — по цене «от», distance — по расстоянию от near"
+        ),
+    ),
     order: Literal["asc", "desc"] = Query("asc", description="Направление сортировки"),
     guests: int = Query(1, ge=1, le=20, description="Количество гостей"),
+    price_min: int | None = Query(None, ge=0, description="Цена «от» за ночь, не ниже"),
+    price_max: int | None = Query(None, ge=0, description="Цена «от» за ночь, не выше"),
+    capacity: int | None = Query(
+        None, ge=1, le=20, description="Есть номер не меньше чем на столько гостей"
+    ),
+    near: str | None = Query(
+        None, description="Точка «рядом со мной»: широта,долгота", examples=["43.585,39.720"]
+    ),
+    radius_km: float | None = Query(
+        None,
+        gt=0,
+        le=settings.GEO_MAX_RADIUS_KM,
+        description=f"Радиус от near, км (по умолчанию {settings.GEO_DEFAULT_RADIUS_KM:g})",
+    ),
+    facilities: str | None = Query(
+        None, description="ID удобств через запятую: есть номер со всеми", examples=["1,4,7"]
+    ),
 ):
     SEARCH_REQUESTS.labels(app_name="hotel_booking").inc()
     try:
@@ -51,19 +87,86 @@ async def get_hotels(
             order,
             guests,
             search,
+            price_min=price_min,
+            price_max=price_max,
+            capacity=capacity,
+            near=near,
+            radius_km=radius_km,
+            facilities=facilities,
+        )
+    except InvalidDateRangeException:
+        raise InvalidDateRangeHTTPException()
+    except InvalidCursorException:
+        raise InvalidCursorHTTPException()
+    except InvalidGeoPointException:
+        raise InvalidGeoPointHTTPException()
+    except InvalidFacilityIdsException:
+        raise InvalidFacilityIdsHTTPException()
+    except GeoPointRequiredException:
+        raise GeoPointRequiredHTTPException()
+
+
+@router.get("/facets", summary="Фасеты списка отелей", response_model=HotelFacets)
+@cached(settings.CACHE_TTL_SECONDS, SEARCH_TAG)
+async def get_hotel_facets(
+    db: DBDep,
+    city: str | None = Query(None, description="Город"),
+    title: str | None = Query(None, description="Название отеля"),
+    search: str | None = Query(None, description="Поиск по городу, названию и адресу"),
+    date_from: date | None = Query(None, examples=["2025-09-01"]),
+    date_to: date | None = Query(None, examples=["2025-09-15"]),
+    guests: int = Query(1, ge=1, le=20, description="Количество гостей"),
+    price_min: int | None = Query(None, ge=0, description="Цена «от» за ночь, не ниже"),
+    price_max: int | None = Query(None, ge=0, description="Цена «от» за ночь, не выше"),
+    capacity: int | None = Query(
+        None, ge=1, le=20, description="Есть номер не меньше чем на столько гостей"
+    ),
+    near: str | None = Query(
+        None, description="Точка «рядом со мной»: широта,долгота", examples=["43.585,39.720"]
+    ),
+    radius_km: float | None = Query(
+        None,
+        gt=0,
+        le=settings.GEO_MAX_RADIUS_KM,
+        description=f"Радиус от near, км (по умолчанию {settings.GEO_DEFAULT_RADIUS_KM:g})",
+    ),
+    facilities: str | None = Query(
+        None, description="ID удобств через запятую: есть номер со всеми", examples=["1,4,7"]
+    ),
+):
+    """Сколько отелей выборки `GET /hotels` с теми же фильтрами приходится на каждый город,
+    диапазон вместимости и цены и удобство."""
+    try:
+        return await HotelService(db).get_facets(
+            city,
+            title,
+            date_from,
+            date_to,
+            guests,
+            search,
+            price_min=price_min,
+            price_max=price_max,
+            capacity=capacity,
+            near=near,
+            radius_km=radius_km,
+            facilities=facilities,
         )
     except InvalidDateRangeException:
         raise InvalidDateRangeHTTPException()
+    except InvalidGeoPointException:
+        raise InvalidGeoPointHTTPException()
+    except InvalidFacilityIdsException:
+        raise InvalidFacilityIdsHTTPException()
 
 
 @router.get("/popular-locations", summary="Популярные локации", response_model=list[str])
-@cache(expire=300)
+@cached(settings.CACHE_TTL_SECONDS, SEARCH_TAG)
 async def popular_locations(db: DBDep):
     return await HotelService(db).popular_locations()
 
 
 @router.get("/autocomplete", summary="Подсказки для поиска", response_model=AutocompleteResult)
-@cache(expire=30)
+@cached(settings.CACHE_TTL_SECONDS, SEARCH_TAG)
 async def autocomplete_hotels(
     db: DBDep,
     q: str = Query(..., min_length=1, max_length=100),
@@ -72,7 +175,7 @@ async def autocomplete_hotels(
 
 
 @router.get("/{hotel_id}", summary="Получить отель", response_model=Hotel)
-@cache(expire=10)
+@cached(settings.CACHE_TTL_SECONDS, HOTEL_TAG)
 async def get_hotel(hotel_id: int, db: DBDep):
     try:
         return await HotelService(db).get_hotel(hotel_id)
@@ -1,6 +1,8 @@
 from fastapi import APIRouter, UploadFile, status
 
 from src.api.dependencies import AdminDep, DBDep
+from src.cache import HOTEL_TAG, cached
+from src.config import settings
 from src.exceptions import (
     CorruptedImageException,
     CorruptedImageHTTPException,
@@ -48,6 +50,7 @@ async def upload_image(_: AdminDep, hotel_id: int, db: DBDep, file: UploadFile):
     summary="Изображения отеля",
     response_model=list[HotelImage],
 )
+@cached(settings.CACHE_TTL_SECONDS, HOTEL_TAG)
 async def get_hotel_images(hotel_id: int, db: DBDep):
     try:
         return await ImagesService(db).get_hotel_images(hotel_id)
@@ -1,16 +1,28 @@
 from datetime import date
 
 from fastapi import APIRouter, Body, Query, Request, Response, status
-from fastapi_cache.decorator import cache
 
+from src.cache import (
+    CALENDAR_NAMESPACE,
+    CALENDAR_TAG,
+    HOTEL_TAG,
+    ROOM_TAG,
+    cached,
+    calendar_key_builder,
+)
+from src.config import settings
 from src.services.rooms import RoomService
 from src.exceptions import (
     CannotDeleteRoomWithBookingsException,
     CannotDeleteRoomWithBookingsHTTPException,
     HotelNotFoundException,
     HotelNotFoundHTTPException,
+    InvalidCursorException,
+    InvalidCursorHTTPException,
     InvalidDateRangeException,
     InvalidDateRangeHTTPException,
+    InvalidFacilityIdsException,
+    InvalidFacilityIdsHTTPException,
     RoomNotFoundException,
     RoomNotFoundHTTPException,
     ObjectNotFoundException,
@@ -19,8 +31,8 @@ from src.exceptions import (
     ObjectAlreadyExistsHTTPException,
 )
 from src.api.dependencies import DBDep, PaginationDep, AdminDep
-from src.schemas.common import PaginatedResponse
-from src.schemas.rooms import RoomAddRequest, RoomPatchRequest, RoomWithRels
+from src.schemas.common import CursorPage, PaginatedResponse
+from src.schemas.rooms import RoomAddRequest, RoomCalendar, RoomPatchRequest, RoomWithRels
 
 router = APIRouter(prefix="/hotels", tags=["Rooms"])
 
@@ -28,24 +40,88 @@ router = APIRouter(prefix="/hotels", tags=["Rooms"])
 @router.get(
     "/{hotel_id}/rooms",
     summary="Доступные номера",
-    response_model=PaginatedResponse[RoomWithRels],
+    response_model=PaginatedResponse[RoomWithRels] | CursorPage[RoomWithRels],
 )
-@cache(expire=10)
+@cached(settings.CACHE_TTL_SECONDS, HOTEL_TAG)
 async def get_rooms(
     hotel_id: int,
     pagination: PaginationDep,
     db: DBDep,
     date_from: date | None = Query(None, examples=["2025-09-01"]),
     date_to: date | None = Query(None, examples=["2025-09-15"]),
+    facilities: str | None = Query(
+        None, description="ID удобств через запятую: номера со всеми", examples=["1,4,7"]
+    ),
 ):
     try:
         return await RoomService(db).get_filtered_by_time(
-            hotel_id, date_from, date_to, pagination.page, pagination.per_page
+            hotel_id,
+            date_from,
+            date_to,
+            pagination.page,
+            pagination.per_page,
+            pagination.cursor,
+            pagination.count,
+            facilities=facilities,
         )
     except HotelNotFoundException:
         raise HotelNotFoundHTTPException()
     except InvalidDateRangeException:
         raise InvalidDateRangeHTTPException()
+    except InvalidCursorException:
+        raise InvalidCursorHTTPException()
+    except InvalidFacilityIdsException:
+        raise InvalidFacilityIdsHTTPException()
+
+
+@router.get(
+    "/{hotel_id}/rooms/calendar",
+    summary="Календарь доступности номеров отеля",
+    response_model=list[RoomCalendar],
+)
+@cached(
+    settings.CACHE_TTL_SECONDS,
+    CALENDAR_TAG,
+    namespace=CALENDAR_NAMESPACE,
+    key_builder=calendar_key_builder,
+)
+async def get_hotel_calendar(
+    hotel_id: int,
+    db: DBDep,
+    date_from: date | None = Query(None, alias="from", examples=["2025-09-01"]),
+    days: int = Query(60, ge=1, le=366),
+):
+    try:
+        return await RoomService(db).get_calendar(hotel_id, date_from, days)
+    except HotelNotFoundException:
+        raise HotelNotFoundHTTPException()
+
+
+@router.get(
+    "/{hotel_id}/rooms/{room_id}/calendar",
+    summary="Календарь доступности номера",
+    response_model=RoomCalendar,
+)
+@cached(
+    settings.CACHE_TTL_SECONDS,
+    CALENDAR_TAG,
+    namespace=CALENDAR_NAMESPACE,
+    key_builder=calendar_key_builder,
+)
+async def get_room_calendar(
+    hotel_id: int,
+    room_id: int,
+    db: DBDep,
+    date_from: date | None = Query(None, alias="from", examples=["2025-09-01"]),
+    days: int = Query(60, ge=1, le=366),
+):
+    try:
+        calendars = await RoomService(db).get_calendar(hotel_id, date_from, days, room_id=room_id)
+    except HotelNotFoundException:
+        raise HotelNotFoundHTTPException()
+    except RoomNotFoundException:
+        raise RoomNotFoundHTTPException()
+    return calendars[0]
 
 
 @router.get(
@@ -53,7 +129,7 @@ async def get_rooms(
     summary="Получить номер",
     response_model=RoomWithRels,
 )
-@cache(expire=10)
+@cached(settings.CACHE_TTL_SECONDS, HOTEL_TAG, ROOM_TAG)
 async def get_room(hotel_id: int, room_id: int, db: DBDep):
     try:
         return await RoomService(db).get_room(room_id, hotel_id=hotel_id)
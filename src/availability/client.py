@@ -0,0 +1,149 @@
+import asyncio
+import json
+import logging
+from datetime import date, datetime, timezone
+
+import asyncpg
+
+from src.availability.engine import AVAILABILITY_CHANNEL, AvailabilityEngine
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+_engine: AvailabilityEngine | None = None
+_task: asyncio.Task | None = None
+
+_RECONNECT_DELAY_SECONDS = 5
+
+
+def get_availability_engine() -> AvailabilityEngine | None:
+    """Готовый к запросам движок или None (выключен, не загружен, нет связи с PG)."""
+    if _engine is not None and _engine.ready:
+        return _engine
+    return None
+
+
+async def _connect() -> asyncpg.Connection:
+    return await asyncpg.connect(
+        host=settings.DB_HOST,
+        port=settings.DB_PORT,
+        user=settings.DB_USER,
+        password=settings.DB_PASS,
+        database=settings.DB_NAME,
+    )
+
+
+async def load_engine(conn: asyncpg.Connection) -> AvailabilityEngine:
+    today = datetime.now(tz=timezone.utc).date()
+    engine = AvailabilityEngine(start=today, window_days=settings.AVAILABILITY_WINDOW_DAYS)
+    for row in await conn.fetch("SELECT id, hotel_id, quantity, capacity FROM rooms"):
+        engine.set_room(row["id"], row["hotel_id"], row["quantity"], row["capacity"])
+    nights = await conn.fetch(
+        "SELECT room_id, night, booked_count FROM room_inventory "
+        "WHERE night >= $1 AND night < $2 AND booked_count > 0",
+        engine.start,
+        engine.end,
+    )
+    for row in nights:
+        engine.set_booked(row["room_id"], row["night"], row["booked_count"])
+    engine.ready = True
+    logger.info(
+        "Availability engine загружен: %d номеров, %d ночей", len(engine.rooms), len(nights)
+    )
+    return engine
+
+
+async def apply_event(conn: asyncpg.Connection, engine: AvailabilityEngine, payload: str) -> bool:
+    """Перечитывает из PG то, что изменилось. Идемпотентно — порядок и повторы не важны.
+
+    Возвращает False, если событие требует полной перезагрузки (пересборка room_inventory).
+    """
+    event = json.loads(payload)
+    room_id = event.get("room_id")
+    if room_id is None:
+        return False
+    if event.get("date_from") is None:
+        room = await conn.fetchrow(
+            "SELECT hotel_id, quantity, capacity FROM rooms WHERE id = $1", room_id
+        )
+        if room is None:
+            engine.remove_room(room_id)
+        else:
+            engine.set_room(room_id, room["hotel_id"], room["quantity"], room["capacity"])
+        return True
+
+    date_from = date.fromisoformat(event["date_from"])
+    date_to = date.fromisoformat(event["date_to"])
+    nights = await conn.fetch(
+        "SELECT night, booked_count FROM room_inventory "
+        "WHERE room_id = $1 AND night >= $2 AND night < $3",
+        room_id,
+        date_from,
+        date_to,
+    )
+    engine.clear_booked(room_id, date_from, date_to)
+    for row in nights:
+        engine.set_booked(room_id, row["night"], row["booked_count"])
+    return True
+
+
+async def _sync_once() -> None:
+    """Одна сессия синхронизации: LISTEN, загрузка, применение событий до обрыва связи."""
+    global _engine
+    events: asyncio.Queue[str | None] = asyncio.Queue()
+    conn = await _connect()
+    try:
+        conn.add_termination_listener(lambda _: events.put_nowait(None))
+        # LISTEN до загрузки: изменения во время загрузки не теряются
+        await conn.add_listener(AVAILABILITY_CHANNEL, lambda *args: events.put_nowait(args[-1]))
+        _engine = await load_engine(conn)
+        loop = asyncio.get_running_loop()
+        reload_at = loop.time() + settings.AVAILABILITY_RELOAD_SECONDS
+        while True:
+            try:
+                payload = await asyncio.wait_for(events.get(), reload_at - loop.time())
+            except TimeoutError:
+                # Сдвигаем окно на сегодня и заодно лечим возможный дрейф
+                _engine = await load_engine(conn)
+                reload_at = loop.time() + settings.AVAILABILITY_RELOAD_SECONDS
+                continue
+            if payload is None:
+                raise ConnectionError("соединение LISTEN закрыто")
+            if not await apply_event(conn, _engine, payload):
+                _engine = await load_engine(conn)
+    finally:
+        if not conn.is_closed():
+            await conn.close()
+
+
+async def _sync_forever() -> None:
+    while True:
+        try:
+            await _sync_once()
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning("Availability engine: нет синхронизации с PG, fallback на SQL: %s", exc)
+            if _engine is not None:
+                _engine.ready = False
+        await asyncio.sleep(_RECONNECT_DELAY_SECONDS)
+
+
+async def init_availability() -> None:
+    global _task
+    if not settings.AVAILABILITY_ENGINE_ENABLED:
+        logger.info("Availability engine отключён (AVAILABILITY_ENGINE_ENABLED=False)")
+        return
+    _task = asyncio.create_task(_sync_forever())
+
+
+async def close_availability() -> None:
+    global _engine, _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
+    _engine = None
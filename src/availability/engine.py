@@ -0,0 +1,104 @@
+from array import array
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+
+# Канал LISTEN/NOTIFY: payload — JSON {"room_id", "date_from", "date_to"};
+# без дат — изменились сами параметры номера; без room_id — нужна полная перезагрузка.
+AVAILABILITY_CHANNEL = "availability"
+
+
+@dataclass
+class RoomCalendar:
+    hotel_id: int
+    quantity: int
+    capacity: int
+    # booked[i] — занято единиц номера в ночь start + i (int16, 2 байта на ночь)
+    booked: array = field(default_factory=lambda: array("h"))
+
+
+class AvailabilityEngine:
+    """Календарь занятости номеров в памяти воркера.
+
+    Отвечает на «какие номера/отели свободны на период» без SQL. Данные —
+    копия room_inventory за окно [start, start + window_days); всё, что вне окна,
+    или до загрузки возвращает None — вызывающий код идёт в PostgreSQL.
+    Финальную проверку при бронировании всегда делает PostgreSQL.
+    """
+
+    def __init__(self, start: date, window_days: int = 365):
+        self.start = start
+        self.window_days = window_days
+        self.rooms: dict[int, RoomCalendar] = {}
+        self.hotel_rooms: dict[int, set[int]] = {}
+        self.ready = False
+
+    @property
+    def end(self) -> date:
+        return self.start + timedelta(days=self.window_days)
+
+    def _slice(self, date_from: date, date_to: date) -> tuple[int, int] | None:
+        if date_from < self.start or date_to > self.end or date_from >= date_to:
+            return None
+        return (date_from - self.start).days, (date_to - self.start).days
+
+    def set_room(self, room_id: int, hotel_id: int, quantity: int, capacity: int) -> None:
+        room = self.rooms.get(room_id)
+        if room is None:
+            room = RoomCalendar(
+                hotel_id, quantity, capacity, array("h", bytes(2 * self.window_days))
+            )
+            self.rooms[room_id] = room
+        elif room.hotel_id != hotel_id:
+            self.hotel_rooms.get(room.hotel_id, set()).discard(room_id)
+        room.hotel_id, room.quantity, room.capacity = hotel_id, quantity, capacity
+        self.hotel_rooms.setdefault(hotel_id, set()).add(room_id)
+
+    def remove_room(self, room_id: int) -> None:
+        room = self.rooms.pop(room_id, None)
+        if room is not None:
+            self.hotel_rooms.get(room.hotel_id, set()).discard(room_id)
+
+    def set_booked(self, room_id: int, night: date, booked_count: int) -> None:
+        room = self.rooms.get(room_id)
+        offset = (night - self.start).days
+        if room is not None and 0 <= offset < self.window_days:
+            room.booked[offset] = booked_count
+
+    def clear_booked(self, room_id: int, date_from: date, date_to: date) -> None:
+        room = self.rooms.get(room_id)
+        if room is None:
+            return
+        lo = max((date_from - self.start).days, 0)
+        hi = min((date_to - self.start).days, self.window_days)
+        for offset in range(lo, hi):
+            room.booked[offset] = 0
+
+    def _is_available(self, room: RoomCalendar, lo: int, hi: int, guests: int) -> bool:
+        return room.capacity >= guests and max(room.booked[lo:hi]) < room.quantity
+
+    def available_room_ids(
+        self, date_from: date, date_to: date, hotel_id: int | None = None, guests: int = 1
+    ) -> list[int] | None:
+        bounds = self._slice(date_from, date_to) if self.ready else None
+        if bounds is None:
+            return None
+        lo, hi = bounds
+        room_ids = self.hotel_rooms.get(hotel_id, ()) if hotel_id is not None else self.rooms
+        return sorted(
+            room_id
+            for room_id in room_ids
+            if self._is_available(self.rooms[room_id], lo, hi, guests)
+        )
+
+    def available_hotel_ids(
+        self, date_from: date, date_to: date, guests: int = 1
+    ) -> list[int] | None:
+        bounds = self._slice(date_from, date_to) if self.ready else None
+        if bounds is None:
+            return None
+        lo, hi = bounds
+        return sorted(
+            hotel_id
+            for hotel_id, room_ids in self.hotel_rooms.items()
+            if any(self._is_available(self.rooms[r], lo, hi, guests) for r in room_ids)
+        )
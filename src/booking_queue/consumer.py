@@ -0,0 +1,160 @@
+"""Consumer очереди бронирований: применяет заявки из Redis streams по номерам.
+
+    uv run python -m src.booking_queue.consumer
+
+Можно запускать несколько экземпляров: номер в каждый момент обрабатывает один
+consumer (лок в Redis), заявки номера применяются пачками в порядке поступления.
+Доставка at-least-once: повторно прочитанная заявка брони не дублирует — её тикет
+хранится в bookings.queue_ticket (UNIQUE).
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+
+import redis.asyncio as redis
+
+from src.cache import init_cache
+from src.config import settings
+from src.database import async_session_maker
+from src.init import redis_manager
+from src.logging_config import setup_logging
+from src.services.booking_queue import (
+    READY_KEY,
+    ROOM_STREAM_PREFIX,
+    room_stream_key,
+    ticket_key,
+)
+from src.services.bookings import BookingService
+from src.utils.db_manager import DBManager
+
+logger = logging.getLogger(__name__)
+
+_LOCK_PREFIX = "booking_queue:lock:"
+_LOCK_TTL_SECONDS = 30  # продлевается фоновой задачей, пока номер обрабатывается
+_LOCK_RENEW_SECONDS = _LOCK_TTL_SECONDS / 3
+_READY_BLOCK_SECONDS = 2  # меньше socket_timeout RedisManager
+_SWEEP_SECONDS = 30
+_ERROR_BACKOFF_SECONDS = 1
+
+# Снимаем лок, только если он всё ещё наш
+_RELEASE_LOCK = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+_RENEW_LOCK = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('expire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+def _decode(fields: dict) -> dict | None:
+    """Поля заявки из stream; None — заявка повреждена (нет тикета или user_id)."""
+    entry = {k.decode(): v.decode() for k, v in fields.items()}
+    try:
+        entry["user_id"] = int(entry["user_id"])
+    except (KeyError, ValueError):
+        return None
+    return entry if "ticket" in entry else None
+
+
+async def _keep_lock(client: redis.Redis, lock_key: str, token: str) -> None:
+    """Продлевает лок номера, пока идёт обработка: медленная пачка не отдаёт номер другому."""
+    while True:
+        await asyncio.sleep(_LOCK_RENEW_SECONDS)
+        try:
+            if not await client.eval(_RENEW_LOCK, 1, lock_key, token, _LOCK_TTL_SECONDS):
+                logger.warning("Booking queue: лок %s потерян до конца обработки", lock_key)
+                return
+        except Exception as exc:
+            logger.warning("Booking queue: не удалось продлить лок %s: %s", lock_key, exc)
+
+
+async def drain_room(client: redis.Redis, room_id: int, batch_size: int) -> int:
+    """Обрабатывает все заявки номера. Возвращает число обработанных заявок.
+
+    Если номер уже обрабатывает другой consumer — сразу возвращает 0.
+    """
+    lock_key = f"{_LOCK_PREFIX}{room_id}"
+    token = uuid.uuid4().hex
+    if not await client.set(lock_key, token, nx=True, ex=_LOCK_TTL_SECONDS):
+        return 0
+    stream = room_stream_key(room_id)
+    processed = 0
+    keeper = asyncio.create_task(_keep_lock(client, lock_key, token))
+    try:
+        while messages := await client.xrange(stream, count=batch_size):
+            entries = [entry for _, fields in messages if (entry := _decode(fields)) is not None]
+            if len(entries) < len(messages):
+                logger.warning(
+                    "Booking queue: номер %s — пропущено повреждённых заявок: %d",
+                    room_id,
+                    len(messages) - len(entries),
+                )
+            async with DBManager(session_factory=async_session_maker) as db:
+                results = await BookingService(db).apply_queued_batch(room_id, entries)
+            pipe = client.pipeline()
+            for ticket, result in results.items():
+                pipe.set(
+                    ticket_key(ticket),
+                    json.dumps(result),
+                    ex=settings.BOOKING_QUEUE_RESULT_TTL_SECONDS,
+                )
+            pipe.xdel(stream, *(message_id for message_id, _ in messages))
+            await pipe.execute()
+            processed += len(messages)
+    finally:
+        keeper.cancel()
+        await client.eval(_RELEASE_LOCK, 1, lock_key, token)
+    # Заявка могла прийти, пока лок был у нас, а её сигнал в ready забрал другой consumer
+    if await client.xlen(stream):
+        await client.rpush(READY_KEY, room_id)
+    return processed
+
+
+async def requeue_pending_rooms(client: redis.Redis) -> int:
+    """Возвращает в ready номера с необработанными заявками (например, после падения consumer)."""
+    requeued = 0
+    async for key in client.scan_iter(match=f"{ROOM_STREAM_PREFIX}*"):
+        if await client.xlen(key):
+            room_id = int(key.decode().removeprefix(ROOM_STREAM_PREFIX))
+            await client.rpush(READY_KEY, room_id)
+            requeued += 1
+    return requeued
+
+
+async def run_consumer() -> None:
+    await redis_manager.connect()
+    client = redis_manager.redis
+    # Применённые брони сбрасывают кэш календарей и выдачи по тегам, как и в API
+    init_cache(client)
+    loop = asyncio.get_running_loop()
+    sweep_at = 0.0
+    logger.info("Booking queue consumer запущен (batch=%d)", settings.BOOKING_QUEUE_BATCH_SIZE)
+    try:
+        while True:
+            try:
+                if loop.time() >= sweep_at:
+                    await requeue_pending_rooms(client)
+                    sweep_at = loop.time() + _SWEEP_SECONDS
+                item = await client.blpop(READY_KEY, timeout=_READY_BLOCK_SECONDS)
+                if item is None:
+                    continue
+                await drain_room(client, int(item[1]), settings.BOOKING_QUEUE_BATCH_SIZE)
+            except Exception as exc:
+                # Заявки остаются в stream и будут применены после восстановления
+                logger.warning("Booking queue consumer: ошибка обработки: %s", exc)
+                await asyncio.sleep(_ERROR_BACKOFF_SECONDS)
+    finally:
+        await redis_manager.close()
+
+
+if __name__ == "__main__":
+    setup_logging(level=settings.LOG_LEVEL, json_format=settings.LOG_JSON)
+    asyncio.run(run_consumer())
@@ -0,0 +1,731 @@
+import asyncio
+import hashlib
+import inspect
+import logging
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from datetime import date
+from functools import wraps
+from typing import Any, Callable, NamedTuple
+
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+from fastapi_cache.backends.redis import RedisBackend
+from fastapi_cache.decorator import cache
+from fastapi_cache.types import Backend, KeyBuilder
+from pydantic import BaseModel
+from pydantic.fields import FieldInfo
+from redis.asyncio import Redis
+from starlette.requests import Request
+from starlette.responses import Response
+
+from src.config import settings
+from src.init import redis_manager
+from src.middleware.prometheus import CACHE_L1_EVICTIONS, CACHE_L1_HITS, CACHE_L1_MISSES
+
+logger = logging.getLogger(__name__)
+
+CALENDAR_NAMESPACE = "calendar"
+
+# Теги закэшированных ответов: запись сбрасывает только ответы со своими тегами.
+# Шаблоны заполняются параметрами эндпоинта (cached) или явно — HOTEL_TAG.format(hotel_id=...)
+SEARCH_TAG = "search"  # выдача /hotels, фасеты, автокомплит, популярные локации
+AVAILABILITY_TAG = "availability"  # выдача по нескольким отелям с фильтром date_from/date_to
+FACILITIES_TAG = "facilities"
+HOTEL_TAG = "hotel:{hotel_id}"  # отель и список его номеров
+ROOM_TAG = "room:{room_id}"
+CALENDAR_TAG = "calendar:{hotel_id}"  # календари отеля и его ответы с датами
+
+# Текстовые фильтры поиска регистронезависимы — «Сочи » и «сочи» дают одну выдачу
+_CASE_INSENSITIVE_PARAMS = ("city", "title", "search")
+
+
+class PendingResponse(NamedTuple):
+    """Ответ, который строится в текущем запросе; его читает TaggedBackend.set."""
+
+    key: str
+    tags: tuple[str, ...]
+    # time.time() до чтения кэша и запроса в БД: сброс тега позже — ответ уже устарел
+    started_at: float
+    # Полный срок хранения ответа (TTL + CACHE_STALE_SECONDS)
+    expire: int
+
+
+_pending_response: ContextVar[PendingResponse | None] = ContextVar("pending_response", default=None)
+
+# Закэшированное тело ответа текущего запроса (попадание или запись); из него — ETag
+_response_payload: ContextVar[bytes | None] = ContextVar("response_payload", default=None)
+
+# KEYS — наборы тегов, затем их отметки сброса; ARGV[1] — ключ ответа, ARGV[2] — его TTL,
+# ARGV[3] — начало вычисления ответа, ARGV[4] — канал инвалидации L1.
+# Если тег сбросили после начала вычисления, ответ посчитан по старым данным: удаляем его
+# (запись уже сделана — проверка после неё не пропускает сброс между записью и тегами)
+# и возвращаем 0. Иначе набор тега живёт не меньше самого долгоживущего ключа в нём
+_TAG_KEY = """
+local n = #KEYS / 2
+for i = 1, n do
+    local mark = redis.call('GET', KEYS[n + i])
+    if mark and tonumber(mark) >= tonumber(ARGV[3]) then
+        redis.call('UNLINK', ARGV[1])
+        redis.call('PUBLISH', ARGV[4], ARGV[1])
+        return 0
+    end
+end
+for i = 1, n do
+    redis.call('SADD', KEYS[i], ARGV[1])
+    if redis.call('TTL', KEYS[i]) < tonumber(ARGV[2]) then
+        redis.call('EXPIRE', KEYS[i], ARGV[2])
+    end
+end
+return 1
+"""
+
+# KEYS — наборы тегов, затем их отметки сброса; ARGV[1] — канал инвалидации L1,
+# ARGV[2] — TTL отметок. Отмечаем время сброса (часы Redis), удаляем ключи из наборов
+# (пачками — unpack ограничен стеком Lua), публикуем их воркерам и удаляем сами наборы.
+# Возвращает удалённые ключи
+_INVALIDATE_TAGS = """
+local now = redis.call('TIME')
+local stamp = now[1] .. '.' .. string.format('%06d', now[2])
+local n = #KEYS / 2
+local removed = {}
+for i = 1, n do
+    redis.call('SET', KEYS[n + i], stamp, 'EX', ARGV[2])
+    local tag = KEYS[i]
+    local keys = redis.call('SMEMBERS', tag)
+    for i = 1, #keys, 500 do
+        local chunk = {unpack(keys, i, math.min(i + 499, #keys))}
+        redis.call('UNLINK', unpack(chunk))
+        redis.call('PUBLISH', ARGV[1], table.concat(chunk, '\\n'))
+        for _, key in ipairs(chunk) do
+            removed[#removed + 1] = key
+        end
+    end
+    redis.call('UNLINK', tag)
+end
+return removed
+"""
+
+_L1_ERROR_BACKOFF_SECONDS = 1
+# Начало вычисления — по часам воркера, отметка сброса — по часам Redis; с запасом
+# на расхождение часов ответ, посчитанный почти одновременно со сбросом, не кэшируется
+_CLOCK_SKEW_SECONDS = 1.0
+# Сколько отметок «ключ пересчитывается» держать, прежде чем вычистить истёкшие
+_MAX_REFRESH_MARKS = 1024
+
+# Кэш-ключ → вычисление ответа, которого ждут одинаковые промахи воркера
+_in_flight: dict[str, asyncio.Future] = {}
+
+
+def calendar_key_builder(
+    func: Callable[..., Any],
+    namespace: str = "",
+    *,
+    request: Request | None = None,
+    response: Response | None = None,
+    args: tuple[Any, ...] = (),
+    kwargs: dict[str, Any] | None = None,
+) -> str:
+    """Ключ календаря: `<prefix>:calendar:<hotel_id>:<hash>`.
+
+    Хэш строится только из параметров календаря — DI-зависимости (db) в ключ не попадают,
+    а период без `from` привязан к текущей дате.
+    """
+    kwargs = kwargs or {}
+    date_from = kwargs.get("date_from") or date.today()
+    raw = (
+        f"{func.__module__}:{func.__name__}:{kwargs.get('room_id')}:"
+        f"{date_from}:{kwargs.get('days')}"
+    )
+    digest = hashlib.md5(raw.encode()).hexdigest()  # noqa: S324
+    return f"{namespace}:{kwargs['hotel_id']}:{digest}"
+
+
+def query_key_builder(
+    func: Callable[..., Any],
+    namespace: str = "",
+    *,
+    request: Request | None = None,
+    response: Response | None = None,
+    args: tuple[Any, ...] = (),
+    kwargs: dict[str, Any] | None = None,
+) -> str:
+    """Ключ GET-эндпоинта: `<prefix>:<namespace>:<hash>`.
+
+    Хэш — от нормализованных параметров: DI-зависимости (db) в ключ не попадают,
+    city/title/search приводятся к нижнему регистру без крайних пробелов, пустые — к None.
+    """
+    params = {}
+    for name, value in sorted((kwargs or {}).items()):
+        if name == "db":
+            continue
+        if isinstance(value, BaseModel):
+            value = value.model_dump()
+        elif name in _CASE_INSENSITIVE_PARAMS and isinstance(value, str):
+            value = value.strip().lower() or None
+        params[name] = value
+    raw = f"{func.__module__}:{func.__name__}:{params}"
+    digest = hashlib.md5(raw.encode()).hexdigest()  # noqa: S324
+    return f"{namespace}:{digest}"
+
+
+def response_tags(templates: tuple[str, ...], kwargs: dict[str, Any]) -> tuple[str, ...]:
+    """Теги ответа: шаблоны, заполненные параметрами эндпоинта, плюс тег занятости с датами.
+
+    Ответ одного отеля (есть hotel_id) зависит только от его занятости — CALENDAR_TAG.
+    Выдача по многим отелям — общий AVAILABILITY_TAG: какие отели в неё попали, при записи
+    неизвестно, поэтому любая бронь сбрасывает все такие выдачи. Это цена за то, что
+    страница поиска не тегируется каждым своим отелем; ответы отелей она не задевает.
+    """
+    tags = [template.format(**kwargs) for template in templates]
+    if kwargs.get("date_from") and kwargs.get("date_to"):
+        if "hotel_id" in kwargs:
+            tags.append(CALENDAR_TAG.format(hotel_id=kwargs["hotel_id"]))
+        else:
+            tags.append(AVAILABILITY_TAG)
+    return tuple(tags)
+
+
+def single_flight(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Одинаковые промахи воркера ждут одно вычисление вместо параллельных запросов в БД.
+
+    Ключ — кэш-ключ текущего запроса (его кладёт key builder из cached).
+    """
+
+    @wraps(func)
+    async def inner(*args: Any, **kwargs: Any) -> Any:
+        pending = _pending_response.get()
+        if pending is None:
+            return await func(*args, **kwargs)
+        key = pending.key
+        future = _in_flight.get(key)
+        if future is not None:
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # Запрос-вычислитель отменён (клиент ушёл) — считаем сами
+                return await func(*args, **kwargs)
+        future = asyncio.get_running_loop().create_future()
+        _in_flight[key] = future
+        try:
+            result = await func(*args, **kwargs)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            future.exception()  # ждущих может не быть — без «exception was never retrieved»
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del _in_flight[key]
+
+    return inner
+
+
+def cached(
+    expire: int, *tags: str, namespace: str = "", key_builder: KeyBuilder = query_key_builder
+):
+    """@cache, ответы которого помечены тегами — их сбрасывает invalidate_cache().
+
+    Ответ хранится expire + CACHE_STALE_SECONDS: последние CACHE_STALE_SECONDS он устаревший,
+    и StaleWhileRevalidateBackend отдаёт его, пока один запрос считает новый.
+    """
+
+    def tagged_key_builder(
+        func: Callable[..., Any],
+        namespace: str = "",
+        *,
+        request: Request | None = None,
+        response: Response | None = None,
+        args: tuple[Any, ...] = (),
+        kwargs: dict[str, Any] | None = None,
+    ) -> str:
+        kwargs = kwargs or {}
+        key = key_builder(
+            func, namespace, request=request, response=response, args=args, kwargs=kwargs
+        )
+        _pending_response.set(
+            PendingResponse(key, response_tags(tags, kwargs), time.time(), full_expire)
+        )
+        return key
+
+    full_expire = expire + settings.CACHE_STALE_SECONDS
+    decorator = cache(
+        expire=full_expire,
+        namespace=namespace,
+        key_builder=tagged_key_builder,
+    )
+    return lambda func: conditional_get(decorator(single_flight(func)))
+
+
+def payload_etag(payload: bytes) -> str:
+    """Strong ETag тела ответа: одинаковый у всех воркеров (в отличие от hash())."""
+    return f'"{hashlib.md5(payload).hexdigest()}"'  # noqa: S324
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match сравнивается слабо (RFC 9110): W/ у тегов клиента не важен."""
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+
+def cache_control() -> str:
+    """Браузер всегда перепроверяет ответ по ETag; CDN/nginx может держать его
+    CACHE_CDN_MAX_AGE_SECONDS и сбрасывать по Surrogate-Key."""
+    if not settings.CACHE_CDN_MAX_AGE_SECONDS:
+        return "public, no-cache"
+    return f"public, max-age=0, s-maxage={settings.CACHE_CDN_MAX_AGE_SECONDS}"
+
+
+def conditional_get(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    """Conditional GET поверх @cache: ETag из закэшированного тела, 304 на If-None-Match.
+
+    Тело берётся таким, каким оно лежит в кэше, — 304 отдаётся без сериализации ответа.
+    Surrogate-Key — теги ответа: CDN может сбросить, например, всё по `hotel:5`.
+    """
+    # @cache подставляет Request/Response в сигнатуру; без них (кэш выключен) — как есть
+    params = inspect.signature(endpoint).parameters.values()
+    request_param = next((p.name for p in params if p.annotation is Request), None)
+    response_param = next((p.name for p in params if p.annotation is Response), None)
+
+    @wraps(endpoint)
+    async def inner(*args: Any, **kwargs: Any) -> Any:
+        _response_payload.set(None)
+        result = await endpoint(*args, **kwargs)
+        payload = _response_payload.get()
+        request = kwargs.get(request_param) if request_param else None
+        response = kwargs.get(response_param) if response_param else None
+        if payload is None or request is None or response is None or isinstance(result, Response):
+            return result
+        headers = {"ETag": payload_etag(payload), "Cache-Control": cache_control()}
+        pending = _pending_response.get()
+        if pending is not None and pending.tags:
+            headers["Surrogate-Key"] = " ".join(pending.tags)
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+        response.headers.update(headers)
+        return result
+
+    return inner
+
+
+def tag_key(tag: str) -> str:
+    return f"{FastAPICache.get_prefix()}:tag:{tag}"
+
+
+def tag_mark_key(tag: str) -> str:
+    """Время последнего сброса тега — по нему set() отбрасывает ответ, посчитанный до сброса."""
+    return f"{FastAPICache.get_prefix()}:tag-invalidated:{tag}"
+
+
+def _mark_ttl() -> int:
+    # Отметку читают set() (идёт вычисление) и проверка устаревшего ответа — обоим
+    # хватает срока жизни ответа
+    return settings.CACHE_TTL_SECONDS + settings.CACHE_STALE_SECONDS
+
+
+def invalidation_channel() -> str:
+    """Pub/sub-канал, по которому воркеры сбрасывают ключи из L1."""
+    return f"{FastAPICache.get_prefix()}:invalidate"
+
+
+class LocalLRU:
+    """LRU процесса: у записи свой TTL, суммарный размер значений не больше max_bytes."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        # Растёт при каждом удалении: значение, прочитанное из L2 до удаления, в L1 не попадёт
+        self.generation = 0
+        self._entries: OrderedDict[str, tuple[bytes, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> tuple[int, bytes] | None:
+        """(оставшийся TTL, значение) или None, если записи нет или она истекла."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        ttl = expires_at - time.monotonic()
+        if ttl <= 0:
+            self._pop(key)
+            return None
+        self._entries.move_to_end(key)
+        return int(ttl) + 1, value
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._pop(key)
+        if ttl <= 0 or len(value) > self.max_bytes:
+            return
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self.size += len(value)
+        while self.size > self.max_bytes:
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+            CACHE_L1_EVICTIONS.labels(app_name="hotel_booking").inc()
+
+    def delete(self, *keys: str) -> None:
+        self.generation += 1
+        for key in keys:
+            self._pop(key)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._entries.clear()
+        self.size = 0
+
+    def _pop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[0])
+
+
+class TwoTierBackend(Backend):
+    """L1 — LocalLRU воркера, L2 — общий бэкенд (Redis).
+
+    Попадание в L1 не ходит в Redis. Удалённые ключи приходят по pub/sub
+    (invalidation_channel) — их публикует инвалидация тегов; listen() сбрасывает их из L1.
+    TTL записи в L1 не больше max_ttl: сообщение pub/sub может потеряться.
+    """
+
+    def __init__(self, backend: Backend, redis: Redis, max_bytes: int, max_ttl: int) -> None:
+        self.backend = backend
+        self.l1 = LocalLRU(max_bytes)
+        self._redis = redis
+        self._max_ttl = max_ttl
+
+    async def get_with_ttl(self, key: str) -> tuple[int, bytes | None]:
+        hit = self.l1.get(key)
+        if hit is not None:
+            CACHE_L1_HITS.labels(app_name="hotel_booking").inc()
+            return hit
+        CACHE_L1_MISSES.labels(app_name="hotel_booking").inc()
+        generation = self.l1.generation
+        ttl, value = await self.backend.get_with_ttl(key)
+        if value is not None and generation == self.l1.generation:
+            # TTL < 0 — ключ в Redis без срока жизни; 0 — устаревший ответ, в L1 не берём
+            self.l1.set(key, value, min(ttl, self._max_ttl) if ttl >= 0 else self._max_ttl)
+        return ttl, value
+
+    async def get(self, key: str) -> bytes | None:
+        return (await self.get_with_ttl(key))[1]
+
+    async def set(self, key: str, value: bytes, expire: int | None = None) -> None:
+        await self.backend.set(key, value, expire)
+        ttl = self._max_ttl
+        if expire:
+            # expire включает окно устаревания — в L1 только свежая часть, иначе L1
+            # отдавал бы устаревший ответ мимо пересчёта StaleWhileRevalidateBackend
+            ttl = min(max(expire - settings.CACHE_STALE_SECONDS, 0), ttl)
+        self.l1.set(key, value, ttl)
+
+    async def clear(self, namespace: str | None = None, key: str | None = None) -> int:
+        deleted = await self.backend.clear(namespace, key)
+        if key:
+            self.l1.delete(key)
+            await self._redis.publish(invalidation_channel(), key)
+        else:
+            # Ключи namespace воркер не знает — сбрасываем L1 целиком
+            self.l1.clear()
+            await self._redis.publish(invalidation_channel(), "*")
+        return deleted
+
+    async def listen(self) -> None:
+        """Сбрасывает из L1 ключи, удалённые любым процессом. Работает до отмены задачи."""
+        while True:
+            pubsub = self._redis.pubsub()
+            try:
+                await pubsub.subscribe(invalidation_channel())
+                # Пока подписки не было, сообщения могли потеряться
+                self.l1.clear()
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1)
+                    if message is not None:
+                        self._drop(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Cache L1 invalidation listener failed: %s", exc)
+                await asyncio.sleep(_L1_ERROR_BACKOFF_SECONDS)
+            finally:
+                await pubsub.aclose()
+
+    def _drop(self, data: bytes | str) -> None:
+        if isinstance(data, bytes):
+            data = data.decode()
+        if data == "*":
+            self.l1.clear()
+        else:
+            self.l1.delete(*data.split("\n"))
+
+
+class StaleWhileRevalidateBackend(Backend):
+    """Отдаёт устаревший ответ, пока его пересчитывает один запрос на весь кластер.
+
+    Ответ, которому осталось жить не больше grace секунд, устарел. Первый запрос, увидевший
+    это и взявший лок (отметка в воркере + Redis SET NX на lock_ttl), получает промах
+    и пересчитывает ответ; остальные получают старый с TTL 0. Лок снимает запись нового ответа,
+    при ошибке — истечение lock_ttl. TTL свежего ответа возвращается без grace.
+    """
+
+    def __init__(
+        self, backend: Backend, redis: Redis | None = None, *, grace: int, lock_ttl: int
+    ) -> None:
+        self.backend = backend
+        self._redis = redis
+        self._grace = grace
+        self._lock_ttl = lock_ttl
+        # Кэш-ключ → (до какого момента его пересчитывают, лок наш)
+        self._refreshing: dict[str, tuple[float, bool]] = {}
+
+    async def get_with_ttl(self, key: str) -> tuple[int, bytes | None]:
+        ttl, value = await self.backend.get_with_ttl(key)
+        if value is None or ttl < 0:
+            return ttl, value
+        if ttl > self._grace:
+            return ttl - self._grace, value
+        if await self._acquire(key):
+            return 0, None
+        return 0, value
+
+    async def get(self, key: str) -> bytes | None:
+        return (await self.get_with_ttl(key))[1]
+
+    async def set(self, key: str, value: bytes, expire: int | None = None) -> None:
+        await self.backend.set(key, value, expire)
+        _, owned = self._refreshing.pop(key, (0.0, False))
+        if owned and self._redis is not None:
+            await self._redis.delete(self._lock_key(key))
+
+    async def clear(self, namespace: str | None = None, key: str | None = None) -> int:
+        return await self.backend.clear(namespace, key)
+
+    async def _acquire(self, key: str) -> bool:
+        now = time.monotonic()
+        deadline, _ = self._refreshing.get(key, (0.0, False))
+        if deadline > now:
+            return False
+        if len(self._refreshing) >= _MAX_REFRESH_MARKS:
+            self._refreshing = {k: v for k, v in self._refreshing.items() if v[0] > now}
+        self._refreshing[key] = (now + self._lock_ttl, False)
+        if self._redis is not None and not await self._redis.set(
+            self._lock_key(key), 1, nx=True, ex=self._lock_ttl
+        ):
+            # Пересчитывает другой процесс; отметка держит остальные запросы воркера
+            return False
+        self._refreshing[key] = (now + self._lock_ttl, True)
+        return True
+
+    @staticmethod
+    def _lock_key(key: str) -> str:
+        return f"{key}:refresh"
+
+
+class TaggedBackend(Backend):
+    """Бэкенд fastapi-cache, который помнит теги закэшированных ответов.
+
+    При записи ответа его ключ добавляется в наборы тегов (Redis SET `<prefix>:tag:<tag>`,
+    без Redis — словарь процесса); invalidate(*tags) удаляет ключи из этих наборов.
+    Теги пишутся только на промахе — попадание стоит один GET, как и без тегов.
+
+    Запрос, начавшийся до записи в БД, может положить ответ уже после её invalidate().
+    Поэтому invalidate() отмечает время сброса тега, а set() удаляет ответ, вычисление
+    которого началось раньше отметки любого его тега. Так же отбрасывается и результат
+    фонового пересчёта устаревшего ответа.
+
+    Устаревший ответ (TTL 0 от StaleWhileRevalidateBackend) отдаётся, только если его теги
+    не сбрасывали за весь срок его хранения: когда именно он записан, неизвестно, поэтому
+    проверка с запасом — с частыми сбросами (availability) ответ просто пересчитывается.
+    """
+
+    def __init__(self, backend: Backend, redis: Redis | None = None) -> None:
+        self.backend = backend
+        self._redis = redis
+        self._local_tags: dict[str, set[str]] = {}
+        self._local_marks: dict[str, float] = {}
+
+    async def get_with_ttl(self, key: str) -> tuple[int, bytes | None]:
+        ttl, value = await self.backend.get_with_ttl(key)
+        if value is not None and ttl == 0 and await self._stale_outdated(key):
+            return 0, None
+        if value is not None:
+            _response_payload.set(value)
+        return ttl, value
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.backend.get(key)
+
+    async def _stale_outdated(self, key: str) -> bool:
+        """Теги устаревшего ответа сбрасывали, пока он мог храниться, — не отдавать его."""
+        pending = _pending_response.get()
+        if pending is None or pending.key != key or not pending.tags:
+            return False
+        since = pending.started_at - pending.expire - _CLOCK_SKEW_SECONDS
+        if self._redis is None:
+            return any(self._local_marks.get(tag, 0.0) >= since for tag in pending.tags)
+        marks = await self._redis.mget([tag_mark_key(tag) for tag in pending.tags])
+        return any(mark is not None and float(mark) >= since for mark in marks)
+
+    async def set(self, key: str, value: bytes, expire: int | None = None) -> None:
+        await self.backend.set(key, value, expire)
+        pending = _pending_response.get()
+        if pending is None or pending.key != key:
+            return
+        _response_payload.set(value)
+        if not pending.tags:
+            return
+        started_at = pending.started_at - _CLOCK_SKEW_SECONDS
+        if self._redis is None:
+            if any(self._local_marks.get(tag, 0.0) >= started_at for tag in pending.tags):
+                await self.backend.clear(key=key)
+                return
+            for tag in pending.tags:
+                self._local_tags.setdefault(tag, set()).add(key)
+            return
+        keys = [tag_key(tag) for tag in pending.tags]
+        keys += [tag_mark_key(tag) for tag in pending.tags]
+        try:
+            tagged = await self._redis.eval(
+                _TAG_KEY, len(keys), *keys, key, expire or 0, started_at, invalidation_channel()
+            )
+        except Exception:
+            # Ответ без тегов не сбросила бы ни одна запись — лучше промах
+            await self.backend.clear(key=key)
+            raise
+        if not tagged and isinstance(self.backend, TwoTierBackend):
+            self.backend.l1.delete(key)
+
+    async def clear(self, namespace: str | None = None, key: str | None = None) -> int:
+        return await self.backend.clear(namespace, key)
+
+    async def invalidate(self, *tags: str) -> int:
+        """Удаляет ответы с любым из тегов. Возвращает число удалённых ответов."""
+        if self._redis is None:
+            deleted = 0
+            now = time.time()
+            for tag in tags:
+                self._local_marks[tag] = now
+                for key in self._local_tags.pop(tag, ()):
+                    deleted += await self.backend.clear(key=key)
+            return deleted
+        keys = [tag_key(tag) for tag in tags] + [tag_mark_key(tag) for tag in tags]
+        removed = await self._redis.eval(
+            _INVALIDATE_TAGS, len(keys), *keys, invalidation_channel(), _mark_ttl()
+        )
+        if isinstance(self.backend, TwoTierBackend):
+            # Не ждём своего же сообщения pub/sub: следующий запрос воркера не увидит старое
+            self.backend.l1.delete(*(key.decode() for key in removed))
+        return len(removed)
+
+
+CACHE_PREFIX = "fastapi-cache"
+
+
+def init_cache(redis: Redis | None, *, l1: bool = False) -> TwoTierBackend | None:
+    """FastAPICache.init со стеком бэкендов приложения: теги → [L1] → stale-while-revalidate →
+    Redis (без Redis — память процесса). Возвращает L1, если он включён: его listen()
+    запускает вызывающий."""
+    if redis is None:
+        backend: Backend = StaleWhileRevalidateBackend(
+            InMemoryBackend(),
+            grace=settings.CACHE_STALE_SECONDS,
+            lock_ttl=settings.CACHE_REFRESH_LOCK_SECONDS,
+        )
+        FastAPICache.init(TaggedBackend(backend), prefix=CACHE_PREFIX)
+        return None
+    backend = StaleWhileRevalidateBackend(
+        RedisBackend(redis),
+        redis,
+        grace=settings.CACHE_STALE_SECONDS,
+        lock_ttl=settings.CACHE_REFRESH_LOCK_SECONDS,
+    )
+    local = None
+    if l1:
+        backend = local = TwoTierBackend(
+            backend,
+            redis,
+            max_bytes=settings.CACHE_L1_MAX_BYTES,
+            max_ttl=settings.CACHE_L1_TTL_SECONDS,
+        )
+    FastAPICache.init(TaggedBackend(backend, redis), prefix=CACHE_PREFIX)
+    return local
+
+
+def _refresh_request() -> Request:
+    # Cache-Control: no-cache — @cache пересчитывает ответ, даже если он ещё в кэше
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/",
+            "query_string": b"",
+            "headers": [(b"cache-control", b"no-cache")],
+        }
+    )
+
+
+async def refresh_cached(endpoint: Callable[..., Any], **params: Any) -> None:
+    """Пересчитывает и кладёт в кэш ответ @cached-эндпоинта на запрос с params.
+
+    Ключ и теги строит сам декоратор — те же, что у такого HTTP-запроса. Не переданные
+    параметры берутся из значений по умолчанию (`Query(...)`), как их подставил бы FastAPI.
+    """
+    kwargs: dict[str, Any] = {}
+    for param in inspect.signature(endpoint).parameters.values():
+        if param.annotation is Request:
+            kwargs[param.name] = _refresh_request()
+        elif param.name in params:
+            kwargs[param.name] = params[param.name]
+        elif isinstance(param.default, FieldInfo):
+            kwargs[param.name] = param.default.default
+        elif param.default is not inspect.Parameter.empty:
+            kwargs[param.name] = param.default
+    await endpoint(**kwargs)
+
+
+async def invalidate_cache(*tags: str) -> None:
+    """Сбрасывает ответы с тегами. Best-effort: ошибки кэша не ломают запись."""
+    try:
+        backend = FastAPICache.get_backend()
+        if isinstance(backend, TaggedBackend):
+            await backend.invalidate(*tags)
+    except Exception as exc:
+        logger.warning("Cache invalidation failed for tags %s: %s", tags, exc)
+
+
+async def invalidate_cache_from_task(*tags: str) -> None:
+    """invalidate_cache() из процесса без кэша приложения (Celery, CLI).
+
+    Подключается к Redis на время сброса и поднимает тот же стек бэкендов, что и API
+    (как `_warm_cache`). Вызывать после коммита: отметки тегов читает API при отдаче.
+    """
+    try:
+        await redis_manager.connect()
+        try:
+            init_cache(redis_manager.redis)
+            await invalidate_cache(*tags)
+        finally:
+            await redis_manager.close()
+    except Exception as exc:
+        logger.warning("Cache invalidation failed for tags %s: %s", tags, exc)
+
+
+def hotel_availability_tags(*hotel_ids: int) -> list[str]:
+    """Теги ответов, зависящих от занятости номеров отелей: их календари и ответы с датами,
+    а также выдачи с датами по всем отелям (см. response_tags)."""
+    return [*(CALENDAR_TAG.format(hotel_id=hotel_id) for hotel_id in hotel_ids), AVAILABILITY_TAG]
+
+
+async def invalidate_hotel_availability(hotel_id: int) -> None:
+    """После изменения занятости номеров отеля: его календари и все выдачи с датами."""
+    await invalidate_cache(*hotel_availability_tags(hotel_id))
@@ -73,9 +73,64 @@ class Settings(BaseSettings):
     METRICS_ENABLED: bool = True
     METRICS_TOKEN: str | None = None  # если задан — /metrics требует Authorization: Bearer <token>
 
+    # Кэш GET-ответов: записи сбрасывают его по тегам (src/cache.py), TTL — страховка
+    # для изменений в обход сервисов (Celery-задачи, ручные правки БД)
+    CACHE_TTL_SECONDS: int = 300
+    # Stale-while-revalidate: после TTL ответ ещё столько отдаётся устаревшим, пока один
+    # запрос (лок в Redis на CACHE_REFRESH_LOCK_SECONDS) считает новый
+    CACHE_STALE_SECONDS: int = 60
+    CACHE_REFRESH_LOCK_SECONDS: int = 10
+    # s-maxage для nginx/CDN (сброс — по заголовку Surrogate-Key); 0 — только перепроверка по ETag
+    CACHE_CDN_MAX_AGE_SECONDS: int = 0
+    # Прогрев горячих ответов (beat + старт приложения): чаще TTL, чтобы они не истекали
+    CACHE_WARM_INTERVAL_SECONDS: int = 240
+    CACHE_WARM_CITIES: int = 5  # первые города рейтинга популярных локаций
+    CACHE_WARM_WEEKENDS: int = 3  # ближайшие выходные (пт–вс) для поиска по этим городам
+    # L1 — LRU в памяти воркера перед Redis; ключи сбрасываются по pub/sub
+    CACHE_L1_ENABLED: bool = True
+    CACHE_L1_MAX_BYTES: int = 32 * 1024 * 1024
+    CACHE_L1_TTL_SECONDS: int = 30  # потолок TTL в L1 на случай потерянного сообщения
+
+    # Booking holds (временное удержание номера на время оформления)
+    BOOKING_HOLD_TTL_MINUTES: int = 10
+    BOOKING_HOLDS_SWEEP_SECONDS: int = 60  # как часто beat снимает истёкшие холды
+
+    # Очередь бронирований (Redis streams по номерам, consumer — src.booking_queue)
+    BOOKING_QUEUE_ENABLED: bool = False
+    BOOKING_QUEUE_BATCH_SIZE: int = 100  # заявок одного номера на транзакцию
+    BOOKING_QUEUE_RESULT_TTL_SECONDS: int = 900  # сколько хранится статус заявки
+
+    # Поиск отелей (?search=): fts — tsvector russian (словоформы, ts_rank),
+    # trigram — pg_trgm (опечатки), substring — LIKE без индексов
+    HOTEL_SEARCH_MODE: Literal["fts", "trigram", "substring"] = "fts"
+    HOTEL_SEARCH_SIMILARITY_THRESHOLD: float = 0.3  # порог word_similarity для оператора <%
+    # Фасеты /hotels/facets: нижние границы диапазонов цены «от» и вместимости
+    HOTEL_FACET_PRICE_BANDS: list[int] = [0, 3000, 5000, 10000, 20000]
+    HOTEL_FACET_CAPACITY_BANDS: list[int] = [1, 2, 3, 5]
+    HOTEL_FACET_CITIES_LIMIT: int = 20
+
+    # Популярные локации: рейтинг городов пересчитывает beat (таблица popular_locations)
+    POPULAR_LOCATIONS_REFRESH_SECONDS: int = 3600
+    POPULAR_LOCATIONS_BOOKINGS_DAYS: int = 90  # окно спроса: брони с заездом за N дней и позже
+
+    # Гео-поиск (?near=lat,lon): earthdistance, GiST-индекс ix_hotels_earth
+    GEO_DEFAULT_RADIUS_KM: float = 50
+    GEO_MAX_RADIUS_KM: float = 500
+    # Геокодер адресов отелей (Nominatim-совместимый /search); не задан — координаты вручную
+    GEOCODER_URL: str | None = None
+    GEOCODER_USER_AGENT: str = "hotel-booking-app"
+    GEOCODER_MIN_INTERVAL_SECONDS: float = 1.0  # пауза между запросами backfill
+
     # Elasticsearch
     ELASTICSEARCH_URL: str = "http://localhost:9200"
     ES_ENABLED: bool = True
+    # Сколько ID списка отелей берём из ES; при большем числе совпадений ищет PostgreSQL
+    ES_SEARCH_MAX_HITS: int = 1000
+
+    # In-process availability engine (календарь занятости в памяти воркера, LISTEN/NOTIFY)
+    AVAILABILITY_ENGINE_ENABLED: bool = False
+    AVAILABILITY_WINDOW_DAYS: int = 365  # горизонт календаря; дальше — запрос в PostgreSQL
+    AVAILABILITY_RELOAD_SECONDS: int = 3600  # полная перезагрузка (сдвиг окна, защита от дрейфа)
 
     # Tracing (OpenTelemetry → Tempo)
     OTEL_ENABLED: bool = False
@@ -132,3 +132,46 @@ async def autocomplete(es: AsyncElasticsearch, q: str, limit: int = 5) -> dict:
     ]
 
     return {"locations": locations, "hotels": hotels}
+
+
+async def search_ids(
+    es: AsyncElasticsearch,
+    search: str | None = None,
+    city: str | None = None,
+    title: str | None = None,
+    limit: int = 1000,
+) -> list[int] | None:
+    """ID отелей по текстовой части запроса списка — по убыванию релевантности.
+
+    Как и в PostgreSQL, city/title учитываются только без search. Даты и гостей ES
+    не знает: их применяет PostgreSQL, загружая только эти ID.
+    None — совпадений больше limit: обрезанный список дал бы неверный total и пустые
+    страницы после limit-го отеля, такой запрос ищет PostgreSQL.
+    """
+    must = []
+    if search:
+        must.append(
+            {
+                "multi_match": {
+                    "query": search,
+                    "fields": ["title^3", "city^2", "address"],
+                    "fuzziness": "AUTO",
+                }
+            }
+        )
+    filters = [
+        {"match": {field: {"query": value, "operator": "and"}}}
+        for field, value in (("city", city), ("title", title))
+        if value and not search
+    ]
+    resp = await es.search(
+        index=INDEX,
+        size=limit,
+        source=False,
+        # Точный счёт не нужен — только понять, уместились ли все совпадения в limit
+        track_total_hits=limit + 1,
+        query={"bool": {"must": must, "filter": filters}},
+    )
+    if resp["hits"]["total"]["value"] > limit:
+        return None
+    return [int(h["_id"]) for h in resp["hits"]["hits"]]
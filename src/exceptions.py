@@ -115,6 +115,34 @@ class CorruptedImageException(NabronirovalException):
     detail = "Повреждённый или неверный файл изображения!"
 
 
+class BookingHoldNotFoundException(NabronirovalException):
+    detail = "Холд не найден или уже истёк!"
+
+
+class BookingTicketNotFoundException(NabronirovalException):
+    detail = "Заявка на бронирование не найдена или устарела!"
+
+
+class BookingQueueDisabledException(NabronirovalException):
+    detail = "Очередь бронирований отключена!"
+
+
+class InvalidCursorException(NabronirovalException):
+    detail = "Некорректный курсор пагинации!"
+
+
+class InvalidGeoPointException(NabronirovalException):
+    detail = "Параметр near должен быть в формате «широта,долгота»!"
+
+
+class GeoPointRequiredException(NabronirovalException):
+    detail = "Сортировка по расстоянию требует параметр near!"
+
+
+class InvalidFacilityIdsException(NabronirovalException):
+    detail = "Параметр facilities должен быть списком ID через запятую!"
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Domain helper (поднимает domain-исключение, не HTTP!)
 # ──────────────────────────────────────────────────────────────────────────────
@@ -273,6 +301,41 @@ class ImageNotFoundHTTPException(NabronirovalHTTPException):
     detail = "Изображение не найдено!"
 
 
+class BookingHoldNotFoundHTTPException(NabronirovalHTTPException):
+    status_code = 404
+    detail = "Холд не найден или уже истёк!"
+
+
+class BookingTicketNotFoundHTTPException(NabronirovalHTTPException):
+    status_code = 404
+    detail = "Заявка на бронирование не найдена или устарела!"
+
+
+class BookingQueueDisabledHTTPException(NabronirovalHTTPException):
+    status_code = 503
+    detail = "Очередь бронирований отключена!"
+
+
+class InvalidCursorHTTPException(NabronirovalHTTPException):
+    status_code = 400
+    detail = "Некорректный курсор пагинации!"
+
+
+class InvalidGeoPointHTTPException(NabronirovalHTTPException):
+    status_code = 422
+    detail = "Параметр near должен быть в формате «широта,долгота»!"
+
+
+class GeoPointRequiredHTTPException(NabronirovalHTTPException):
+    status_code = 422
+    detail = "Сортировка по расстоянию требует параметр near!"
+
+
+class InvalidFacilityIdsHTTPException(NabronirovalHTTPException):
+    status_code = 422
+    detail = "Параметр facilities должен быть списком ID через запятую!"
+
+
 # Confirmation token exceptions
 class ConfirmationTokenNotFoundException(NabronirovalException):
     detail = "Ссылка для подтверждения недействительна или уже использована!"
@@ -0,0 +1,43 @@
+"""Геоточки: разбор `near=lat,lon` и геокодирование адреса отеля."""
+
+import math
+
+import httpx
+
+from src.config import settings
+from src.exceptions import InvalidGeoPointException
+
+
+def parse_geo_point(value: str) -> tuple[float, float]:
+    """`"43.58,39.72"` → (широта, долгота). Бросает InvalidGeoPointException."""
+    try:
+        lat_raw, lon_raw = value.split(",")
+        lat, lon = float(lat_raw), float(lon_raw)
+    except ValueError:
+        raise InvalidGeoPointException()
+    if not (math.isfinite(lat) and math.isfinite(lon)):
+        raise InvalidGeoPointException()
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise InvalidGeoPointException()
+    return lat, lon
+
+
+async def geocode(city: str, address: str | None) -> tuple[float, float] | None:
+    """Координаты адреса через Nominatim-совместимый GEOCODER_URL.
+
+    None — геокодер не настроен или адрес не найден; сетевые ошибки пробрасываются.
+    """
+    if not settings.GEOCODER_URL:
+        return None
+    query = ", ".join(part for part in (address, city) if part)
+    async with httpx.AsyncClient(
+        timeout=10.0, headers={"User-Agent": settings.GEOCODER_USER_AGENT}
+    ) as client:
+        response = await client.get(
+            settings.GEOCODER_URL, params={"q": query, "format": "jsonv2", "limit": 1}
+        )
+        response.raise_for_status()
+    results = response.json()
+    if not results:
+        return None
+    return float(results[0]["lat"]), float(results[0]["lon"])
@@ -1,5 +1,6 @@
+import asyncio
 import logging
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 from pathlib import Path
 
 import sentry_sdk
@@ -10,8 +11,6 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.routing import APIRoute
 from fastapi.staticfiles import StaticFiles
-from fastapi_cache import FastAPICache
-from fastapi_cache.backends.redis import RedisBackend
 from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
@@ -30,9 +29,12 @@ from src.api.images import router as router_images
 from src.api.rooms import router as router_rooms
 from src.exception_handlers import validation_exception_handler
 from src.init import redis_manager
+from src.availability.client import init_availability, close_availability
 from src.elastic.client import init_es, close_es
 from src.elastic import hotels as es_hotels
 from src.limiter import limiter
+from src.cache import init_cache
+from src.tasks.cache import warm_cache_on_startup
 from src.config import settings
 from src.logging_config import setup_logging
 from src.middleware.json_error_handler import JSONErrorHandlerMiddleware
@@ -95,22 +97,31 @@ async def _es_startup() -> None:
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    l1_listener = None
     try:
         await redis_manager.connect()
         if not await redis_manager.ping():
             raise ConnectionError("Redis не отвечает на ping")
-        FastAPICache.init(RedisBackend(redis_manager.redis), prefix="fastapi-cache")
-        logging.info("Cache: Redis backend")
+        l1 = init_cache(redis_manager.redis, l1=settings.CACHE_L1_ENABLED)
+        if l1 is not None:
+            l1_listener = asyncio.create_task(l1.listen())
+        logging.info("Cache: Redis backend (L1: %s)", settings.CACHE_L1_ENABLED)
     except Exception as e:
         logging.warning(f"Redis недоступен, включается InMemory-кеш: {e}")
-        from fastapi_cache.backends.inmemory import InMemoryBackend
-
-        FastAPICache.init(InMemoryBackend(), prefix="fastapi-cache")
+        init_cache(None)
 
     await _es_startup()
+    await init_availability()
+    warmup = asyncio.create_task(warm_cache_on_startup())
 
     yield
 
+    for task in (warmup, l1_listener):
+        if task is not None:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+    await close_availability()
     await redis_manager.close()
     await close_es()
 
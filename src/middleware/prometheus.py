@@ -56,6 +56,21 @@ SEARCH_REQUESTS = Counter(
     "Total number of hotel search requests",
     ["app_name"],
 )
+CACHE_L1_HITS = Counter(
+    "hotel_booking_cache_l1_hits_total",
+    "Total number of cache lookups served from the worker in-memory LRU.",
+    ["app_name"],
+)
+CACHE_L1_MISSES = Counter(
+    "hotel_booking_cache_l1_misses_total",
+    "Total number of cache lookups that fell through to Redis.",
+    ["app_name"],
+)
+CACHE_L1_EVICTIONS = Counter(
+    "hotel_booking_cache_l1_evictions_total",
+    "Total number of entries evicted from the worker in-memory LRU by its size cap.",
+    ["app_name"],
+)
 
 EXCLUDED_PATHS = {"/metrics", "/api/v1/health/live"}
 
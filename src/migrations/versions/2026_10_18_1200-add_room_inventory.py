@@ -0,0 +1,45 @@
+"""add room_inventory (per-night booked counts)
+
+Revision ID: f6a7b8c9d0e1
+Revises: d4e5f6a7b8c0
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "f6a7b8c9d0e1"
+down_revision: Union[str, None] = "d4e5f6a7b8c0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "room_inventory",
+        sa.Column("room_id", sa.Integer(), nullable=False),
+        sa.Column("night", sa.Date(), nullable=False),
+        sa.Column("booked_count", sa.Integer(), server_default="0", nullable=False),
+        sa.ForeignKeyConstraint(["room_id"], ["rooms.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("room_id", "night"),
+        sa.CheckConstraint("booked_count >= 0", name="ck_room_inventory_booked_count"),
+    )
+    op.create_index("ix_room_inventory_night", "room_inventory", ["night"])
+
+    # Backfill: каждая бронь занимает ночи [date_from, date_to)
+    op.execute("""
+        INSERT INTO room_inventory (room_id, night, booked_count)
+        SELECT b.room_id, n.night::date, count(*)
+        FROM bookings b
+        JOIN generate_series(b.date_from, b.date_to - 1, interval '1 day') AS n(night) ON true
+        GROUP BY b.room_id, n.night::date
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_room_inventory_night", table_name="room_inventory")
+    op.drop_table("room_inventory")
@@ -0,0 +1,54 @@
+"""add booking_holds (temporary holds with TTL)
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6a7b8c9d0e1
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "a7b8c9d0e1f2"
+down_revision: Union[str, None] = "f6a7b8c9d0e1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "booking_holds",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("room_id", sa.Integer(), nullable=False),
+        sa.Column("date_from", sa.Date(), nullable=False),
+        sa.Column("date_to", sa.Date(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["room_id"], ["rooms.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_booking_holds_expires_at"), "booking_holds", ["expires_at"], unique=False
+    )
+
+
+def downgrade() -> None:
+    # Холды занимают ночи в room_inventory — освобождаем их до удаления таблицы
+    op.execute("""
+        UPDATE room_inventory ri
+        SET booked_count = ri.booked_count - h.cnt
+        FROM (
+            SELECT room_id, n.night::date AS night, count(*) AS cnt
+            FROM booking_holds
+            JOIN generate_series(date_from, date_to - 1, interval '1 day') AS n(night) ON true
+            GROUP BY room_id, n.night::date
+        ) h
+        WHERE ri.room_id = h.room_id AND ri.night = h.night
+    """)
+    op.drop_index(op.f("ix_booking_holds_expires_at"), table_name="booking_holds")
+    op.drop_table("booking_holds")
@@ -0,0 +1,46 @@
+"""add bookings.stay daterange with GiST index
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "b8c9d0e1f2a3"
+down_revision: Union[str, None] = "a7b8c9d0e1f2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # GiST по (room_id integer, stay daterange) требует btree_gist
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.add_column(
+        "bookings",
+        sa.Column(
+            "stay",
+            postgresql.DATERANGE(),
+            sa.Computed("daterange(date_from, date_to, '[)')", persisted=True),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_bookings_room_id_stay",
+        "bookings",
+        ["room_id", "stay"],
+        postgresql_using="gist",
+    )
+    op.create_index("ix_bookings_date_from", "bookings", ["date_from"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_bookings_date_from", table_name="bookings")
+    op.drop_index("ix_bookings_room_id_stay", table_name="bookings")
+    op.drop_column("bookings", "stay")
@@ -0,0 +1,38 @@
+"""add trigram GIN indexes on lower(title/city/address) for hotel search
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "c9d0e1f2a3b4"
+down_revision: Union[str, None] = "b8c9d0e1f2a3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Старые индексы из 896c5d07d433: по title без lower() поиск их не использует,
+    # а location удалена вместе с индексом при разделении на city/address
+    op.execute("DROP INDEX IF EXISTS idx_hotels_title_trgm")
+    op.execute("DROP INDEX IF EXISTS idx_hotels_location_trgm")
+    for column in ("title", "city", "address"):
+        op.execute(
+            f"CREATE INDEX ix_hotels_{column}_trgm ON hotels "
+            f"USING gin (lower({column}) gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    for column in ("address", "city", "title"):
+        op.execute(f"DROP INDEX IF EXISTS ix_hotels_{column}_trgm")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_hotels_title_trgm ON hotels USING gin (title gin_trgm_ops)"
+    )
@@ -0,0 +1,77 @@
+"""add hotel_summary read model (min_price, max_capacity, rooms_count, facility_ids, cover)
+
+Revision ID: e1f2a3b4c5d6
+Revises: d0e1f2a3b4c5
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "e1f2a3b4c5d6"
+down_revision: Union[str, None] = "d0e1f2a3b4c5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "hotel_summary",
+        sa.Column("hotel_id", sa.Integer(), nullable=False),
+        sa.Column("min_price", sa.Integer(), nullable=True),
+        sa.Column("max_capacity", sa.Integer(), nullable=True),
+        sa.Column("rooms_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column(
+            "facility_ids", postgresql.ARRAY(sa.Integer()), server_default="{}", nullable=False
+        ),
+        sa.Column("cover_image_url", sa.String(length=600), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["hotel_id"], ["hotels.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("hotel_id"),
+    )
+    op.create_index("ix_hotel_summary_min_price", "hotel_summary", ["min_price", "hotel_id"])
+    op.create_index("ix_hotel_summary_max_capacity", "hotel_summary", ["max_capacity"])
+    op.create_index(
+        "ix_hotel_summary_facility_ids",
+        "hotel_summary",
+        ["facility_ids"],
+        postgresql_using="gin",
+    )
+    # Начальное заполнение; дальше сводку ведёт HotelSummaryRepository.refresh
+    op.execute(
+        """
+        INSERT INTO hotel_summary
+            (hotel_id, min_price, max_capacity, rooms_count, facility_ids, cover_image_url)
+        SELECT
+            h.id,
+            min(r.price),
+            max(r.capacity),
+            count(r.id),
+            coalesce(
+                (SELECT array_agg(DISTINCT rf.facility_id)
+                 FROM rooms_facilities rf JOIN rooms r2 ON r2.id = rf.room_id
+                 WHERE r2.hotel_id = h.id),
+                '{}'
+            ),
+            (SELECT '/static/images/' || hi.filename
+             FROM hotel_images hi
+             WHERE hi.hotel_id = h.id
+             ORDER BY hi.id
+             LIMIT 1)
+        FROM hotels h
+        LEFT JOIN rooms r ON r.hotel_id = h.id
+        GROUP BY h.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_hotel_summary_facility_ids", table_name="hotel_summary")
+    op.drop_index("ix_hotel_summary_max_capacity", table_name="hotel_summary")
+    op.drop_index("ix_hotel_summary_min_price", table_name="hotel_summary")
+    op.drop_table("hotel_summary")
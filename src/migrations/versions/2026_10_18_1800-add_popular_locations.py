@@ -0,0 +1,56 @@
+"""add popular_locations (city ranking by bookings and hotel count)
+
+Revision ID: f2a3b4c5d6e7
+Revises: e1f2a3b4c5d6
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "f2a3b4c5d6e7"
+down_revision: Union[str, None] = "e1f2a3b4c5d6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "popular_locations",
+        sa.Column("city", sa.String(), nullable=False),
+        sa.Column("hotels_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("bookings_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("city"),
+    )
+    op.create_index(
+        "ix_popular_locations_rank",
+        "popular_locations",
+        [sa.text("bookings_count DESC"), sa.text("hotels_count DESC"), "city"],
+    )
+    # Начальное заполнение (окно спроса — POPULAR_LOCATIONS_BOOKINGS_DAYS по умолчанию);
+    # дальше рейтинг пересчитывает beat-задача refresh_popular_locations
+    op.execute(
+        """
+        INSERT INTO popular_locations (city, hotels_count, bookings_count)
+        SELECT h.city, h.hotels_count, coalesce(b.bookings_count, 0)
+        FROM (SELECT city, count(*) AS hotels_count FROM hotels GROUP BY city) h
+        LEFT JOIN (
+            SELECT hotels.city, count(*) AS bookings_count
+            FROM bookings
+            JOIN rooms ON rooms.id = bookings.room_id
+            JOIN hotels ON hotels.id = rooms.hotel_id
+            WHERE bookings.date_from >= current_date - 90
+            GROUP BY hotels.city
+        ) b ON b.city = h.city
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_popular_locations_rank", table_name="popular_locations")
+    op.drop_table("popular_locations")
@@ -0,0 +1,42 @@
+"""add hotels latitude/longitude with earthdistance GiST index
+
+Revision ID: a3b4c5d6e7f8
+Revises: f2a3b4c5d6e7
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "a3b4c5d6e7f8"
+down_revision: Union[str, None] = "f2a3b4c5d6e7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # earthdistance (ll_to_earth, earth_box, earth_distance) строится поверх cube
+    op.execute("CREATE EXTENSION IF NOT EXISTS cube")
+    op.execute("CREATE EXTENSION IF NOT EXISTS earthdistance")
+    op.add_column("hotels", sa.Column("latitude", sa.Float(), nullable=True))
+    op.add_column("hotels", sa.Column("longitude", sa.Float(), nullable=True))
+    op.create_check_constraint(
+        "ck_hotels_coordinates_pair", "hotels", "(latitude IS NULL) = (longitude IS NULL)"
+    )
+    op.create_index(
+        "ix_hotels_earth",
+        "hotels",
+        [sa.text("ll_to_earth(latitude, longitude)")],
+        postgresql_using="gist",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_hotels_earth", table_name="hotels")
+    op.drop_constraint("ck_hotels_coordinates_pair", "hotels", type_="check")
+    op.drop_column("hotels", "longitude")
+    op.drop_column("hotels", "latitude")
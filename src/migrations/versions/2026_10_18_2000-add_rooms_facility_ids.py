@@ -0,0 +1,51 @@
+"""add rooms.facility_ids (denormalized rooms_facilities) with GIN index
+
+Revision ID: b4c5d6e7f8a9
+Revises: a3b4c5d6e7f8
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "b4c5d6e7f8a9"
+down_revision: Union[str, None] = "a3b4c5d6e7f8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "rooms",
+        sa.Column(
+            "facility_ids", postgresql.ARRAY(sa.Integer()), server_default="{}", nullable=False
+        ),
+    )
+    op.execute(
+        """
+        UPDATE rooms r
+        SET facility_ids = rf.ids
+        FROM (
+            SELECT room_id, array_agg(facility_id ORDER BY facility_id) AS ids
+            FROM rooms_facilities
+            GROUP BY room_id
+        ) rf
+        WHERE rf.room_id = r.id
+        """
+    )
+    op.create_index(
+        "ix_rooms_facility_ids",
+        "rooms",
+        ["facility_ids"],
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_rooms_facility_ids", table_name="rooms")
+    op.drop_column("rooms", "facility_ids")
@@ -0,0 +1,29 @@
+"""add bookings.queue_ticket with unique constraint (idempotent queue intake)
+
+Revision ID: c5d6e7f8a9b0
+Revises: b4c5d6e7f8a9
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "c5d6e7f8a9b0"
+down_revision: Union[str, None] = "b4c5d6e7f8a9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("bookings", sa.Column("queue_ticket", sa.String(32), nullable=True))
+    # NULL у броней не из очереди уникальности не нарушает
+    op.create_unique_constraint("uq_bookings_queue_ticket", "bookings", ["queue_ticket"])
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_bookings_queue_ticket", "bookings", type_="unique")
+    op.drop_column("bookings", "queue_ticket")
@@ -1,16 +1,24 @@
 from src.models.hotels import HotelsOrm
 from src.models.hotel_images import HotelImagesOrm
+from src.models.hotel_summary import HotelSummaryOrm
 from src.models.rooms import RoomsOrm
 from src.models.users import UsersOrm
 from src.models.bookings import BookingsOrm
 from src.models.facilities import FacilitiesOrm
+from src.models.room_inventory import RoomInventoryOrm
+from src.models.booking_holds import BookingHoldsOrm
+from src.models.popular_locations import PopularLocationsOrm
 
 
 __all__ = [
     "HotelsOrm",
     "HotelImagesOrm",
+    "HotelSummaryOrm",
     "RoomsOrm",
     "UsersOrm",
     "BookingsOrm",
     "FacilitiesOrm",
+    "RoomInventoryOrm",
+    "BookingHoldsOrm",
+    "PopularLocationsOrm",
 ]
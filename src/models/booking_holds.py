@@ -0,0 +1,24 @@
+from datetime import date, datetime
+
+from sqlalchemy import ForeignKey, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.database import Base
+
+
+class BookingHoldsOrm(Base):
+    """Временный холд номера на время оформления брони.
+
+    Занимает ночи в room_inventory так же, как бронь, поэтому все проверки доступности
+    его учитывают. Подтверждение превращает холд в бронь, истёкшие снимает beat-задача.
+    """
+
+    __tablename__ = "booking_holds"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    room_id: Mapped[int] = mapped_column(ForeignKey("rooms.id", ondelete="CASCADE"))
+    date_from: Mapped[date]
+    date_to: Mapped[date]
+    expires_at: Mapped[datetime] = mapped_column(index=True)
+    created_at: Mapped[datetime] = mapped_column(server_default=func.now())
@@ -1,6 +1,7 @@
 from datetime import date, datetime
 from sqlalchemy.ext.hybrid import hybrid_property
-from sqlalchemy import ForeignKey, func
+from sqlalchemy import Computed, ForeignKey, Index, String, UniqueConstraint, func
+from sqlalchemy.dialects.postgresql import DATERANGE, Range
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.database import Base
@@ -8,6 +9,12 @@ from src.database import Base
 
 class BookingsOrm(Base):
     __tablename__ = "bookings"
+    __table_args__ = (
+        # btree_gist: room_id (btree-оператор) + stay (&&) в одном GiST-индексе
+        Index("ix_bookings_room_id_stay", "room_id", "stay", postgresql_using="gist"),
+        Index("ix_bookings_date_from", "date_from"),
+        UniqueConstraint("queue_ticket", name="uq_bookings_queue_ticket"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
@@ -15,6 +22,12 @@ class BookingsOrm(Base):
     date_from: Mapped[date]
     date_to: Mapped[date]
     price: Mapped[int]
+    # Период проживания [date_from, date_to) — для пересечений через `&&`
+    stay: Mapped[Range[date]] = mapped_column(
+        DATERANGE, Computed("daterange(date_from, date_to, '[)')", persisted=True)
+    )
+    # Тикет заявки из очереди: повторная доставка той же заявки не создаёт вторую бронь
+    queue_ticket: Mapped[str | None] = mapped_column(String(32), nullable=True)
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(server_default=func.now(), onupdate=func.now())
 
@@ -0,0 +1,35 @@
+from datetime import datetime
+
+from sqlalchemy import ForeignKey, Index, Integer, String, func
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.database import Base
+
+
+class HotelSummaryOrm(Base):
+    """Сводка отеля для списка: цена «от», вместимость, число номеров, удобства, обложка.
+
+    Read model: пересчитывается HotelSummaryRepository.refresh в транзакции, меняющей
+    номера, удобства или изображения отеля; источник истины — rooms, rooms_facilities
+    и hotel_images.
+    """
+
+    __tablename__ = "hotel_summary"
+    __table_args__ = (
+        # (min_price, hotel_id) — сортировка sort_by=price и keyset-курсор по ней
+        Index("ix_hotel_summary_min_price", "min_price", "hotel_id"),
+        Index("ix_hotel_summary_max_capacity", "max_capacity"),
+        Index("ix_hotel_summary_facility_ids", "facility_ids", postgresql_using="gin"),
+    )
+
+    hotel_id: Mapped[int] = mapped_column(
+        ForeignKey("hotels.id", ondelete="CASCADE"), primary_key=True
+    )
+    # NULL — у отеля нет номеров
+    min_price: Mapped[int | None]
+    max_capacity: Mapped[int | None]
+    rooms_count: Mapped[int] = mapped_column(default=0, server_default="0")
+    facility_ids: Mapped[list[int]] = mapped_column(ARRAY(Integer), server_default="{}")
+    cover_image_url: Mapped[str | None] = mapped_column(String(600))
+    updated_at: Mapped[datetime] = mapped_column(server_default=func.now(), onupdate=func.now())
@@ -1,7 +1,8 @@
 import typing
 from datetime import datetime
 
-from sqlalchemy import String, UniqueConstraint, func
+from sqlalchemy import CheckConstraint, Computed, Index, String, UniqueConstraint, func
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.database import Base
@@ -10,16 +11,35 @@ if typing.TYPE_CHECKING:
     from src.models.hotel_images import HotelImagesOrm
 
 
+# Полнотекстовый поиск: стемминг russian, веса title (A) > city (B) > address (C)
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(city, '')), 'B') || "
+    "setweight(to_tsvector('russian', coalesce(address, '')), 'C')"
+)
+
+
 class HotelsOrm(Base):
     __tablename__ = "hotels"
     __table_args__ = (
         UniqueConstraint("title", "city", "address", name="uq_hotels_title_city_address"),
+        Index("ix_hotels_search_vector", "search_vector", postgresql_using="gin"),
+        CheckConstraint(
+            "(latitude IS NULL) = (longitude IS NULL)", name="ck_hotels_coordinates_pair"
+        ),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     title: Mapped[str] = mapped_column(String(100))
     city: Mapped[str]
     address: Mapped[str | None]
+    # Координаты (WGS 84): задаются вручную или геокодером (src.tasks.geo)
+    latitude: Mapped[float | None]
+    longitude: Mapped[float | None]
+    # Нужен только в WHERE/ORDER BY поиска — в SELECT отеля не грузим
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR, Computed(SEARCH_VECTOR_EXPRESSION, persisted=True), deferred=True
+    )
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(server_default=func.now(), onupdate=func.now())
 
@@ -28,3 +48,26 @@ class HotelsOrm(Base):
         back_populates="hotel",
         cascade="all, delete-orphan",
     )
+
+
+def _trigram_index(column) -> Index:
+    label = f"{column.key}_lower"
+    return Index(
+        f"ix_hotels_{column.key}_trgm",
+        func.lower(column).label(label),
+        postgresql_using="gin",
+        postgresql_ops={label: "gin_trgm_ops"},
+    )
+
+
+# Триграммные GIN-индексы поиска (pg_trgm): LIKE '%q%' и word_similarity (<%) по lower(...)
+_trigram_index(HotelsOrm.title)
+_trigram_index(HotelsOrm.city)
+_trigram_index(HotelsOrm.address)
+
+# Гео-поиск (cube + earthdistance): радиус — earth_box(...) @> ll_to_earth(...)
+Index(
+    "ix_hotels_earth",
+    func.ll_to_earth(HotelsOrm.latitude, HotelsOrm.longitude),
+    postgresql_using="gist",
+)
@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from sqlalchemy import Index, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.database import Base
+
+
+class PopularLocationsOrm(Base):
+    """Рейтинг городов для «Популярных локаций»: спрос (брони) и число отелей.
+
+    Пересобирается beat-задачей refresh_popular_locations; hotels_count поправляется
+    сразу при добавлении, переносе и удалении отеля (PopularLocationsRepository.adjust_hotels).
+    """
+
+    __tablename__ = "popular_locations"
+
+    city: Mapped[str] = mapped_column(primary_key=True)
+    hotels_count: Mapped[int] = mapped_column(default=0, server_default="0")
+    # Брони с заездом не раньше POPULAR_LOCATIONS_BOOKINGS_DAYS дней назад (включая будущие)
+    bookings_count: Mapped[int] = mapped_column(default=0, server_default="0")
+    updated_at: Mapped[datetime] = mapped_column(server_default=func.now(), onupdate=func.now())
+
+
+# Порядок выдачи: топ-N читается с начала индекса, без сортировки
+Index(
+    "ix_popular_locations_rank",
+    PopularLocationsOrm.bookings_count.desc(),
+    PopularLocationsOrm.hotels_count.desc(),
+    PopularLocationsOrm.city,
+)
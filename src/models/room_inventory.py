@@ -0,0 +1,26 @@
+from datetime import date
+
+from sqlalchemy import CheckConstraint, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.database import Base
+
+
+class RoomInventoryOrm(Base):
+    """Занятость номера по ночам: сколько единиц номера забронировано на ночь `night`.
+
+    Поддерживается BookingsRepository в той же транзакции, что и сама бронь;
+    источник истины — таблица bookings (см. RoomInventoryRepository.rebuild).
+    """
+
+    __tablename__ = "room_inventory"
+    __table_args__ = (
+        CheckConstraint("booked_count >= 0", name="ck_room_inventory_booked_count"),
+        Index("ix_room_inventory_night", "night"),
+    )
+
+    room_id: Mapped[int] = mapped_column(
+        ForeignKey("rooms.id", ondelete="CASCADE"), primary_key=True
+    )
+    night: Mapped[date] = mapped_column(primary_key=True)
+    booked_count: Mapped[int] = mapped_column(default=0, server_default="0")
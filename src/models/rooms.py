@@ -2,7 +2,8 @@ import typing
 from datetime import datetime
 
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import ForeignKey, func
+from sqlalchemy import ForeignKey, Index, Integer, func
+from sqlalchemy.dialects.postgresql import ARRAY
 
 from src.database import Base
 
@@ -12,6 +13,10 @@ if typing.TYPE_CHECKING:
 
 class RoomsOrm(Base):
     __tablename__ = "rooms"
+    __table_args__ = (
+        # facility_ids @> ARRAY[...] — фильтр facilities=1,4,7 без join на каждое удобство
+        Index("ix_rooms_facility_ids", "facility_ids", postgresql_using="gin"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     hotel_id: Mapped[int] = mapped_column(ForeignKey("hotels.id"))
@@ -20,6 +25,8 @@ class RoomsOrm(Base):
     price: Mapped[int]
     quantity: Mapped[int]
     capacity: Mapped[int] = mapped_column(default=2, server_default="2")
+    # Денормализованная копия rooms_facilities; синхронизирует set_room_facilities
+    facility_ids: Mapped[list[int]] = mapped_column(ARRAY(Integer), server_default="{}")
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(server_default=func.now(), onupdate=func.now())
 
@@ -1,14 +1,17 @@
+import json
 import logging
 from typing import Sequence, Any
 from asyncpg import UniqueViolationError
-from sqlalchemy import select, insert, update, delete
+from sqlalchemy import Select, func, select, insert, update, delete
 from pydantic import BaseModel
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.exc import NoResultFound, IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.exceptions import ObjectAlreadyExistsException, ObjectNotFoundException
 from src.database import Base
 from src.repositories.mappers.base import DataMapper
+from src.schemas.common import COUNT_CAP, COUNT_ESTIMATE_MIN, CountStrategy
 
 
 class BaseRepository:
@@ -79,3 +82,46 @@ class BaseRepository:
     async def delete(self, **filter_by) -> None:
         delete_stmt = delete(self.model).filter_by(**filter_by)
         await self.session.execute(delete_stmt)
+
+    async def count_rows(self, query: Select, strategy: CountStrategy = "exact") -> int:
+        """Число строк выборки query по стратегии подсчёта.
+
+        capped возвращает не больше COUNT_CAP + 1 — лишняя единица означает «больше COUNT_CAP».
+        window здесь равен exact: он считается в запросе страницы (_fetch_page).
+        """
+        if strategy == "capped":
+            query = query.limit(COUNT_CAP + 1)
+        elif strategy == "estimate":
+            estimated = await self.estimate_rows(query)
+            if estimated >= COUNT_ESTIMATE_MIN:
+                return estimated
+        result = await self.session.execute(select(func.count()).select_from(query.subquery()))
+        return result.scalar_one()
+
+    async def estimate_rows(self, query: Select) -> int:
+        """Оценка числа строк от планировщика (EXPLAIN без выполнения запроса).
+
+        SQL уходит в драйвер как есть: text() принял бы ':слово' в строковых литералах
+        за параметры, а диалект psycopg2 удвоил бы '%'.
+        """
+        sql = query.compile(
+            dialect=postgresql.asyncpg.dialect(), compile_kwargs={"literal_binds": True}
+        )
+        conn = await self.session.connection()
+        result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")
+        plan = result.scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    async def _fetch_page(self, query: Select, with_total: bool = False) -> tuple[list, int | None]:
+        """ORM-объекты страницы и, при with_total, COUNT(*) OVER() — total без отдельного запроса.
+
+        Окно считается до LIMIT/OFFSET, поэтому видит всю выборку. total None — не запрошен
+        или страница пуста.
+        """
+        if not with_total:
+            return list((await self.session.execute(query)).scalars().all()), None
+        result = await self.session.execute(query.add_columns(func.count().over()))
+        rows = result.all()
+        return [row[0] for row in rows], (rows[0][1] if rows else None)
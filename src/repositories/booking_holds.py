@@ -0,0 +1,103 @@
+from datetime import date, timedelta
+
+from sqlalchemy import Date, delete, func, insert, literal, select
+
+from src.models.booking_holds import BookingHoldsOrm
+from src.models.rooms import RoomsOrm
+from src.repositories.base import BaseRepository
+from src.repositories.mappers.mappers import BookingHoldDataMapper
+from src.repositories.room_inventory import RoomInventoryRepository
+from src.schemas.bookings import BookingHold
+
+
+def _utcnow():
+    # expires_at — timestamp без зоны в UTC; сравниваем с тем же выражением
+    return func.timezone("UTC", func.now())
+
+
+class BookingHoldsRepository(BaseRepository):
+    model = BookingHoldsOrm
+    mapper = BookingHoldDataMapper
+
+    @property
+    def inventory(self) -> RoomInventoryRepository:
+        return RoomInventoryRepository(self.session)
+
+    async def add_hold(
+        self, user_id: int, room_id: int, date_from: date, date_to: date, ttl_minutes: int
+    ) -> tuple[BookingHold, int]:
+        """Занимает ночи как бронь и записывает холд с expires_at. Возвращает (холд, hotel_id)."""
+        await self.inventory.reserve_or_raise(room_id, date_from, date_to)
+        source = select(
+            literal(user_id),
+            RoomsOrm.id,
+            literal(date_from, Date),
+            literal(date_to, Date),
+            _utcnow() + timedelta(minutes=ttl_minutes),
+        ).where(RoomsOrm.id == room_id)
+        new_hold = (
+            insert(self.model)
+            .from_select(["user_id", "room_id", "date_from", "date_to", "expires_at"], source)
+            .returning(*self.model.__table__.c)
+            .cte("new_hold")
+        )
+        query = select(new_hold, RoomsOrm.hotel_id).join(
+            RoomsOrm, RoomsOrm.id == new_hold.c.room_id
+        )
+        row = (await self.session.execute(query)).mappings().one()
+        return BookingHold.model_validate(dict(row)), row["hotel_id"]
+
+    async def pop_active(self, hold_id: int, user_id: int) -> BookingHold | None:
+        """Удаляет неистёкший холд пользователя и возвращает его. Ночи остаются занятыми —
+        их переиспользует бронь (BookingsRepository.add_reserved)."""
+        stmt = (
+            delete(self.model)
+            .where(
+                self.model.id == hold_id,
+                self.model.user_id == user_id,
+                self.model.expires_at > _utcnow(),
+            )
+            .returning(self.model)
+        )
+        model = (await self.session.execute(stmt)).scalars().one_or_none()
+        return self.mapper.map_to_domain_entity(model) if model is not None else None
+
+    async def cancel(self, hold_id: int, user_id: int) -> BookingHold | None:
+        """Удаляет холд пользователя (в т.ч. истёкший) и освобождает его ночи."""
+        stmt = (
+            delete(self.model)
+            .where(self.model.id == hold_id, self.model.user_id == user_id)
+            .returning(self.model)
+        )
+        model = (await self.session.execute(stmt)).scalars().one_or_none()
+        if model is None:
+            return None
+        await self.inventory.release(model.room_id, model.date_from, model.date_to)
+        return self.mapper.map_to_domain_entity(model)
+
+    async def release_expired(self, limit: int = 1000) -> list[int]:
+        """Удаляет истёкшие холды и освобождает их ночи. Возвращает hotel_id каждого
+        снятого холда — для сброса кэша занятости.
+
+        SKIP LOCKED — параллельные запуски и отмены не ждут друг друга.
+        """
+        expired_ids = (
+            select(self.model.id)
+            .where(self.model.expires_at <= _utcnow())
+            .order_by(self.model.expires_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        released = (
+            delete(self.model)
+            .where(self.model.id.in_(expired_ids.scalar_subquery()))
+            .returning(self.model.room_id, self.model.date_from, self.model.date_to)
+            .cte("released")
+        )
+        query = select(released, RoomsOrm.hotel_id).join(
+            RoomsOrm, RoomsOrm.id == released.c.room_id
+        )
+        expired = (await self.session.execute(query)).all()
+        for room_id, date_from, date_to, _ in expired:
+            await self.inventory.release(room_id, date_from, date_to)
+        return [hotel_id for *_, hotel_id in expired]
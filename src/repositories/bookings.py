@@ -1,21 +1,54 @@
-from datetime import datetime, timezone
-from typing import Sequence
+from datetime import date, datetime, timezone
 
-from sqlalchemy import select, func
+from sqlalchemy import (
+    Date,
+    Integer,
+    String,
+    column,
+    select,
+    func,
+    delete,
+    insert,
+    literal,
+    update,
+    values,
+)
 
 from src.exceptions import AllRoomsAreBookedException, RoomNotFoundException
-from src.repositories.utils import rooms_ids_for_booking
-from src.schemas.bookings import BookingAdd
+from src.repositories.room_inventory import RoomInventoryRepository
+from src.schemas.bookings import Booking, BookingAdd
+from src.schemas.common import CountStrategy
 from src.models.bookings import BookingsOrm
 from src.models.rooms import RoomsOrm
 from src.repositories.base import BaseRepository
 from src.repositories.mappers.mappers import BookingDataMapper
+from src.repositories.utils import id_in_array, order_by_keyset, uncovered_ranges
 
 
 class BookingsRepository(BaseRepository):
     model = BookingsOrm
     mapper = BookingDataMapper
 
+    @property
+    def inventory(self) -> RoomInventoryRepository:
+        return RoomInventoryRepository(self.session)
+
+    async def add(self, data: BookingAdd) -> Booking:
+        # Любая вставка брони занимает ночи в room_inventory в той же транзакции
+        booking = await super().add(data)
+        await self.inventory.reserve(booking.room_id, booking.date_from, booking.date_to)
+        return booking
+
+    async def delete(self, **filter_by) -> None:
+        delete_stmt = (
+            delete(self.model)
+            .filter_by(**filter_by)
+            .returning(BookingsOrm.room_id, BookingsOrm.date_from, BookingsOrm.date_to)
+        )
+        result = await self.session.execute(delete_stmt)
+        for room_id, date_from, date_to in result.all():
+            await self.inventory.release(room_id, date_from, date_to)
+
     async def get_bookings_with_today_checkin(self):
         today = datetime.now(tz=timezone.utc).date()
         query = select(BookingsOrm).filter(BookingsOrm.date_from == today)
@@ -41,45 +74,179 @@ class BookingsRepository(BaseRepository):
             for row in result
         ]
 
-    async def count_by_user(self, user_id: int) -> int:
-        query = select(func.count()).where(BookingsOrm.user_id == user_id)
-        result = await self.session.execute(query)
-        return result.scalar_one()
+    async def count_by_user(self, user_id: int, strategy: CountStrategy = "exact") -> int:
+        query = select(BookingsOrm.id).where(BookingsOrm.user_id == user_id)
+        return await self.count_rows(query, strategy)
 
     async def count_by_room(self, room_id: int) -> int:
         query = select(func.count()).where(BookingsOrm.room_id == room_id)
         result = await self.session.execute(query)
         return result.scalar_one()
 
-    async def get_paginated_by_user(self, user_id: int, limit: int, offset: int):
+    async def get_paginated_by_user(
+        self,
+        user_id: int,
+        limit: int,
+        offset: int | None = None,
+        after: list | None = None,
+        with_total: bool = False,
+    ):
+        query = order_by_keyset(
+            select(self.model).where(BookingsOrm.user_id == user_id),
+            BookingsOrm.date_from,
+            BookingsOrm.id,
+            "desc",
+            after,
+        )
+        query = query.limit(limit).offset(offset)
+        models, total = await self._fetch_page(query, with_total)
+        bookings = [self.mapper.map_to_domain_entity(b) for b in models]
+        return (bookings, total) if with_total else bookings
+
+    async def add_booking(
+        self,
+        user_id: int,
+        room_id: int,
+        date_from: date,
+        date_to: date,
+        queue_ticket: str | None = None,
+    ) -> tuple[Booking, int]:
+        """Бронь двумя запросами без блокировки строки номера. Возвращает (бронь, hotel_id).
+
+        1. Условный upsert в room_inventory: каждая ночь занимается, только если
+           booked_count < quantity. Конкурирующие брони ждут лишь на строках
+           своих ночей (ON CONFLICT перепроверяет условие на свежей версии строки).
+        2. INSERT ... SELECT цены из rooms RETURNING.
+
+        Если заняты не все ночи — исключение; частичный upsert откатывается вместе
+        с транзакцией (DBManager делает rollback при выходе без commit).
+        """
+        await self.inventory.reserve_or_raise(room_id, date_from, date_to)
+        return await self.add_reserved(user_id, room_id, date_from, date_to, queue_ticket)
+
+    async def add_reserved(
+        self,
+        user_id: int,
+        room_id: int,
+        date_from: date,
+        date_to: date,
+        queue_ticket: str | None = None,
+    ) -> tuple[Booking, int]:
+        """INSERT брони, чьи ночи уже заняты в room_inventory (бронь или подтверждённый холд).
+
+        Цена берётся из rooms, hotel_id возвращается для инвалидации кэша.
+        queue_ticket — тикет заявки из очереди (уникален: вторая вставка — IntegrityError).
+        """
+        source = select(
+            literal(user_id),
+            RoomsOrm.id,
+            literal(date_from, Date),
+            literal(date_to, Date),
+            RoomsOrm.price,
+            literal(queue_ticket, String),
+        ).where(RoomsOrm.id == room_id)
+        new_booking = (
+            insert(BookingsOrm)
+            .from_select(
+                ["user_id", "room_id", "date_from", "date_to", "price", "queue_ticket"], source
+            )
+            .returning(*BookingsOrm.__table__.c)
+            .cte("new_booking")
+        )
+        query = select(new_booking, RoomsOrm.hotel_id).join(
+            RoomsOrm, RoomsOrm.id == new_booking.c.room_id
+        )
+        row = (await self.session.execute(query)).mappings().one()
+        return Booking.model_validate(dict(row)), row["hotel_id"]
+
+    async def get_by_queue_tickets(self, tickets: list[str]) -> dict[str, Booking]:
+        """Брони, уже созданные по этим тикетам очереди: {тикет: бронь}."""
+        query = select(self.model).where(id_in_array(self.model.queue_ticket, tickets))
+        models = (await self.session.execute(query)).scalars().all()
+        return {model.queue_ticket: self.mapper.map_to_domain_entity(model) for model in models}
+
+    async def get_for_update(self, booking_id: int, user_id: int) -> Booking | None:
+        """Бронь пользователя с блокировкой строки брони (не номера) до конца транзакции."""
         query = (
             select(self.model)
-            .where(BookingsOrm.user_id == user_id)
-            .order_by(BookingsOrm.date_from.desc())
-            .limit(limit)
-            .offset(offset)
+            .where(self.model.id == booking_id, self.model.user_id == user_id)
+            .with_for_update()
         )
-        result = await self.session.execute(query)
-        return [self.mapper.map_to_domain_entity(b) for b in result.scalars().all()]
-
-    async def add_booking(self, data: BookingAdd, hotel_id: int):
-        # Lock the room row to prevent concurrent overbooking.
-        # Other transactions trying to book the same room will wait
-        # until this transaction commits, then re-check availability.
-        lock_result = await self.session.execute(
-            select(RoomsOrm).where(RoomsOrm.id == data.room_id).with_for_update()
+        model = (await self.session.execute(query)).scalars().one_or_none()
+        return self.mapper.map_to_domain_entity(model) if model is not None else None
+
+    async def change_dates(
+        self, booking: Booking, date_from: date, date_to: date
+    ) -> tuple[Booking, int]:
+        """Меняет даты брони на месте (id сохраняется). Возвращает (бронь, hotel_id).
+
+        Проверяются и занимаются только добавленные ночи (новый период минус старый),
+        освобождаются только убранные — сдвиг на день трогает одну-две строки
+        room_inventory. Вызывать для брони, полученной через get_for_update().
+        """
+        for added_from, added_to in uncovered_ranges(
+            date_from, date_to, booking.date_from, booking.date_to
+        ):
+            await self.inventory.reserve_or_raise(booking.room_id, added_from, added_to)
+        for removed_from, removed_to in uncovered_ranges(
+            booking.date_from, booking.date_to, date_from, date_to
+        ):
+            await self.inventory.release(booking.room_id, removed_from, removed_to)
+
+        updated = (
+            update(BookingsOrm)
+            .where(BookingsOrm.id == booking.id)
+            .values(date_from=date_from, date_to=date_to)
+            .returning(*BookingsOrm.__table__.c)
+            .cte("updated")
         )
-        if lock_result.scalar_one_or_none() is None:
+        query = select(updated, RoomsOrm.hotel_id).join(RoomsOrm, RoomsOrm.id == updated.c.room_id)
+        row = (await self.session.execute(query)).mappings().one()
+        return Booking.model_validate(dict(row)), row["hotel_id"]
+
+    async def add_bookings(
+        self, user_id: int, stays: list[tuple[int, date, date]]
+    ) -> list[tuple[Booking, int]]:
+        """Групповая бронь: все проживания (room_id, date_from, date_to) или ни одного.
+
+        Проверка номеров, условный upsert ночей всех проживаний и вставка броней —
+        по одному запросу. Возвращает [(бронь, hotel_id)] в порядке id.
+        """
+        room_ids = {room_id for room_id, _, _ in stays}
+        existing = await self.session.execute(select(RoomsOrm.id).where(RoomsOrm.id.in_(room_ids)))
+        if len(existing.scalars().all()) < len(room_ids):
             raise RoomNotFoundException()
 
-        rooms_ids_to_get = rooms_ids_for_booking(
-            date_from=data.date_from,
-            date_to=data.date_to,
-            hotel_id=hotel_id,
+        if not await self.inventory.reserve_many_if_available(stays):
+            raise AllRoomsAreBookedException()
+
+        requested = values(
+            column("room_id", Integer),
+            column("date_from", Date),
+            column("date_to", Date),
+            name="requested",
+        ).data(sorted(stays))
+        source = (
+            select(
+                literal(user_id),
+                requested.c.room_id,
+                requested.c.date_from,
+                requested.c.date_to,
+                RoomsOrm.price,
+            )
+            .select_from(requested)
+            .join(RoomsOrm, RoomsOrm.id == requested.c.room_id)
+        )
+        new_bookings = (
+            insert(BookingsOrm)
+            .from_select(["user_id", "room_id", "date_from", "date_to", "price"], source)
+            .returning(*BookingsOrm.__table__.c)
+            .cte("new_bookings")
+        )
+        query = (
+            select(new_bookings, RoomsOrm.hotel_id)
+            .join(RoomsOrm, RoomsOrm.id == new_bookings.c.room_id)
+            .order_by(new_bookings.c.id)
         )
-        rooms_ids_to_book_res = await self.session.execute(rooms_ids_to_get)
-        rooms_ids_to_book: Sequence[int] = rooms_ids_to_book_res.scalars().all()
-        if data.room_id in rooms_ids_to_book:
-            new_booking = await self.add(data)
-            return new_booking
-        raise AllRoomsAreBookedException()
+        rows = (await self.session.execute(query)).mappings().all()
+        return [(Booking.model_validate(dict(row)), row["hotel_id"]) for row in rows]
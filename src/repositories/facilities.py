@@ -1,23 +1,33 @@
-from sqlalchemy import insert, select, delete, func
+from sqlalchemy import func, insert, select, delete, update
 from typing import Sequence
 
 from src.repositories.mappers.mappers import FacilityDataMapper
 from src.models.facilities import FacilitiesOrm, RoomsFacilitiesOrm
+from src.models.rooms import RoomsOrm
 from src.repositories.base import BaseRepository
+from src.repositories.utils import order_by_keyset
+from src.schemas.common import CountStrategy
 
 
 class FacilitiesRepository(BaseRepository):
     model = FacilitiesOrm
     mapper = FacilityDataMapper
 
-    async def count(self) -> int:
-        result = await self.session.execute(select(func.count()).select_from(self.model))
-        return result.scalar_one()
+    async def count(self, strategy: CountStrategy = "exact") -> int:
+        return await self.count_rows(select(self.model.id), strategy)
 
-    async def get_paginated(self, limit: int, offset: int):
-        query = select(self.model).order_by(self.model.id).limit(limit).offset(offset)
-        result = await self.session.execute(query)
-        return [self.mapper.map_to_domain_entity(m) for m in result.scalars().all()]
+    async def get_paginated(
+        self,
+        limit: int,
+        offset: int | None = None,
+        after: list | None = None,
+        with_total: bool = False,
+    ):
+        query = order_by_keyset(select(self.model), self.model.id, self.model.id, after=after)
+        query = query.limit(limit).offset(offset)
+        models, total = await self._fetch_page(query, with_total)
+        facilities = [self.mapper.map_to_domain_entity(m) for m in models]
+        return (facilities, total) if with_total else facilities
 
 
 class RoomsFacilitiesRepository(BaseRepository):
@@ -25,6 +35,7 @@ class RoomsFacilitiesRepository(BaseRepository):
     mapper = None  # type: ignore  # M2M таблица не требует маппинга доменных объектов
 
     async def set_room_facilities(self, room_id: int, facilities_ids: list[int]) -> None:
+        """Приводит удобства номера к facilities_ids — в rooms_facilities и rooms.facility_ids."""
         get_current_facilities_ids_query = select(self.model.facility_id).filter_by(room_id=room_id)
         res = await self.session.execute(get_current_facilities_ids_query)
         current_facilities_ids: Sequence[int] = res.scalars().all()
@@ -43,3 +54,23 @@ class RoomsFacilitiesRepository(BaseRepository):
                 [{"room_id": room_id, "facility_id": f_id} for f_id in ids_to_insert]
             )
             await self.session.execute(insert_m2m_facilities_stmt)
+
+        if ids_to_delete or ids_to_insert:
+            sync_stmt = (
+                update(RoomsOrm)
+                .where(RoomsOrm.id == room_id)
+                .values(facility_ids=sorted(set(facilities_ids)))
+            )
+            await self.session.execute(sync_stmt)
+
+    async def remove_facility(self, facility_id: int) -> list[tuple[int, int]]:
+        """Убирает удалённое удобство из rooms.facility_ids (строки rooms_facilities
+        удаляет ON DELETE CASCADE). Возвращает (room_id, hotel_id) затронутых номеров."""
+        stmt = (
+            update(RoomsOrm)
+            .where(RoomsOrm.facility_ids.contains([facility_id]))
+            .values(facility_ids=func.array_remove(RoomsOrm.facility_ids, facility_id))
+            .returning(RoomsOrm.id, RoomsOrm.hotel_id)
+        )
+        result = await self.session.execute(stmt)
+        return [tuple(row) for row in result.all()]
@@ -0,0 +1,96 @@
+from sqlalchemy import Integer, distinct, func, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+
+from src.models.facilities import RoomsFacilitiesOrm
+from src.models.hotel_images import HotelImagesOrm
+from src.models.hotel_summary import HotelSummaryOrm
+from src.models.hotels import HotelsOrm
+from src.models.rooms import RoomsOrm
+from src.repositories.base import BaseRepository
+
+_SUMMARY_COLUMNS = (
+    "hotel_id",
+    "min_price",
+    "max_capacity",
+    "rooms_count",
+    "facility_ids",
+    "cover_image_url",
+)
+
+
+def cover_image_url():
+    """Скалярный подзапрос: URL первого по id изображения отеля (idx_hotel_images_hotel_id)."""
+    return (
+        select(literal("/static/images/") + HotelImagesOrm.filename)
+        .where(HotelImagesOrm.hotel_id == HotelsOrm.id)
+        .order_by(HotelImagesOrm.id)
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+def summary_source(*where):
+    """Сводка, посчитанная заново по rooms, rooms_facilities и hotel_images."""
+    facility_ids = (
+        select(func.array_agg(distinct(RoomsFacilitiesOrm.facility_id)))
+        .join(RoomsOrm, RoomsOrm.id == RoomsFacilitiesOrm.room_id)
+        .where(RoomsOrm.hotel_id == HotelsOrm.id)
+        .scalar_subquery()
+    )
+    return (
+        select(
+            HotelsOrm.id,
+            func.min(RoomsOrm.price),
+            func.max(RoomsOrm.capacity),
+            func.count(RoomsOrm.id),
+            func.coalesce(facility_ids, literal([], ARRAY(Integer))),
+            cover_image_url(),
+        )
+        .select_from(HotelsOrm)
+        .outerjoin(RoomsOrm, RoomsOrm.hotel_id == HotelsOrm.id)
+        .where(*where)
+        .group_by(HotelsOrm.id)
+    )
+
+
+class HotelSummaryRepository(BaseRepository):
+    model: type[HotelSummaryOrm] = HotelSummaryOrm
+    mapper = None  # type: ignore  # read model, читается в составе HotelsRepository
+
+    async def _upsert(self, *where) -> None:
+        stmt = pg_insert(self.model).from_select(_SUMMARY_COLUMNS, summary_source(*where))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[self.model.hotel_id],
+            set_={
+                **{name: stmt.excluded[name] for name in _SUMMARY_COLUMNS[1:]},
+                "updated_at": func.now(),
+            },
+        )
+        await self.session.execute(stmt)
+
+    async def refresh(self, hotel_id: int | None = None) -> None:
+        """Пересчитывает сводку отеля в текущей транзакции; без hotel_id — всех отелей.
+
+        Строка отеля блокируется (FOR NO KEY UPDATE, не мешает FK-проверкам номеров):
+        параллельные пересчёты одного отеля идут по очереди, и следующий видит номера,
+        закоммиченные предыдущим, — иначе последний записавший затёр бы чужое изменение.
+        """
+        if hotel_id is None:
+            await self._upsert()
+            return
+        await self.session.execute(
+            select(HotelsOrm.id).where(HotelsOrm.id == hotel_id).with_for_update(key_share=True)
+        )
+        await self._upsert(HotelsOrm.id == hotel_id)
+
+    async def refresh_with_facility(self, facility_id: int) -> None:
+        """Пересчитывает сводки отелей с удобством (GIN ix_hotel_summary_facility_ids)."""
+        hotel_ids = select(self.model.hotel_id).where(
+            self.model.facility_ids.contains([facility_id])
+        )
+        await self._upsert(HotelsOrm.id.in_(hotel_ids))
+
+    async def rooms_count(self, hotel_id: int) -> int | None:
+        """Число номеров отеля из сводки; None — сводки нет."""
+        query = select(self.model.rooms_count).where(self.model.hotel_id == hotel_id)
+        return (await self.session.execute(query)).scalar_one_or_none()
@@ -1,19 +1,171 @@
 from datetime import date
-from sqlalchemy import select, func, literal
+from typing import Sequence
 
+from sqlalchemy import (
+    ARRAY,
+    Float,
+    Integer,
+    and_,
+    select,
+    func,
+    literal,
+    literal_column,
+    or_,
+    true,
+    tuple_,
+)
+
+from src.availability.client import get_availability_engine
+from src.config import settings
 from src.repositories.mappers.mappers import HotelDataMapper
-from src.models.hotel_images import HotelImagesOrm
+from src.models.facilities import FacilitiesOrm
+from src.models.hotel_summary import HotelSummaryOrm
 from src.models.rooms import RoomsOrm
 from src.repositories.base import BaseRepository
 from src.models.hotels import HotelsOrm
-from src.repositories.utils import rooms_ids_for_booking
-from src.schemas.hotels import Hotel
+from src.repositories.utils import (
+    id_in_array,
+    order_by_keyset,
+    rooms_ids_for_booking,
+    rooms_with_facilities,
+)
+from src.schemas.common import CountStrategy
+from src.schemas.hotels import (
+    FacetCount,
+    FacilityFacetCount,
+    Hotel,
+    HotelFacets,
+    RangeFacetCount,
+)
+
+
+def _search_fields():
+    # Ровно те выражения, по которым построены индексы ix_hotels_*_trgm
+    return func.lower(HotelsOrm.title), func.lower(HotelsOrm.city), func.lower(HotelsOrm.address)
+
+
+def trigram_search_filter(q: str):
+    """Подстрока или триграммная близость (опечатки, окончания) в title, city или address.
+
+    Оба условия обслуживаются GIN-индексами gin_trgm_ops; порог для <% задаёт
+    pg_trgm.word_similarity_threshold (см. HotelsRepository._set_search_threshold).
+    """
+    return or_(
+        *(
+            field.contains(q) | literal(q).op("<%", is_comparison=True)(field)
+            for field in _search_fields()
+        )
+    )
+
+
+def trigram_search_rank(q: str):
+    """Релевантность: лучшая word_similarity запроса среди title, city и address."""
+    return func.greatest(*(func.word_similarity(q, field) for field in _search_fields()))
+
+
+def _fts_query(q: str):
+    # websearch_to_tsquery принимает любой пользовательский ввод: кавычки, OR, «-слово»
+    return func.websearch_to_tsquery(literal_column("'russian'::regconfig"), q)
+
+
+def fts_search_filter(q: str):
+    """Совпадение с учётом словоформ («в Москве» → Москва); индекс ix_hotels_search_vector."""
+    return HotelsOrm.search_vector.bool_op("@@")(_fts_query(q))
+
+
+def fts_search_rank(q: str):
+    """Релевантность ts_rank: совпадение в title весит больше, чем в city и address."""
+    return func.ts_rank(HotelsOrm.search_vector, _fts_query(q))
+
+
+def _hotel_earth():
+    # Ровно то выражение, по которому построен GiST-индекс ix_hotels_earth
+    return func.ll_to_earth(HotelsOrm.latitude, HotelsOrm.longitude)
+
+
+def _point_earth(near: tuple[float, float]):
+    lat, lon = near
+    return func.ll_to_earth(literal(lat, Float), literal(lon, Float))
+
+
+def geo_radius_filter(near: tuple[float, float], radius_km: float):
+    """Отели в радиусе radius_km от near.
+
+    earth_box(...) @> — грубый куб вокруг точки по индексу ix_hotels_earth; earth_distance
+    отсекает углы куба, т.е. точное расстояние считается только для кандидатов из индекса.
+    """
+    center, radius_m = _point_earth(near), literal(radius_km * 1000, Float)
+    return and_(
+        func.earth_box(center, radius_m).op("@>", is_comparison=True)(_hotel_earth()),
+        func.earth_distance(center, _hotel_earth()) <= radius_m,
+    )
+
+
+def geo_distance_km(near: tuple[float, float]):
+    """Расстояние по дуге большого круга от near до отеля, км."""
+    meters = func.earth_distance(_point_earth(near), _hotel_earth(), type_=Float)
+    return meters / literal(1000.0, Float)
+
+
+def _hotel_columns(near: tuple[float, float] | None = None):
+    """Колонки Hotel вместе с обложкой и ценой «от» из hotel_summary — страница одним запросом."""
+    columns = [
+        HotelsOrm.id,
+        HotelsOrm.title,
+        HotelsOrm.city,
+        HotelsOrm.address,
+        HotelsOrm.latitude,
+        HotelsOrm.longitude,
+        HotelSummaryOrm.cover_image_url,
+        HotelSummaryOrm.min_price,
+    ]
+    if near is not None:
+        columns.append(geo_distance_km(near).label("distance_km"))
+    return columns
+
+
+def _int_array(values: list[int]):
+    # Границы — литералом, не bind-параметрами: выражение в SELECT и в GROUPING SETS
+    # должно совпасть текстуально, а каждый bind получил бы свой $N
+    return literal_column(f"ARRAY[{', '.join(str(int(v)) for v in values)}]")
+
+
+def _range_facets(bounds: list[int], counts: dict[int, int]) -> list[RangeFacetCount]:
+    """Номера width_bucket (1..len(bounds)) → диапазоны [bounds[i], bounds[i+1] - 1]."""
+    return [
+        RangeFacetCount(
+            min=low,
+            max=bounds[i + 1] - 1 if i + 1 < len(bounds) else None,
+            count=counts.get(i + 1, 0),
+        )
+        for i, low in enumerate(bounds)
+    ]
+
+
+def _search_mode(search: str | None) -> str | None:
+    return settings.HOTEL_SEARCH_MODE if search else None
+
+
+def _trigram_search(search: str | None) -> bool:
+    return _search_mode(search) == "trigram"
+
+
+def _normalize(search: str | None) -> str:
+    return (search or "").strip().lower()
 
 
 class HotelsRepository(BaseRepository):
     model = HotelsOrm
     mapper = HotelDataMapper
 
+    async def _set_search_threshold(self, search: str | None) -> None:
+        """Порог <% на текущую транзакцию — запросы страницы и подсчёта видят одинаковый."""
+        if _trigram_search(search):
+            threshold = str(settings.HOTEL_SEARCH_SIMILARITY_THRESHOLD)
+            await self.session.execute(
+                select(func.set_config("pg_trgm.word_similarity_threshold", threshold, True))
+            )
+
     def _base_query(
         self,
         date_from: date | None,
@@ -22,11 +174,47 @@ class HotelsRepository(BaseRepository):
         title=None,
         search=None,
         guests: int = 1,
+        ids: Sequence[int] | None = None,
+        price_min: int | None = None,
+        price_max: int | None = None,
+        capacity: int | None = None,
+        near: tuple[float, float] | None = None,
+        radius_km: float | None = None,
+        facility_ids: Sequence[int] | None = None,
     ):
-        query = select(HotelsOrm)
-        if date_from and date_to:
+        """ids — текстовую часть (search/city/title) уже отобрал Elasticsearch.
+
+        price_min/price_max — по цене «от» (самый дешёвый номер), capacity — есть номер
+        не меньше чем на столько гостей; всё по индексам hotel_summary.
+        near + radius_km — отели в радиусе от точки (ix_hotels_earth); фильтр дат
+        проверяет номера только этих отелей.
+        facility_ids — есть номер со всеми этими удобствами (GIN ix_rooms_facility_ids);
+        с датами — свободный номер со всеми удобствами.
+        """
+        query = select(HotelsOrm).outerjoin(
+            HotelSummaryOrm, HotelSummaryOrm.hotel_id == HotelsOrm.id
+        )
+        if near is not None and radius_km is not None:
+            query = query.filter(geo_radius_filter(near, radius_km))
+        if price_min is not None:
+            query = query.filter(HotelSummaryOrm.min_price >= price_min)
+        if price_max is not None:
+            query = query.filter(HotelSummaryOrm.min_price <= price_max)
+        if capacity is not None:
+            query = query.filter(HotelSummaryOrm.max_capacity >= capacity)
+        # Движок знает свободные номера, но не их удобства: с facility_ids условие
+        # «свободен и со всеми удобствами» на один номер проверяет PostgreSQL
+        engine = get_availability_engine() if date_from and date_to and not facility_ids else None
+        hotel_ids = (
+            engine.available_hotel_ids(date_from, date_to, guests)  # type: ignore[arg-type]
+            if engine is not None
+            else None
+        )
+        if hotel_ids is not None:
+            query = query.filter(id_in_array(HotelsOrm.id, hotel_ids))
+        elif date_from and date_to:
             rooms_ids_to_get = rooms_ids_for_booking(
-                date_from=date_from, date_to=date_to, guests=guests
+                date_from=date_from, date_to=date_to, guests=guests, facility_ids=facility_ids
             )  # type: ignore[arg-type]
             hotels_ids_to_get = (
                 select(RoomsOrm.hotel_id)
@@ -34,7 +222,19 @@ class HotelsRepository(BaseRepository):
                 .filter(RoomsOrm.id.in_(rooms_ids_to_get))
             )
             query = query.filter(HotelsOrm.id.in_(hotels_ids_to_get))
-        if search:
+        elif facility_ids:
+            hotels_ids_to_get = select(RoomsOrm.hotel_id).filter(
+                rooms_with_facilities(facility_ids)
+            )
+            query = query.filter(HotelsOrm.id.in_(hotels_ids_to_get))
+        mode = _search_mode(search)
+        if ids is not None:
+            query = query.filter(id_in_array(HotelsOrm.id, ids))
+        elif mode == "fts":
+            query = query.filter(fts_search_filter(_normalize(search)))
+        elif mode == "trigram":
+            query = query.filter(trigram_search_filter(_normalize(search)))
+        elif search:
             q = search.strip().lower()
             # City match: city contains q  OR  q contains city (e.g. user typed "Южно-Сахалинская" → city "Южно-Сахалинск")
             city_match = func.lower(HotelsOrm.city).contains(q) | (
@@ -64,36 +264,61 @@ class HotelsRepository(BaseRepository):
         sort_by: str = "id",
         order: str = "asc",
         guests: int = 1,
-    ) -> list[Hotel]:
-        query = self._base_query(date_from, date_to, city, title, search, guests)
-        column = getattr(HotelsOrm, sort_by, HotelsOrm.id)
-        query = query.order_by(column.asc() if order == "asc" else column.desc())
-        query = query.limit(limit).offset(offset)
-        result = await self.session.execute(query)
-        hotels = [self.mapper.map_to_domain_entity(hotel) for hotel in result.scalars().all()]
-
-        if hotels:
-            hotel_ids = [h.id for h in hotels]
-            cover_query = (
-                select(HotelImagesOrm.hotel_id, HotelImagesOrm.filename)
-                .where(HotelImagesOrm.hotel_id.in_(hotel_ids))
-                .distinct(HotelImagesOrm.hotel_id)
-                .order_by(HotelImagesOrm.hotel_id, HotelImagesOrm.id)
-            )
-            cover_result = await self.session.execute(cover_query)
-            covers = {row[0]: row[1] for row in cover_result.all()}
-            hotels = [
-                h.model_copy(
-                    update={
-                        "cover_image_url": f"/static/images/{covers[h.id]}"
-                        if h.id in covers
-                        else None
-                    }
-                )
-                for h in hotels
-            ]
+        after: list | None = None,
+        with_total: bool = False,
+        ids: Sequence[int] | None = None,
+        price_min: int | None = None,
+        price_max: int | None = None,
+        capacity: int | None = None,
+        near: tuple[float, float] | None = None,
+        radius_km: float | None = None,
+        facility_ids: Sequence[int] | None = None,
+    ) -> list[Hotel] | tuple[list[Hotel], int | None]:
+        """Страница отелей. with_total=True — ещё и total через COUNT(*) OVER().
 
-        return hotels
+        sort_by="relevance" — по убыванию релевантности: порядок ids из Elasticsearch
+        или ранг поиска fts/trigram. sort_by="min_price" — по цене «от»; отели без номеров
+        (min_price NULL) отсекает price_min (см. HotelService.get_filtered_by_time).
+        sort_by="distance_km" — по расстоянию от near (в ответе — distance_km).
+        """
+        if ids is None:
+            await self._set_search_threshold(search)
+        query = self._base_query(
+            date_from,
+            date_to,
+            city,
+            title,
+            search,
+            guests,
+            ids,
+            price_min,
+            price_max,
+            capacity,
+            near,
+            radius_km,
+            facility_ids,
+        )
+        mode = _search_mode(search)
+        if sort_by == "relevance" and ids is not None:
+            position = func.array_position(literal(list(ids), ARRAY(Integer)), HotelsOrm.id)
+            query = query.order_by(position)
+        elif sort_by == "relevance" and mode in ("fts", "trigram"):
+            rank_fn = fts_search_rank if mode == "fts" else trigram_search_rank
+            query = query.order_by(rank_fn(_normalize(search)).desc(), HotelsOrm.id)
+        elif sort_by == "min_price":
+            query = order_by_keyset(query, HotelSummaryOrm.min_price, HotelsOrm.id, order, after)
+        elif sort_by == "distance_km" and near is not None:
+            query = order_by_keyset(query, geo_distance_km(near), HotelsOrm.id, order, after)
+        else:
+            column = getattr(HotelsOrm, sort_by, HotelsOrm.id)
+            query = order_by_keyset(query, column, HotelsOrm.id, order, after)
+        query = query.with_only_columns(*_hotel_columns(near)).limit(limit).offset(offset)
+        if with_total:
+            query = query.add_columns(func.count().over().label("total"))
+        rows = (await self.session.execute(query)).all()
+        total = rows[0].total if with_total and rows else None
+        hotels = [self.mapper.map_to_domain_entity(row) for row in rows]
+        return (hotels, total) if with_total else hotels
 
     async def count_filtered_by_time(
         self,
@@ -103,11 +328,140 @@ class HotelsRepository(BaseRepository):
         title=None,
         search=None,
         guests: int = 1,
+        strategy: CountStrategy = "exact",
+        ids: Sequence[int] | None = None,
+        price_min: int | None = None,
+        price_max: int | None = None,
+        capacity: int | None = None,
+        near: tuple[float, float] | None = None,
+        radius_km: float | None = None,
+        facility_ids: Sequence[int] | None = None,
     ) -> int:
-        base = self._base_query(date_from, date_to, city, title, search, guests)
-        count_query = select(func.count()).select_from(base.subquery())
-        result = await self.session.execute(count_query)
-        return result.scalar_one()
+        if ids is None:
+            await self._set_search_threshold(search)
+        base = self._base_query(
+            date_from,
+            date_to,
+            city,
+            title,
+            search,
+            guests,
+            ids,
+            price_min,
+            price_max,
+            capacity,
+            near,
+            radius_km,
+            facility_ids,
+        )
+        return await self.count_rows(base, strategy)
+
+    async def get_facets(
+        self,
+        date_from: date | None,
+        date_to: date | None,
+        city=None,
+        title=None,
+        search=None,
+        guests: int = 1,
+        ids: Sequence[int] | None = None,
+        price_min: int | None = None,
+        price_max: int | None = None,
+        capacity: int | None = None,
+        near: tuple[float, float] | None = None,
+        radius_km: float | None = None,
+        facility_ids: Sequence[int] | None = None,
+    ) -> HotelFacets:
+        """Счётчики фасетов выборки списка отелей — один проход GROUPING SETS по _base_query.
+
+        Наборы: город, диапазон вместимости, диапазон цены «от», удобство и () — total.
+        Удобства разворачиваются LATERAL unnest(hotel_summary.facility_ids), поэтому
+        отели считаются count(DISTINCT id); отель без удобств остаётся в выборке (LEFT JOIN).
+        """
+        if ids is None:
+            await self._set_search_threshold(search)
+        price_bounds = settings.HOTEL_FACET_PRICE_BANDS
+        capacity_bounds = settings.HOTEL_FACET_CAPACITY_BANDS
+        price_band = func.width_bucket(HotelSummaryOrm.min_price, _int_array(price_bounds))
+        capacity_band = func.width_bucket(HotelSummaryOrm.max_capacity, _int_array(capacity_bounds))
+        facility = (
+            func.unnest(HotelSummaryOrm.facility_ids)
+            .table_valued("facility_id")
+            .render_derived()
+            .lateral("hotel_facility")
+        )
+        query = (
+            self._base_query(
+                date_from,
+                date_to,
+                city,
+                title,
+                search,
+                guests,
+                ids,
+                price_min,
+                price_max,
+                capacity,
+                near,
+                radius_km,
+                facility_ids,
+            )
+            .outerjoin(facility, true())
+            .outerjoin(FacilitiesOrm, FacilitiesOrm.id == facility.c.facility_id)
+            .with_only_columns(
+                func.grouping(HotelsOrm.city).label("by_city"),
+                func.grouping(capacity_band).label("by_capacity"),
+                func.grouping(price_band).label("by_price"),
+                func.grouping(facility.c.facility_id).label("by_facility"),
+                HotelsOrm.city,
+                capacity_band.label("capacity_band"),
+                price_band.label("price_band"),
+                facility.c.facility_id,
+                FacilitiesOrm.title.label("facility_title"),
+                func.count(HotelsOrm.id.distinct()).label("hotels"),
+            )
+            .group_by(
+                func.grouping_sets(
+                    tuple_(HotelsOrm.city),
+                    tuple_(capacity_band),
+                    tuple_(price_band),
+                    tuple_(facility.c.facility_id, FacilitiesOrm.title),
+                    literal_column("()"),
+                )
+            )
+        )
+        total, cities, facilities = 0, [], []
+        capacity_counts: dict[int, int] = {}
+        price_counts: dict[int, int] = {}
+        # grouping(...) = 0 — строка набора по этой колонке; NULL-значения (отели без
+        # номеров, без удобств) в фасеты не попадают, но входят в total
+        for row in (await self.session.execute(query)).all():
+            if row.by_city == 0:
+                cities.append(FacetCount(value=row.city, count=row.hotels))
+            elif row.by_capacity == 0:
+                if row.capacity_band:
+                    capacity_counts[row.capacity_band] = row.hotels
+            elif row.by_price == 0:
+                if row.price_band:
+                    price_counts[row.price_band] = row.hotels
+            elif row.by_facility == 0:
+                if row.facility_id is not None:
+                    facilities.append(
+                        FacilityFacetCount(
+                            id=row.facility_id, title=row.facility_title, count=row.hotels
+                        )
+                    )
+            else:
+                total = row.hotels
+        cities.sort(key=lambda f: (-f.count, f.value))
+        facilities.sort(key=lambda f: (-f.count, f.title))
+        return HotelFacets(
+            total=total,
+            cities=cities[: settings.HOTEL_FACET_CITIES_LIMIT],
+            capacity=_range_facets(capacity_bounds, capacity_counts),
+            price=_range_facets(price_bounds, price_counts),
+            facilities=facilities,
+        )
 
     async def get_autocomplete_combined(self, q: str, limit: int = 5) -> dict:
         q_lower = q.strip().lower()
@@ -137,12 +491,13 @@ class HotelsRepository(BaseRepository):
 
         return {"locations": locations, "hotels": hotels}
 
-    async def get_popular_locations(self, limit: int = 8) -> list[str]:
+    async def get_without_coordinates(self, limit: int, after_id: int = 0) -> list[Hotel]:
+        """Отели без координат с id > after_id — порциями для backfill геокодером."""
         query = (
-            select(HotelsOrm.city, func.count(HotelsOrm.id).label("cnt"))
-            .group_by(HotelsOrm.city)
-            .order_by(func.count(HotelsOrm.id).desc())
+            select(self.model)
+            .where(self.model.latitude.is_(None), self.model.id > after_id)
+            .order_by(self.model.id)
             .limit(limit)
         )
         result = await self.session.execute(query)
-        return [row[0] for row in result.all()]
+        return [self.mapper.map_to_domain_entity(m) for m in result.scalars().all()]
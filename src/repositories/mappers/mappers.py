@@ -2,10 +2,11 @@ from src.models.facilities import FacilitiesOrm
 from src.models.hotel_images import HotelImagesOrm
 from src.models.hotels import HotelsOrm
 from src.models.bookings import BookingsOrm
+from src.models.booking_holds import BookingHoldsOrm
 from src.models.rooms import RoomsOrm
 from src.models.users import UsersOrm
 from src.repositories.mappers.base import DataMapper
-from src.schemas.bookings import Booking
+from src.schemas.bookings import Booking, BookingHold
 from src.schemas.facilities import Facility
 from src.schemas.hotels import Hotel
 from src.schemas.images import HotelImage
@@ -43,6 +44,11 @@ class BookingDataMapper(DataMapper):
     schema = Booking
 
 
+class BookingHoldDataMapper(DataMapper):
+    db_model = BookingHoldsOrm
+    schema = BookingHold
+
+
 class FacilityDataMapper(DataMapper):
     db_model = FacilitiesOrm
     schema = Facility
@@ -0,0 +1,69 @@
+from datetime import date, timedelta
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from src.models.bookings import BookingsOrm
+from src.models.hotels import HotelsOrm
+from src.models.popular_locations import PopularLocationsOrm
+from src.models.rooms import RoomsOrm
+from src.repositories.base import BaseRepository
+
+
+class PopularLocationsRepository(BaseRepository):
+    model: type[PopularLocationsOrm] = PopularLocationsOrm
+    mapper = None  # type: ignore  # наружу отдаются только названия городов
+
+    async def get_top(self, limit: int = 8) -> list[str]:
+        """Города по убыванию спроса, затем числа отелей (индекс ix_popular_locations_rank)."""
+        query = (
+            select(self.model.city)
+            .order_by(
+                self.model.bookings_count.desc(), self.model.hotels_count.desc(), self.model.city
+            )
+            .limit(limit)
+        )
+        return list((await self.session.execute(query)).scalars().all())
+
+    async def rebuild(self, bookings_days: int) -> int:
+        """Пересчитывает рейтинг по hotels и bookings. Возвращает число городов.
+
+        Спрос — брони с заездом не раньше bookings_days дней назад (ix_bookings_date_from).
+        Читатели до COMMIT видят прежний рейтинг.
+        """
+        since = date.today() - timedelta(days=bookings_days)
+        hotels = (
+            select(HotelsOrm.city, func.count().label("hotels_count"))
+            .group_by(HotelsOrm.city)
+            .subquery("hotels")
+        )
+        bookings = (
+            select(HotelsOrm.city, func.count().label("bookings_count"))
+            .select_from(BookingsOrm)
+            .join(RoomsOrm, RoomsOrm.id == BookingsOrm.room_id)
+            .join(HotelsOrm, HotelsOrm.id == RoomsOrm.hotel_id)
+            .where(BookingsOrm.date_from >= since)
+            .group_by(HotelsOrm.city)
+            .subquery("bookings")
+        )
+        source = select(
+            hotels.c.city, hotels.c.hotels_count, func.coalesce(bookings.c.bookings_count, 0)
+        ).outerjoin(bookings, bookings.c.city == hotels.c.city)
+        await self.session.execute(delete(self.model))
+        result = await self.session.execute(
+            insert(self.model).from_select(["city", "hotels_count", "bookings_count"], source)
+        )
+        return result.rowcount
+
+    async def adjust_hotels(self, city: str, delta: int) -> None:
+        """Поправка числа отелей города до следующего rebuild; город без отелей удаляется."""
+        stmt = pg_insert(self.model).values(city=city, hotels_count=max(delta, 0))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[self.model.city],
+            set_={"hotels_count": self.model.hotels_count + delta, "updated_at": func.now()},
+        )
+        await self.session.execute(stmt)
+        if delta < 0:
+            await self.session.execute(
+                delete(self.model).where(self.model.city == city, self.model.hotels_count <= 0)
+            )
@@ -0,0 +1,232 @@
+import json
+from datetime import date, timedelta
+
+from sqlalchemy import (
+    Date,
+    Integer,
+    Interval,
+    cast,
+    column,
+    delete,
+    func,
+    insert,
+    literal,
+    literal_column,
+    select,
+    true,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from src.availability.engine import AVAILABILITY_CHANNEL
+from src.config import settings
+from src.exceptions import AllRoomsAreBookedException, RoomNotFoundException
+from src.models.room_inventory import RoomInventoryOrm
+from src.models.rooms import RoomsOrm
+from src.repositories.base import BaseRepository
+from src.repositories.utils import expected_booked_nights, stay_nights
+
+
+class RoomInventoryRepository(BaseRepository):
+    model: type[RoomInventoryOrm] = RoomInventoryOrm
+    mapper = None  # type: ignore  # служебная таблица, наружу не отдаётся
+
+    async def notify(
+        self, room_id: int | None = None, date_from: date | None = None, date_to: date | None = None
+    ) -> None:
+        """NOTIFY для availability engine. Доставляется только после COMMIT транзакции."""
+        if not settings.AVAILABILITY_ENGINE_ENABLED:
+            return
+        payload: dict = {}
+        if room_id is not None:
+            payload["room_id"] = room_id
+        if date_from is not None and date_to is not None:
+            payload["date_from"] = date_from.isoformat()
+            payload["date_to"] = date_to.isoformat()
+        await self.session.execute(
+            select(func.pg_notify(AVAILABILITY_CHANNEL, json.dumps(payload)))
+        )
+
+    async def reserve(self, room_id: int, date_from: date, date_to: date, count: int = 1) -> None:
+        nights = stay_nights(date_from, date_to)
+        if not nights:
+            return
+        stmt = pg_insert(self.model).values(
+            [{"room_id": room_id, "night": night, "booked_count": count} for night in nights]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[self.model.room_id, self.model.night],
+            set_={"booked_count": self.model.booked_count + stmt.excluded.booked_count},
+        )
+        await self.session.execute(stmt)
+        await self.notify(room_id, date_from, date_to)
+
+    async def reserve_if_available(
+        self, room_id: int, date_from: date, date_to: date, count: int = 1
+    ) -> int:
+        """Занимает ночи одним upsert'ом — только те, где остался запас.
+
+        Блокируются лишь строки (room_id, night) этого проживания, строка номера — нет.
+        Возвращает число занятых ночей: меньше длины проживания — какая-то ночь заполнена
+        (или номера нет), и транзакцию нужно откатить.
+        """
+        nights = (
+            func.generate_series(
+                date_from, date_to - timedelta(days=1), cast(literal("1 day"), Interval)
+            )
+            .table_valued("night")
+            .render_derived(name="nights")
+        )
+        source = (
+            select(RoomsOrm.id, cast(nights.c.night, Date), literal(count))
+            .select_from(RoomsOrm)
+            .join(nights, true())
+            .where(RoomsOrm.id == room_id, RoomsOrm.quantity >= count)
+        )
+        quantity = select(RoomsOrm.quantity).where(RoomsOrm.id == room_id).scalar_subquery()
+        stmt = pg_insert(self.model).from_select(["room_id", "night", "booked_count"], source)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[self.model.room_id, self.model.night],
+            set_={"booked_count": self.model.booked_count + stmt.excluded.booked_count},
+            where=self.model.booked_count + stmt.excluded.booked_count <= quantity,
+        ).returning(self.model.night)
+        result = await self.session.execute(stmt)
+        reserved = len(result.all())
+        if reserved:
+            await self.notify(room_id, date_from, date_to)
+        return reserved
+
+    async def reserve_or_raise(self, room_id: int, date_from: date, date_to: date) -> None:
+        """reserve_if_available() для всего проживания или исключение (транзакцию — откатить)."""
+        reserved = await self.reserve_if_available(room_id, date_from, date_to)
+        if reserved < len(stay_nights(date_from, date_to)):
+            if reserved == 0 and not await self._room_exists(room_id):
+                raise RoomNotFoundException()
+            raise AllRoomsAreBookedException()
+
+    async def _room_exists(self, room_id: int) -> bool:
+        result = await self.session.execute(select(RoomsOrm.id).where(RoomsOrm.id == room_id))
+        return result.scalar_one_or_none() is not None
+
+    async def reserve_many_if_available(self, stays: list[tuple[int, date, date]]) -> bool:
+        """Занимает ночи нескольких проживаний (room_id, date_from, date_to) одним upsert'ом.
+
+        Потребность считается по (room_id, night) — несколько единиц одного номера
+        складываются. Строки блокируются в порядке (room_id, night), поэтому встречные
+        групповые брони не дедлочатся. False — хотя бы одна ночь не влезла (или номера нет),
+        транзакцию нужно откатить.
+        """
+        stays = sorted(stays)
+        requested = values(
+            column("room_id", Integer),
+            column("date_from", Date),
+            column("date_to", Date),
+            name="requested",
+        ).data(stays)
+        nights = (
+            func.generate_series(
+                requested.c.date_from, requested.c.date_to - 1, cast(literal("1 day"), Interval)
+            )
+            .table_valued("night")
+            .render_derived(name="nights")
+        )
+        night = cast(nights.c.night, Date)
+        needed = (
+            select(requested.c.room_id, night.label("night"), func.count().label("booked_count"))
+            .select_from(requested)
+            .join(nights, true())
+            .group_by(requested.c.room_id, night)
+            .subquery("needed")
+        )
+        source = (
+            select(needed.c.room_id, needed.c.night, needed.c.booked_count)
+            .join(RoomsOrm, RoomsOrm.id == needed.c.room_id)
+            .where(RoomsOrm.quantity >= needed.c.booked_count)
+            .order_by(needed.c.room_id, needed.c.night)
+        )
+        quantity = (
+            select(RoomsOrm.quantity)
+            .where(RoomsOrm.id == literal_column("excluded.room_id", Integer))
+            .scalar_subquery()
+        )
+        stmt = pg_insert(self.model).from_select(["room_id", "night", "booked_count"], source)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[self.model.room_id, self.model.night],
+            set_={"booked_count": self.model.booked_count + stmt.excluded.booked_count},
+            where=self.model.booked_count + stmt.excluded.booked_count <= quantity,
+        ).returning(self.model.room_id, self.model.night)
+        result = await self.session.execute(stmt)
+
+        expected = {
+            (room_id, night)
+            for room_id, date_from, date_to in stays
+            for night in stay_nights(date_from, date_to)
+        }
+        if len(result.all()) < len(expected):
+            return False
+        for room_id, date_from, date_to in stays:
+            await self.notify(room_id, date_from, date_to)
+        return True
+
+    async def release(self, room_id: int, date_from: date, date_to: date, count: int = 1) -> None:
+        stmt = (
+            update(self.model)
+            .where(
+                self.model.room_id == room_id,
+                self.model.night >= date_from,
+                self.model.night < date_to,
+            )
+            .values(booked_count=self.model.booked_count - count)
+        )
+        await self.session.execute(stmt)
+        await self.notify(room_id, date_from, date_to)
+
+    async def rebuild(self) -> int:
+        """Пересобирает таблицу целиком из bookings и холдов. Возвращает число строк (ночей)."""
+        await self.session.execute(delete(self.model))
+        expected = expected_booked_nights().subquery()
+        result = await self.session.execute(
+            insert(self.model).from_select(
+                ["room_id", "night", "booked_count"],
+                select(expected.c.room_id, expected.c.night, expected.c.booked_count),
+            )
+        )
+        await self.notify()
+        return result.rowcount
+
+    async def find_mismatches(
+        self, limit: int = 100, date_from: date | None = None, date_to: date | None = None
+    ) -> list[dict]:
+        """Ночи, где room_inventory расходится с bookings и холдами (пусто — всё сходится).
+
+        С периодом сверяются только ночи [date_from, date_to): брони отбираются по
+        `stay &&` через GiST-индекс, а не полным проходом по bookings.
+        """
+        expected = expected_booked_nights(date_from, date_to).subquery("expected")
+        actual = select(self.model)
+        if date_from is not None:
+            actual = actual.where(self.model.night >= date_from, self.model.night < date_to)
+        actual = actual.subquery("actual")
+        expected_count = func.coalesce(expected.c.booked_count, 0)
+        actual_count = func.coalesce(actual.c.booked_count, 0)
+        query = (
+            select(
+                func.coalesce(expected.c.room_id, actual.c.room_id).label("room_id"),
+                func.coalesce(expected.c.night, actual.c.night).label("night"),
+                expected_count.label("expected"),
+                actual_count.label("actual"),
+            )
+            .select_from(
+                expected.join(
+                    actual,
+                    (actual.c.room_id == expected.c.room_id) & (actual.c.night == expected.c.night),
+                    full=True,
+                )
+            )
+            .where(expected_count != actual_count)
+            .order_by("room_id", "night")
+            .limit(limit)
+        )
+        result = await self.session.execute(query)
+        return [dict(row) for row in result.mappings().all()]
@@ -1,22 +1,37 @@
-from datetime import date
+from datetime import date, timedelta
+from typing import Sequence
 
-from sqlalchemy import select, func, and_
+from sqlalchemy import Date, Interval, select, func, and_, cast, literal, true
 from sqlalchemy.orm import selectinload
 from sqlalchemy.exc import NoResultFound
 
+from src.availability.client import get_availability_engine
 from src.exceptions import RoomNotFoundException
 from src.repositories.mappers.mappers import RoomDataMapper, RoomDataWithRelsMapper
 from src.repositories.base import BaseRepository
+from src.models.room_inventory import RoomInventoryOrm
 from src.models.rooms import RoomsOrm
-from src.repositories.utils import rooms_ids_for_booking
+from src.schemas.common import CountStrategy
+from src.repositories.utils import (
+    id_in_array,
+    order_by_keyset,
+    rooms_ids_for_booking,
+    rooms_with_facilities,
+)
 
 
 class RoomsRepository(BaseRepository):
     model: type[RoomsOrm] = RoomsOrm
     mapper = RoomDataMapper
 
-    def _available_ids_query(self, hotel_id: int, date_from: date, date_to: date):
-        return rooms_ids_for_booking(date_from, date_to, hotel_id)
+    def _available_filter(self, hotel_id: int, date_from: date, date_to: date):
+        """Номер свободен: ID из движка — одним параметром-массивом, иначе подзапрос."""
+        engine = get_availability_engine()
+        if engine is not None:
+            room_ids = engine.available_room_ids(date_from, date_to, hotel_id)
+            if room_ids is not None:
+                return id_in_array(RoomsOrm.id, room_ids)
+        return RoomsOrm.id.in_(rooms_ids_for_booking(date_from, date_to, hotel_id))
 
     async def get_filtered_by_time(
         self,
@@ -24,37 +39,94 @@ class RoomsRepository(BaseRepository):
         date_from: date | None,
         date_to: date | None,
         limit: int | None = None,
-        offset: int = 0,
+        offset: int | None = None,
+        after: list | None = None,
+        with_total: bool = False,
+        facility_ids: Sequence[int] | None = None,
     ):
-        query = select(self.model).options(selectinload(self.model.facilities))
-        if date_from and date_to:
-            rooms_ids_to_get = self._available_ids_query(hotel_id, date_from, date_to)
-            query = query.filter(RoomsOrm.id.in_(rooms_ids_to_get))
-        else:
-            query = query.filter(RoomsOrm.hotel_id == hotel_id)
+        query = self._filtered_query(hotel_id, date_from, date_to, facility_ids)
+        query = query.options(selectinload(self.model.facilities))
+        query = order_by_keyset(query, RoomsOrm.id, RoomsOrm.id, after=after)
         query = query.limit(limit).offset(offset)
-        result = await self.session.execute(query)
-        return [
-            RoomDataWithRelsMapper.map_to_domain_entity(model) for model in result.scalars().all()
-        ]
+        models, total = await self._fetch_page(query, with_total)
+        rooms = [RoomDataWithRelsMapper.map_to_domain_entity(model) for model in models]
+        return (rooms, total) if with_total else rooms
 
     async def count_filtered_by_time(
-        self, hotel_id: int, date_from: date | None, date_to: date | None
+        self,
+        hotel_id: int,
+        date_from: date | None,
+        date_to: date | None,
+        strategy: CountStrategy = "exact",
+        facility_ids: Sequence[int] | None = None,
     ) -> int:
+        query = self._filtered_query(hotel_id, date_from, date_to, facility_ids)
+        return await self.count_rows(query, strategy)
+
+    def _filtered_query(
+        self,
+        hotel_id: int,
+        date_from: date | None,
+        date_to: date | None,
+        facility_ids: Sequence[int] | None = None,
+    ):
+        """facility_ids — номера со всеми удобствами: `@>` по GIN вместо join на каждое."""
+        query = select(self.model)
+        if facility_ids:
+            query = query.filter(rooms_with_facilities(facility_ids))
         if date_from and date_to:
-            rooms_ids_to_get = self._available_ids_query(hotel_id, date_from, date_to)
-            base = select(self.model).filter(RoomsOrm.id.in_(rooms_ids_to_get))
-        else:
-            base = select(self.model).filter(RoomsOrm.hotel_id == hotel_id)
-        count_query = select(func.count()).select_from(base.subquery())
-        result = await self.session.execute(count_query)
-        return result.scalar_one()
+            return query.filter(self._available_filter(hotel_id, date_from, date_to))
+        return query.filter(RoomsOrm.hotel_id == hotel_id)
+
+    async def get_calendar(
+        self, hotel_id: int, date_from: date, days: int, room_id: int | None = None
+    ) -> list[dict]:
+        """Остаток и цена по ночам для номеров отеля — один запрос.
+
+        rooms × generate_series(ночей) LEFT JOIN room_inventory.
+        """
+        nights = (
+            func.generate_series(
+                date_from,
+                date_from + timedelta(days=days - 1),
+                cast(literal("1 day"), Interval),
+            )
+            .table_valued("night")
+            .render_derived(name="nights")
+        )
+        night = cast(nights.c.night, Date)
+        booked = func.coalesce(RoomInventoryOrm.booked_count, 0)
+        query = (
+            select(
+                RoomsOrm.id.label("room_id"),
+                night.label("night"),
+                func.greatest(RoomsOrm.quantity - booked, 0).label("available"),
+                RoomsOrm.price.label("price"),
+            )
+            .select_from(RoomsOrm)
+            .join(nights, true())
+            .outerjoin(
+                RoomInventoryOrm,
+                and_(RoomInventoryOrm.room_id == RoomsOrm.id, RoomInventoryOrm.night == night),
+            )
+            .where(RoomsOrm.hotel_id == hotel_id)
+            .order_by(RoomsOrm.id, night)
+        )
+        if room_id is not None:
+            query = query.where(RoomsOrm.id == room_id)
+        result = await self.session.execute(query)
+        return [dict(row) for row in result.mappings().all()]
 
     async def count_by_hotel(self, hotel_id: int) -> int:
         query = select(func.count()).where(RoomsOrm.hotel_id == hotel_id)
         result = await self.session.execute(query)
         return result.scalar_one()
 
+    async def get_hotel_ids(self) -> list[int]:
+        """ID отелей, у которых есть номера."""
+        result = await self.session.execute(select(RoomsOrm.hotel_id).distinct())
+        return list(result.scalars().all())
+
     async def get_one_with_rels(self, **filter_by):
         query = (
             select(self.model).options(selectinload(self.model.facilities)).filter_by(**filter_by)
@@ -1,49 +1,172 @@
-from datetime import date
-from sqlalchemy import select, func, Select
+from datetime import date, timedelta
+from typing import Any, Sequence
 
+from sqlalchemy import (
+    select,
+    func,
+    Select,
+    Date,
+    Interval,
+    cast,
+    literal,
+    true,
+    tuple_,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from src.models.booking_holds import BookingHoldsOrm
 from src.models.bookings import BookingsOrm
+from src.models.room_inventory import RoomInventoryOrm
 from src.models.rooms import RoomsOrm
 
 
+def stay_nights(date_from: date, date_to: date) -> list[date]:
+    """Ночи проживания: [date_from, date_to) — день выезда не занимает номер."""
+    return [date_from + timedelta(days=i) for i in range((date_to - date_from).days)]
+
+
+def uncovered_ranges(
+    date_from: date, date_to: date, other_from: date, other_to: date
+) -> list[tuple[date, date]]:
+    """Части периода [date_from, date_to), не покрытые [other_from, other_to) — 0, 1 или 2."""
+    if other_to <= date_from or date_to <= other_from:
+        return [(date_from, date_to)]
+    ranges = []
+    if date_from < other_from:
+        ranges.append((date_from, other_from))
+    if other_to < date_to:
+        ranges.append((other_to, date_to))
+    return ranges
+
+
+def max_booked_for_stay(date_from: date, date_to: date, room_id=RoomsOrm.id):
+    """Скалярный подзапрос: максимум занятых единиц номера за ночи проживания.
+
+    Ограниченный range scan по PK (room_id, night) таблицы room_inventory.
+    """
+    return func.coalesce(
+        select(func.max(RoomInventoryOrm.booked_count))
+        .where(
+            RoomInventoryOrm.room_id == room_id,
+            RoomInventoryOrm.night >= date_from,
+            RoomInventoryOrm.night < date_to,
+        )
+        .scalar_subquery(),
+        0,
+    )
+
+
+def stay_overlaps(date_from: date, date_to: date):
+    """Бронь пересекается с периодом [date_from, date_to): `stay && daterange` (GiST-индекс)."""
+    return BookingsOrm.stay.overlaps(
+        func.daterange(literal(date_from, Date), literal(date_to, Date), "[)")
+    )
+
+
+def _occupied_nights(
+    model: type[BookingsOrm] | type[BookingHoldsOrm],
+    date_from: date | None = None,
+    date_to: date | None = None,
+) -> Select:
+    """(room_id, night) — по строке на каждую ночь каждой брони/холда.
+
+    С периодом — только брони, пересекающие [date_from, date_to), и только их ночи в нём.
+    """
+    first_night, last_night = model.date_from, model.date_to - 1
+    if date_from is not None:
+        first_night = func.greatest(first_night, date_from)
+        last_night = func.least(last_night, date_to - timedelta(days=1))
+    nights = (
+        func.generate_series(first_night, last_night, cast(literal("1 day"), Interval))
+        .table_valued("night")
+        .render_derived(name="nights")
+    )
+    query = (
+        select(model.room_id, cast(nights.c.night, Date).label("night"))
+        .select_from(model)
+        .join(nights, true())
+    )
+    if date_from is not None:
+        if model is BookingsOrm:
+            query = query.where(stay_overlaps(date_from, date_to))
+        else:
+            # Холдов мало и они короткоживущие — отдельный индекс не нужен
+            query = query.where(model.date_from < date_to, model.date_to > date_from)
+    return query
+
+
+def expected_booked_nights(date_from: date | None = None, date_to: date | None = None) -> Select:
+    """(room_id, night, booked_count), посчитанные заново по bookings и booking_holds.
+
+    С периодом — только ночи из [date_from, date_to).
+    """
+    occupied = union_all(
+        _occupied_nights(BookingsOrm, date_from, date_to),
+        _occupied_nights(BookingHoldsOrm, date_from, date_to),
+    ).subquery("occupied")
+    return select(
+        occupied.c.room_id, occupied.c.night, func.count().label("booked_count")
+    ).group_by(occupied.c.room_id, occupied.c.night)
+
+
 def rooms_ids_for_booking(
     date_from: date,
     date_to: date,
     hotel_id: int | None = None,
     guests: int = 1,
+    facility_ids: Sequence[int] | None = None,
 ) -> Select:
-    rooms_count = (
-        select(BookingsOrm.room_id, func.count("*").label("rooms_booked"))
-        .select_from(BookingsOrm)
-        .filter(
-            BookingsOrm.date_from <= date_to,
-            BookingsOrm.date_to >= date_from,
-        )
-        .group_by(BookingsOrm.room_id)
-        .cte(name="rooms_count")
-    )
-
-    rooms_left_table = (
-        select(
-            RoomsOrm.id.label("room_id"),
-            (RoomsOrm.quantity - func.coalesce(rooms_count.c.rooms_booked, 0)).label("rooms_left"),
-        )
-        .select_from(RoomsOrm)
-        .outerjoin(rooms_count, RoomsOrm.id == rooms_count.c.room_id)
-        .cte(name="rooms_left_table")
+    rooms_ids_to_get = select(RoomsOrm.id).filter(
+        RoomsOrm.quantity > max_booked_for_stay(date_from, date_to)
     )
-
-    rooms_ids_for_hotel = select(RoomsOrm.id).select_from(RoomsOrm)
     if hotel_id is not None:
-        rooms_ids_for_hotel = rooms_ids_for_hotel.filter_by(hotel_id=hotel_id)
+        rooms_ids_to_get = rooms_ids_to_get.filter(RoomsOrm.hotel_id == hotel_id)
     if guests > 1:
-        rooms_ids_for_hotel = rooms_ids_for_hotel.filter(RoomsOrm.capacity >= guests)
-
-    rooms_ids_to_get = (
-        select(rooms_left_table.c.room_id)
-        .select_from(rooms_left_table)
-        .filter(
-            rooms_left_table.c.rooms_left > 0,
-            rooms_left_table.c.room_id.in_(rooms_ids_for_hotel),
-        )
-    )
+        rooms_ids_to_get = rooms_ids_to_get.filter(RoomsOrm.capacity >= guests)
+    if facility_ids:
+        rooms_ids_to_get = rooms_ids_to_get.filter(rooms_with_facilities(facility_ids))
     return rooms_ids_to_get
+
+
+def id_in_array(column, ids: Sequence):
+    """`column = ANY(:ids)` — один bind-параметр-массив вместо IN со своим $N на каждый id.
+
+    Не упирается в лимит asyncpg в 32767 параметров, и prepared statement один на любую
+    длину списка.
+    """
+    return column == func.any(literal(list(ids), ARRAY(column.type)))
+
+
+def rooms_with_facilities(facility_ids: Sequence[int]):
+    """У номера есть все удобства: `facility_ids @> ARRAY[...]` (GIN ix_rooms_facility_ids)."""
+    return RoomsOrm.facility_ids.contains(list(facility_ids))
+
+
+def order_by_keyset(
+    query: Select,
+    sort_column,
+    id_column,
+    order: str = "asc",
+    after: list[Any] | None = None,
+) -> Select:
+    """Сортировка по (sort_column, id) и, если задан after, — строки строго после него.
+
+    after — позиция из курсора [значение сортировки, id]: `WHERE (sort, id) > (:v, :id)`
+    вместо OFFSET, поэтому глубокие страницы не дороже первой.
+    """
+    desc = order == "desc"
+    if sort_column is id_column:
+        if after is not None:
+            query = query.where(id_column < after[1] if desc else id_column > after[1])
+        return query.order_by(id_column.desc() if desc else id_column.asc())
+    if after is not None:
+        value, last_id = after
+        if sort_column.type.python_type is date and isinstance(value, str):
+            value = date.fromisoformat(value)
+        key = tuple_(sort_column, id_column)
+        bound = tuple_(literal(value, sort_column.type), literal(last_id, id_column.type))
+        query = query.where(key < bound if desc else key > bound)
+    if desc:
+        return query.order_by(sort_column.desc(), id_column.desc())
+    return query.order_by(sort_column.asc(), id_column.asc())
@@ -1,6 +1,6 @@
 from datetime import date, datetime, timezone
-from pydantic import BaseModel, ConfigDict, field_validator, model_validator
-from typing import Any
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+from typing import Any, Literal
 
 
 class BookingAddRequest(BaseModel):
@@ -30,6 +30,10 @@ class BookingAddRequest(BaseModel):
         return self
 
 
+class BookingBatchRequest(BaseModel):
+    bookings: list[BookingAddRequest] = Field(min_length=1, max_length=30)
+
+
 class BookingPatchRequest(BaseModel):
     date_from: date | None = None
     date_to: date | None = None
@@ -59,3 +63,21 @@ class Booking(BookingAdd):
     id: int
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class BookingHold(BaseModel):
+    id: int
+    user_id: int
+    room_id: int
+    date_from: date
+    date_to: date
+    expires_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class BookingQueueTicket(BaseModel):
+    ticket: str
+    status: Literal["pending", "confirmed", "rejected"]
+    booking: Booking | None = None
+    detail: str | None = None
@@ -1,9 +1,22 @@
-from typing import Generic, TypeVar
+import base64
+import json
+from typing import Any, Generic, Literal, TypeVar
 
 from pydantic import BaseModel, computed_field
 
 T = TypeVar("T")
 
+# Как считать total для offset-пагинации:
+#   exact    — отдельный COUNT(*) по всей выборке;
+#   window   — COUNT(*) OVER() в запросе страницы, без второго прохода по выборке;
+#   estimate — оценка планировщика (EXPLAIN), точный COUNT только для узких выборок;
+#   capped   — считаем не дальше COUNT_CAP строк, дальше total = COUNT_CAP («1000+»).
+CountStrategy = Literal["exact", "window", "estimate", "capped"]
+
+COUNT_CAP = 1000
+# Ниже этого порога оценка планировщика слишком груба — считаем точно
+COUNT_ESTIMATE_MIN = 1000
+
 
 class PaginatedResponse(BaseModel, Generic[T]):
     items: list[T]
@@ -11,13 +24,66 @@ class PaginatedResponse(BaseModel, Generic[T]):
     page: int
     per_page: int
     pages: int
+    # False — total оценочный (estimate) или обрезан по COUNT_CAP (capped)
+    total_is_exact: bool = True
 
     @computed_field
     @property
     def has_next(self) -> bool:
-        return self.page < self.pages
+        if self.total_is_exact:
+            return self.page < self.pages
+        return len(self.items) == self.per_page
 
     @computed_field
     @property
     def has_prev(self) -> bool:
         return self.page > 1
+
+
+def encode_cursor(sort_by: str, order: str, key: list[Any]) -> str:
+    """Непрозрачный курсор: позиция (значение сортировки, id) и сама сортировка."""
+    payload = json.dumps({"s": sort_by, "o": order, "k": key}, default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str, order: str) -> list[Any] | None:
+    """Позиция из курсора (None для пустого — первая страница).
+
+    ValueError — курсор битый или выдан для другой сортировки.
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        key = payload["k"]
+    except (ValueError, TypeError, KeyError) as exc:
+        raise ValueError("invalid cursor") from exc
+    if payload.get("s") != sort_by or payload.get("o") != order or len(key) != 2:
+        raise ValueError("cursor does not match sort order")
+    return key
+
+
+class CursorPage(BaseModel, Generic[T]):
+    """Keyset-страница: без OFFSET и COUNT. Следующая страница — `?cursor=<next_cursor>`."""
+
+    items: list[T]
+    per_page: int
+    next_cursor: str | None
+
+    @computed_field
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @classmethod
+    def from_rows(
+        cls, rows: list, per_page: int, sort_by: str = "id", order: str = "asc"
+    ) -> "CursorPage":
+        """rows — до per_page + 1 строк: лишняя строка означает, что есть следующая страница."""
+        items = rows[:per_page]
+        next_cursor = None
+        if len(rows) > per_page:
+            last = items[-1]
+            next_cursor = encode_cursor(sort_by, order, [getattr(last, sort_by), last.id])
+        return cls(items=items, per_page=per_page, next_cursor=next_cursor)
@@ -1,7 +1,9 @@
 from typing import Optional, Annotated
-from pydantic import BaseModel, StringConstraints, field_validator
+from pydantic import BaseModel, Field, StringConstraints, field_validator, model_validator
 
 NonEmptyStr = Annotated[str, StringConstraints(strip_whitespace=True)]
+Latitude = Annotated[float, Field(ge=-90, le=90)]
+Longitude = Annotated[float, Field(ge=-180, le=180)]
 
 
 def not_blank(value: str) -> str:
@@ -10,7 +12,22 @@ def not_blank(value: str) -> str:
     return value
 
 
-class HotelAdd(BaseModel):
+class CoordinatesMixin(BaseModel):
+    latitude: Optional[Latitude] = None
+    longitude: Optional[Longitude] = None
+
+    @model_validator(mode="after")
+    def validate_coordinates_pair(self):
+        if (self.latitude is None) != (self.longitude is None):
+            raise ValueError("Широта и долгота задаются вместе")
+        return self
+
+    @property
+    def has_coordinates(self) -> bool:
+        return self.latitude is not None
+
+
+class HotelAdd(CoordinatesMixin):
     title: NonEmptyStr
     city: NonEmptyStr
     address: Optional[str] = None
@@ -21,7 +38,7 @@ class HotelAdd(BaseModel):
         return not_blank(value)
 
 
-class HotelPatch(BaseModel):
+class HotelPatch(CoordinatesMixin):
     title: Optional[str] = None
     city: Optional[str] = None
     address: Optional[str] = None
@@ -34,9 +51,18 @@ class HotelPatch(BaseModel):
         return not_blank(value)
 
 
+class HotelCoordinates(BaseModel):
+    latitude: Latitude
+    longitude: Longitude
+
+
 class Hotel(HotelAdd):
     id: int
     cover_image_url: str | None = None
+    # Цена «от» за ночь — самый дешёвый номер отеля (в списке, из hotel_summary)
+    min_price: int | None = None
+    # Расстояние от near, км (только в гео-поиске)
+    distance_km: float | None = None
 
 
 class HotelSuggestion(BaseModel):
@@ -48,3 +74,29 @@ class HotelSuggestion(BaseModel):
 class AutocompleteResult(BaseModel):
     locations: list[str]
     hotels: list[HotelSuggestion]
+
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+
+class RangeFacetCount(BaseModel):
+    # Границы включительно, как у фильтров price_min/price_max; max=None — «и выше»
+    min: int
+    max: int | None = None
+    count: int
+
+
+class FacilityFacetCount(BaseModel):
+    id: int
+    title: str
+    count: int
+
+
+class HotelFacets(BaseModel):
+    total: int
+    cities: list[FacetCount]
+    capacity: list[RangeFacetCount]
+    price: list[RangeFacetCount]
+    facilities: list[FacilityFacetCount]
@@ -1,3 +1,5 @@
+from datetime import date
+
 from pydantic import BaseModel, ConfigDict, field_validator, model_validator
 from typing import List, Optional
 
@@ -135,3 +137,14 @@ class RoomPatch(BaseModel):
     price: int | None = None
     quantity: int | None = None
     capacity: int | None = None
+
+
+class CalendarDay(BaseModel):
+    date: date
+    available: int
+    price: int
+
+
+class RoomCalendar(BaseModel):
+    room_id: int
+    days: list[CalendarDay]
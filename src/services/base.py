@@ -1,8 +1,64 @@
+import math
+from typing import Any, Awaitable, Callable
+
+from src.exceptions import InvalidCursorException
+from src.schemas.common import (
+    COUNT_CAP,
+    COUNT_ESTIMATE_MIN,
+    CountStrategy,
+    PaginatedResponse,
+    decode_cursor,
+)
 from src.utils.db_manager import DBManager
 
 
 class BaseService:
     db: DBManager | None
+    # Стратегия подсчёта total для list-эндпоинта сервиса, если клиент не выбрал свою
+    default_count: CountStrategy = "exact"
 
     def __init__(self, db: DBManager | None = None) -> None:
         self.db = db
+
+    @staticmethod
+    def cursor_position(cursor: str, sort_by: str = "id", order: str = "asc") -> list | None:
+        """Позиция keyset-пагинации из курсора запроса."""
+        try:
+            return decode_cursor(cursor, sort_by, order)
+        except ValueError:
+            raise InvalidCursorException()
+
+    @staticmethod
+    async def paginate(
+        page: int,
+        per_page: int,
+        count: CountStrategy,
+        fetch_page: Callable[..., Awaitable[Any]],
+        count_rows: Callable[..., Awaitable[int]],
+    ) -> PaginatedResponse:
+        """Offset-страница и total по стратегии count.
+
+        fetch_page(limit, offset[, with_total]) — строки страницы, count_rows(strategy) — total.
+        """
+        limit, offset = per_page, per_page * (page - 1)
+        exact = True
+        if count == "window":
+            items, total = await fetch_page(limit=limit, offset=offset, with_total=True)
+            if total is None:
+                # Страница за пределами выборки — окну нечего посчитать
+                total = await count_rows(strategy="exact")
+        else:
+            items = await fetch_page(limit=limit, offset=offset)
+            total = await count_rows(strategy=count)
+            if count == "capped" and total > COUNT_CAP:
+                total, exact = COUNT_CAP, False
+            elif count == "estimate" and total >= COUNT_ESTIMATE_MIN:
+                exact = False
+        return PaginatedResponse(
+            items=items,
+            total=total,
+            page=page,
+            per_page=per_page,
+            pages=max(1, math.ceil(total / per_page)),
+            total_is_exact=exact,
+        )
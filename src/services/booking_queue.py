@@ -0,0 +1,78 @@
+import asyncio
+import json
+import uuid
+
+from src.connectors.redis_connector import RedisManager
+from src.exceptions import BookingQueueDisabledException, BookingTicketNotFoundException
+from src.schemas.bookings import BookingAddRequest, BookingQueueTicket
+
+# Заявки номера — отдельный stream: consumer применяет их строго по очереди
+ROOM_STREAM_PREFIX = "booking_queue:room:"
+# Номера, в stream которых есть необработанные заявки (дубли допустимы)
+READY_KEY = "booking_queue:ready"
+TICKET_PREFIX = "booking_queue:ticket:"
+
+_POLL_INTERVAL_SECONDS = 0.25
+
+
+def room_stream_key(room_id: int) -> str:
+    return f"{ROOM_STREAM_PREFIX}{room_id}"
+
+
+def ticket_key(ticket: str) -> str:
+    return f"{TICKET_PREFIX}{ticket}"
+
+
+class BookingQueueService:
+    """Приём заявок на бронь через Redis streams (режим BOOKING_QUEUE_ENABLED)."""
+
+    def __init__(self, redis: RedisManager, enabled: bool, result_ttl: int) -> None:
+        self._redis = redis
+        self._enabled = enabled
+        self._result_ttl = result_ttl
+
+    async def enqueue(self, user_id: int, booking_data: BookingAddRequest) -> BookingQueueTicket:
+        """Ставит заявку в stream номера и возвращает тикет со статусом pending."""
+        if not self._enabled or self._redis.redis is None:
+            raise BookingQueueDisabledException()
+        ticket = uuid.uuid4().hex
+        await self._redis.set(
+            ticket_key(ticket),
+            json.dumps({"user_id": user_id, "status": "pending"}),
+            expire=self._result_ttl,
+        )
+        await self._redis.redis.xadd(
+            room_stream_key(booking_data.room_id),
+            {
+                "ticket": ticket,
+                "user_id": user_id,
+                "date_from": booking_data.date_from.isoformat(),
+                "date_to": booking_data.date_to.isoformat(),
+            },
+        )
+        # После XADD: consumer, увидевший номер в ready, гарантированно увидит и заявку
+        await self._redis.redis.rpush(READY_KEY, booking_data.room_id)
+        return BookingQueueTicket(ticket=ticket, status="pending")
+
+    async def get_status(self, user_id: int, ticket: str, wait: float = 0) -> BookingQueueTicket:
+        """Статус заявки. wait > 0 — long-poll: ждать результата до wait секунд."""
+        if self._redis.redis is None:
+            raise BookingQueueDisabledException()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + wait
+        while True:
+            raw = await self._redis.get(ticket_key(ticket))
+            if raw is None:
+                raise BookingTicketNotFoundException()
+            data = json.loads(raw)
+            # Чужой тикет неотличим от несуществующего
+            if data["user_id"] != user_id:
+                raise BookingTicketNotFoundException()
+            if data["status"] != "pending" or loop.time() >= deadline:
+                return BookingQueueTicket(
+                    ticket=ticket,
+                    status=data["status"],
+                    booking=data.get("booking"),
+                    detail=data.get("detail"),
+                )
+            await asyncio.sleep(min(_POLL_INTERVAL_SECONDS, max(deadline - loop.time(), 0)))
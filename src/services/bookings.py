@@ -1,56 +1,149 @@
-import math
+import logging
+from functools import partial
+from datetime import date
 
+from src.cache import invalidate_hotel_availability
+from src.config import settings
 from src.exceptions import (
+    AllRoomsAreBookedException,
+    BookingHoldNotFoundException,
     ObjectNotFoundException,
     RoomNotFoundException,
     check_date_to_after_date_from,
 )
 from src.schemas.bookings import (
     Booking,
-    BookingAdd,
     BookingAddRequest,
+    BookingBatchRequest,
+    BookingHold,
     BookingPatchRequest,
 )
-from src.schemas.common import PaginatedResponse
-from src.schemas.hotels import Hotel
+from src.schemas.common import CountStrategy, CursorPage, PaginatedResponse
 from src.schemas.rooms import Room
 from src.services.base import BaseService
 
+logger = logging.getLogger(__name__)
+
+_QUEUE_ENTRY_FAILED = "Заявку не удалось обработать"
+
 
 class BookingService(BaseService):
-    async def add_booking(self, user_id: int, booking_data: BookingAddRequest):
-        try:
-            room: Room = await self.db.rooms.get_one(id=booking_data.room_id)
-        except ObjectNotFoundException as ex:
-            raise RoomNotFoundException from ex
-
-        hotel: Hotel = await self.db.hotels.get_one(id=room.hotel_id)
-
-        _booking_data = BookingAdd(
-            user_id=user_id,
-            price=room.price,
-            **booking_data.model_dump(),
+    async def add_booking(self, user_id: int, booking_data: BookingAddRequest) -> Booking:
+        booking, hotel_id = await self.db.bookings.add_booking(
+            user_id, booking_data.room_id, booking_data.date_from, booking_data.date_to
+        )
+        await self.db.commit()
+        await invalidate_hotel_availability(hotel_id)
+        return booking
+
+    async def add_bookings_batch(
+        self, user_id: int, batch_data: BookingBatchRequest
+    ) -> list[Booking]:
+        stays = [(b.room_id, b.date_from, b.date_to) for b in batch_data.bookings]
+        created = await self.db.bookings.add_bookings(user_id, stays)
+        await self.db.commit()
+        for hotel_id in sorted({hotel_id for _, hotel_id in created}):
+            await invalidate_hotel_availability(hotel_id)
+        return [booking for booking, _ in created]
+
+    async def apply_queued_batch(self, room_id: int, entries: list[dict]) -> dict[str, dict]:
+        """Применяет пачку заявок одного номера из очереди — одной транзакцией, по порядку.
+
+        Каждая заявка в своём SAVEPOINT: отказ или любая другая ошибка по одной
+        отклоняет только её — иначе «ядовитая» заявка вечно блокировала бы очередь номера.
+        Доставка at-least-once, поэтому тикет хранится в брони (UNIQUE): заявка, бронь
+        по которой уже есть (пачка закоммичена, а XDEL не дошёл), не применяется снова.
+        Возвращает {ticket: результат} для записи в статус тикета.
+        """
+        applied = await self.db.bookings.get_by_queue_tickets(
+            [entry["ticket"] for entry in entries]
+        )
+        results: dict[str, dict] = {}
+        hotel_id = None
+        for entry in entries:
+            ticket = entry["ticket"]
+            booking = applied.get(ticket)
+            detail = _QUEUE_ENTRY_FAILED
+            if booking is None:
+                try:
+                    async with self.db.savepoint():
+                        booking, hotel_id = await self.db.bookings.add_booking(
+                            entry["user_id"],
+                            room_id,
+                            date.fromisoformat(entry["date_from"]),
+                            date.fromisoformat(entry["date_to"]),
+                            queue_ticket=ticket,
+                        )
+                except (AllRoomsAreBookedException, RoomNotFoundException) as exc:
+                    detail = exc.detail
+                except Exception as exc:
+                    logger.warning("Заявка %s на номер %s не применена: %r", ticket, room_id, exc)
+                    # Нарушение UNIQUE — ту же заявку уже применил другой consumer
+                    booking = (await self.db.bookings.get_by_queue_tickets([ticket])).get(ticket)
+            result = {"user_id": entry["user_id"]}
+            if booking is not None:
+                result.update(status="confirmed", booking=booking.model_dump(mode="json"))
+            else:
+                result.update(status="rejected", detail=detail)
+            results[ticket] = result
+        await self.db.commit()
+        if hotel_id is not None:
+            await invalidate_hotel_availability(hotel_id)
+        return results
+
+    async def add_hold(self, user_id: int, hold_data: BookingAddRequest) -> BookingHold:
+        hold, hotel_id = await self.db.booking_holds.add_hold(
+            user_id,
+            hold_data.room_id,
+            hold_data.date_from,
+            hold_data.date_to,
+            ttl_minutes=settings.BOOKING_HOLD_TTL_MINUTES,
         )
+        await self.db.commit()
+        await invalidate_hotel_availability(hotel_id)
+        return hold
 
-        booking = await self.db.bookings.add_booking(_booking_data, hotel_id=hotel.id)
+    async def confirm_hold(self, user_id: int, hold_id: int) -> Booking:
+        # Ночи уже заняты холдом — повторной проверки доступности не нужно,
+        # занятость не меняется, поэтому и календарь не сбрасывается
+        hold = await self.db.booking_holds.pop_active(hold_id, user_id)
+        if hold is None:
+            raise BookingHoldNotFoundException()
+        booking, _ = await self.db.bookings.add_reserved(
+            user_id, hold.room_id, hold.date_from, hold.date_to
+        )
         await self.db.commit()
         return booking
 
+    async def cancel_hold(self, user_id: int, hold_id: int) -> None:
+        hold = await self.db.booking_holds.cancel(hold_id, user_id)
+        if hold is None:
+            raise BookingHoldNotFoundException()
+        room: Room = await self.db.rooms.get_one(id=hold.room_id)
+        await self.db.commit()
+        await invalidate_hotel_availability(room.hotel_id)
+
     async def get_my_bookings(
-        self, user_id: int, page: int = 1, per_page: int = 20
-    ) -> PaginatedResponse[Booking]:
-        total = await self.db.bookings.count_by_user(user_id)
-        items = await self.db.bookings.get_paginated_by_user(
-            user_id=user_id,
-            limit=per_page,
-            offset=per_page * (page - 1),
-        )
-        return PaginatedResponse(
-            items=items,
-            total=total,
-            page=page,
-            per_page=per_page,
-            pages=max(1, math.ceil(total / per_page)),
+        self,
+        user_id: int,
+        page: int = 1,
+        per_page: int = 20,
+        cursor: str | None = None,
+        count: CountStrategy | None = None,
+    ) -> PaginatedResponse[Booking] | CursorPage[Booking]:
+        if cursor is not None:
+            rows = await self.db.bookings.get_paginated_by_user(
+                user_id=user_id,
+                limit=per_page + 1,
+                after=self.cursor_position(cursor, "date_from", "desc"),
+            )
+            return CursorPage.from_rows(rows, per_page, "date_from", "desc")
+        return await self.paginate(
+            page,
+            per_page,
+            count or self.default_count,
+            partial(self.db.bookings.get_paginated_by_user, user_id=user_id),
+            partial(self.db.bookings.count_by_user, user_id),
         )
 
     async def get_booking(self, user_id: int, booking_id: int) -> Booking:
@@ -63,13 +156,15 @@ class BookingService(BaseService):
         booking = await self.db.bookings.get_one_or_none(id=booking_id, user_id=user_id)
         if booking is None:
             raise ObjectNotFoundException()
+        room: Room = await self.db.rooms.get_one(id=booking.room_id)
         await self.db.bookings.delete(id=booking_id, user_id=user_id)
         await self.db.commit()
+        await invalidate_hotel_availability(room.hotel_id)
 
     async def patch_booking(
         self, user_id: int, booking_id: int, data: BookingPatchRequest
     ) -> Booking:
-        booking = await self.db.bookings.get_one_or_none(id=booking_id, user_id=user_id)
+        booking = await self.db.bookings.get_for_update(booking_id, user_id)
         if booking is None:
             raise ObjectNotFoundException()
 
@@ -78,21 +173,9 @@ class BookingService(BaseService):
 
         check_date_to_after_date_from(new_date_from, new_date_to)
 
-        room: Room = await self.db.rooms.get_one(id=booking.room_id)
-        hotel: Hotel = await self.db.hotels.get_one(id=room.hotel_id)
-
-        # Delete old booking within this transaction so the availability
-        # re-check sees the freed slot. If add_booking raises, the transaction
-        # rolls back and the original booking is preserved.
-        await self.db.bookings.delete(id=booking_id, user_id=user_id)
-
-        new_booking_data = BookingAdd(
-            user_id=user_id,
-            room_id=booking.room_id,
-            date_from=new_date_from,
-            date_to=new_date_to,
-            price=room.price,
-        )
-        new_booking = await self.db.bookings.add_booking(new_booking_data, hotel_id=hotel.id)
+        # Бронь меняется на месте: проверяются только добавленные ночи. Если их
+        # не хватает — исключение, транзакция откатывается, бронь не меняется.
+        updated, hotel_id = await self.db.bookings.change_dates(booking, new_date_from, new_date_to)
         await self.db.commit()
-        return new_booking
+        await invalidate_hotel_availability(hotel_id)
+        return updated
@@ -1,14 +1,25 @@
-import math
-
+from src.cache import FACILITIES_TAG, HOTEL_TAG, ROOM_TAG, SEARCH_TAG, invalidate_cache
 from src.exceptions import (
     FacilityTitleEmptyException,
+    InvalidFacilityIdsException,
     ObjectAlreadyExistsException,
 )
-from src.schemas.common import PaginatedResponse
+from src.schemas.common import CountStrategy, CursorPage, PaginatedResponse
 from src.schemas.facilities import FacilityAdd, Facility
 from src.services.base import BaseService
 
 
+def parse_facility_ids(value: str) -> list[int]:
+    """`"1,4,7"` → [1, 4, 7] без повторов. Бросает InvalidFacilityIdsException."""
+    try:
+        ids = sorted({int(part) for part in value.split(",")})
+    except ValueError:
+        raise InvalidFacilityIdsException()
+    if not ids or ids[0] < 1:
+        raise InvalidFacilityIdsException()
+    return ids
+
+
 class FacilityService(BaseService):
     async def facility_add(self, data: FacilityAdd) -> Facility:
         if not data.title.strip():
@@ -19,6 +30,7 @@ class FacilityService(BaseService):
             await self.db.commit()
         except ObjectAlreadyExistsException:
             raise
+        await invalidate_cache(FACILITIES_TAG)
         return facility
 
     async def facility_delete(self, facility_id: int) -> None:
@@ -26,17 +38,33 @@ class FacilityService(BaseService):
             id=facility_id
         )  # raises ObjectNotFoundException if missing
         await self.db.facilities.delete(id=facility_id)
+        rooms = await self.db.rooms_facilities.remove_facility(facility_id)
+        await self.db.hotel_summary.refresh_with_facility(facility_id)
         await self.db.commit()
+        # Удобство пропадает из карточек его номеров и отелей и из фильтра выдачи
+        await invalidate_cache(
+            FACILITIES_TAG,
+            SEARCH_TAG,
+            *{ROOM_TAG.format(room_id=room_id) for room_id, _ in rooms},
+            *{HOTEL_TAG.format(hotel_id=hotel_id) for _, hotel_id in rooms},
+        )
 
     async def get_facilities(
-        self, page: int = 1, per_page: int = 50
-    ) -> PaginatedResponse[Facility]:
-        total = await self.db.facilities.count()
-        items = await self.db.facilities.get_paginated(limit=per_page, offset=per_page * (page - 1))
-        return PaginatedResponse(
-            items=items,
-            total=total,
-            page=page,
-            per_page=per_page,
-            pages=max(1, math.ceil(total / per_page)),
+        self,
+        page: int = 1,
+        per_page: int = 50,
+        cursor: str | None = None,
+        count: CountStrategy | None = None,
+    ) -> PaginatedResponse[Facility] | CursorPage[Facility]:
+        if cursor is not None:
+            rows = await self.db.facilities.get_paginated(
+                limit=per_page + 1, after=self.cursor_position(cursor)
+            )
+            return CursorPage.from_rows(rows, per_page)
+        return await self.paginate(
+            page,
+            per_page,
+            count or self.default_count,
+            self.db.facilities.get_paginated,
+            self.db.facilities.count,
         )
@@ -1,23 +1,32 @@
 import logging
-import math
 from datetime import date
+from functools import partial
 
+from src.cache import HOTEL_TAG, SEARCH_TAG, invalidate_cache
+from src.config import settings
 from src.exceptions import (
     CannotDeleteHotelWithRoomsException,
+    GeoPointRequiredException,
     HotelNotFoundException,
     ObjectNotFoundException,
     check_date_to_after_date_from,
 )
-from src.schemas.common import PaginatedResponse
-from src.schemas.hotels import Hotel, HotelAdd, HotelPatch
+from src.geo import parse_geo_point
+from src.schemas.common import CountStrategy, CursorPage, PaginatedResponse
+from src.schemas.hotels import Hotel, HotelAdd, HotelFacets, HotelPatch
 from src.services.base import BaseService
+from src.services.facilities import parse_facility_ids
 from src.elastic.client import get_es_client
 from src.elastic import hotels as es_hotels
+from src.tasks.geo import geocode_hotel
 
 logger = logging.getLogger(__name__)
 
 
 class HotelService(BaseService):
+    # Поиск с датами дорого пересчитывать отдельным COUNT — total берём из окна
+    default_count: CountStrategy = "window"
+
     async def get_filtered_by_time(
         self,
         pagination,
@@ -25,46 +34,132 @@ class HotelService(BaseService):
         title: str | None,
         date_from: date | None,
         date_to: date | None,
-        sort_by: str = "id",
+        sort_by: str | None = "id",
         order: str = "asc",
         guests: int = 1,
         search: str | None = None,
-    ) -> PaginatedResponse[Hotel]:
-        if date_from and date_to:
-            check_date_to_after_date_from(date_from, date_to)
+        price_min: int | None = None,
+        price_max: int | None = None,
+        capacity: int | None = None,
+        near: str | None = None,
+        radius_km: float | None = None,
+        facilities: str | None = None,
+    ) -> PaginatedResponse[Hotel] | CursorPage[Hotel]:
+        if sort_by is None:
+            sort_by = "distance" if near else "id"
+        if sort_by == "distance":
+            if not near:
+                raise GeoPointRequiredException()
+            sort_by = "distance_km"
+        if sort_by == "price":
+            # Ключ сортировки = поле ответа: курсор берёт значение из последнего отеля
+            sort_by = "min_price"
+            # У отеля без номеров цены нет — в сортировке по цене (и в total) он не участвует
+            price_min = price_min or 0
         per_page = pagination.per_page
-        offset = per_page * (pagination.page - 1)
-
-        items, total = (
-            await self.db.hotels.get_filtered_by_time(
-                date_from=date_from,
-                date_to=date_to,
-                city=city,
-                title=title,
-                search=search,
-                limit=per_page,
-                offset=offset,
+        filters = await self._search_filters(
+            city,
+            title,
+            date_from,
+            date_to,
+            guests,
+            search,
+            price_min,
+            price_max,
+            capacity,
+            near,
+            radius_km,
+            facilities,
+        )
+        if pagination.cursor is not None:
+            if sort_by == "relevance":
+                # Курсор строится по (колонка, id); релевантность не колонка — листаем по id
+                sort_by = "id"
+            rows = await self.db.hotels.get_filtered_by_time(
+                **filters,
+                limit=per_page + 1,
                 sort_by=sort_by,
                 order=order,
-                guests=guests,
-            ),
-            await self.db.hotels.count_filtered_by_time(
-                date_from=date_from,
-                date_to=date_to,
-                city=city,
-                title=title,
-                search=search,
-                guests=guests,
-            ),
+                after=self.cursor_position(pagination.cursor, sort_by, order),
+            )
+            return CursorPage.from_rows(rows, per_page, sort_by, order)
+        return await self.paginate(
+            pagination.page,
+            per_page,
+            pagination.count or self.default_count,
+            partial(self.db.hotels.get_filtered_by_time, **filters, sort_by=sort_by, order=order),
+            partial(self.db.hotels.count_filtered_by_time, **filters),
         )
 
-        return PaginatedResponse(
-            items=items,
-            total=total,
-            page=pagination.page,
-            per_page=per_page,
-            pages=max(1, math.ceil(total / per_page)),
+    async def get_facets(
+        self,
+        city: str | None,
+        title: str | None,
+        date_from: date | None,
+        date_to: date | None,
+        guests: int = 1,
+        search: str | None = None,
+        price_min: int | None = None,
+        price_max: int | None = None,
+        capacity: int | None = None,
+        near: str | None = None,
+        radius_km: float | None = None,
+        facilities: str | None = None,
+    ) -> HotelFacets:
+        """Счётчики фасетов для выборки get_filtered_by_time с теми же фильтрами."""
+        filters = await self._search_filters(
+            city,
+            title,
+            date_from,
+            date_to,
+            guests,
+            search,
+            price_min,
+            price_max,
+            capacity,
+            near,
+            radius_km,
+            facilities,
+        )
+        return await self.db.hotels.get_facets(**filters)
+
+    async def _search_filters(
+        self,
+        city: str | None,
+        title: str | None,
+        date_from: date | None,
+        date_to: date | None,
+        guests: int,
+        search: str | None,
+        price_min: int | None,
+        price_max: int | None,
+        capacity: int | None,
+        near: str | None,
+        radius_km: float | None,
+        facilities: str | None,
+    ) -> dict:
+        """Фильтры списка отелей для HotelsRepository; текстовую часть отбирает ES, если он есть."""
+        if date_from and date_to:
+            check_date_to_after_date_from(date_from, date_to)
+        point = parse_geo_point(near) if near else None
+        filters: dict = dict(
+            date_from=date_from,
+            date_to=date_to,
+            guests=guests,
+            price_min=price_min,
+            price_max=price_max,
+            capacity=capacity,
+            near=point,
+            radius_km=(radius_km or settings.GEO_DEFAULT_RADIUS_KM) if point else None,
+            facility_ids=parse_facility_ids(facilities) if facilities else None,
         )
+        ids = await self._es_search_ids(search, city, title)
+        if ids is not None:
+            # Текстовую часть отобрал ES; PostgreSQL загружает эти ID и проверяет даты
+            filters["ids"] = ids
+        else:
+            filters.update(city=city, title=title, search=search)
+        return filters
 
     async def get_hotel(self, hotel_id: int):
         return await self.db.hotels.get_one(id=hotel_id)
@@ -73,37 +168,63 @@ class HotelService(BaseService):
         # Rely on the DB unique constraint (uq_hotels_title_city_address).
         # BaseRepository.add() catches UniqueViolationError → ObjectAlreadyExistsException.
         hotel = await self.db.hotels.add(data)
+        await self.db.hotel_summary.refresh(hotel.id)
+        await self.db.popular_locations.adjust_hotels(hotel.city, 1)
         await self.db.commit()
+        await invalidate_cache(SEARCH_TAG)
         await self._es_index(hotel.id, hotel.title, hotel.city, hotel.address)
+        if not data.has_coordinates:
+            self._schedule_geocode(hotel.id)
         return hotel
 
     async def hotel_put_update(self, hotel_id: int, data: HotelAdd) -> Hotel:
-        await self.get_hotel_with_check(hotel_id)
+        old = await self.get_hotel_with_check(hotel_id)
         await self.db.hotels.edit(data, id=hotel_id)
+        await self._move_city(old.city, data.city)
         await self.db.commit()
+        await invalidate_cache(HOTEL_TAG.format(hotel_id=hotel_id), SEARCH_TAG)
         hotel = await self.get_hotel(hotel_id)
         await self._es_index(hotel.id, hotel.title, hotel.city, hotel.address)
+        if not data.has_coordinates:
+            self._schedule_geocode(hotel_id)
         return hotel
 
     async def hotel_patch_update(
         self, hotel_id: int, data: HotelPatch, exclude_unset: bool = False
     ) -> Hotel:
-        await self.get_hotel_with_check(hotel_id)
+        old = await self.get_hotel_with_check(hotel_id)
         await self.db.hotels.edit(data, exclude_unset=exclude_unset, id=hotel_id)
+        if data.city is not None:
+            await self._move_city(old.city, data.city)
         await self.db.commit()
+        await invalidate_cache(HOTEL_TAG.format(hotel_id=hotel_id), SEARCH_TAG)
         hotel = await self.get_hotel(hotel_id)
         await self._es_index(hotel.id, hotel.title, hotel.city, hotel.address)
+        # Адрес сменился, а новые координаты не пришли — старые пересчитает геокодер
+        if not data.has_coordinates and data.model_fields_set & {"city", "address"}:
+            self._schedule_geocode(hotel_id)
         return hotel
 
     async def delete_hotel(self, hotel_id: int):
-        await self.get_hotel_with_check(hotel_id)
-        rooms_count = await self.db.rooms.count_by_hotel(hotel_id)
+        hotel = await self.get_hotel_with_check(hotel_id)
+        rooms_count = await self.db.hotel_summary.rooms_count(hotel_id)
+        if rooms_count is None:
+            # Сводки ещё нет (отель добавлен в обход HotelService) — считаем по rooms
+            rooms_count = await self.db.rooms.count_by_hotel(hotel_id)
         if rooms_count > 0:
             raise CannotDeleteHotelWithRoomsException()
         await self.db.hotels.delete(id=hotel_id)
+        await self.db.popular_locations.adjust_hotels(hotel.city, -1)
         await self.db.commit()
+        await invalidate_cache(HOTEL_TAG.format(hotel_id=hotel_id), SEARCH_TAG)
         await self._es_remove(hotel_id)
 
+    async def _move_city(self, old_city: str, new_city: str) -> None:
+        """Отель сменил город — переносим его в рейтинге популярных локаций."""
+        if old_city != new_city:
+            await self.db.popular_locations.adjust_hotels(old_city, -1)
+            await self.db.popular_locations.adjust_hotels(new_city, 1)
+
     async def get_hotel_with_check(self, hotel_id: int) -> Hotel:
         try:
             return await self.db.hotels.get_one(id=hotel_id)
@@ -119,6 +240,37 @@ class HotelService(BaseService):
                 logger.warning("ES autocomplete failed, fallback to PG: %s", exc)
         return await self.db.hotels.get_autocomplete_combined(q)
 
+    async def _es_search_ids(
+        self, search: str | None, city: str | None, title: str | None
+    ) -> list[int] | None:
+        """Ранжированные ID из ES; None — искать в PostgreSQL.
+
+        ES нет или упал, искать нечего, либо совпадений больше ES_SEARCH_MAX_HITS:
+        PostgreSQL отдаст все страницы и точный total, ES — только первые MAX_HITS.
+        """
+        es = get_es_client()
+        if es is None or not (search or city or title):
+            return None
+        try:
+            ids = await es_hotels.search_ids(
+                es, search, city, title, limit=settings.ES_SEARCH_MAX_HITS
+            )
+        except Exception as exc:
+            logger.warning("ES hotel search failed, fallback to PG: %s", exc)
+            return None
+        if ids is None:
+            logger.info("ES hotel search over %d hits, using PG", settings.ES_SEARCH_MAX_HITS)
+        return ids
+
+    @staticmethod
+    def _schedule_geocode(hotel_id: int) -> None:
+        if not settings.GEOCODER_URL:
+            return
+        try:
+            geocode_hotel.delay(hotel_id)
+        except Exception as exc:
+            logger.warning("Geocode task for hotel %d not queued: %s", hotel_id, exc)
+
     async def _es_index(self, hotel_id: int, title: str, city: str, address: str | None) -> None:
         es = get_es_client()
         if es is None:
@@ -129,7 +281,7 @@ class HotelService(BaseService):
             logger.warning("ES index failed for hotel %d: %s", hotel_id, exc)
 
     async def popular_locations(self, limit: int = 8) -> list[str]:
-        return await self.db.hotels.get_popular_locations(limit)
+        return await self.db.popular_locations.get_top(limit)
 
     async def _es_remove(self, hotel_id: int) -> None:
         es = get_es_client()
@@ -6,6 +6,7 @@ import uuid
 from fastapi import UploadFile
 from PIL import Image, UnidentifiedImageError, ImageFile
 
+from src.cache import HOTEL_TAG, SEARCH_TAG, invalidate_cache
 from src.config import settings
 from src.exceptions import (
     EmptyFileException,
@@ -97,6 +98,7 @@ class ImagesService(BaseService):
                     hotel_id=hotel_id, filename=safe_name, content_type=final_content_type
                 )
             )
+            await self.db.hotel_summary.refresh(hotel_id)
             await self.db.commit()
         except Exception:
             try:
@@ -104,6 +106,8 @@ class ImagesService(BaseService):
             except Exception as cleanup_err:
                 logger.warning("Не удалось удалить файл после ошибки DB: %s", cleanup_err)
             raise
+        # cover_image_url — в карточке отеля и в выдаче
+        await invalidate_cache(HOTEL_TAG.format(hotel_id=hotel_id), SEARCH_TAG)
 
         try:
             resize_image.delay(str(image_path))
@@ -139,7 +143,9 @@ class ImagesService(BaseService):
 
         image_path = settings.IMAGES_DIR / image.filename
         await self.db.hotel_images.delete(id=image_id)
+        await self.db.hotel_summary.refresh(hotel_id)
         await self.db.commit()
+        await invalidate_cache(HOTEL_TAG.format(hotel_id=hotel_id), SEARCH_TAG)
 
         try:
             await asyncio.to_thread(image_path.unlink, True)
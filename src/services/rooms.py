@@ -1,13 +1,14 @@
-import math
 from datetime import date
+from functools import partial
 
 from src.services.hotels import HotelService
-from src.schemas.common import PaginatedResponse
-from src.schemas.facilities import RoomFacilityAdd
+from src.schemas.common import CountStrategy, CursorPage, PaginatedResponse
 from src.schemas.rooms import (
+    CalendarDay,
     Room,
     RoomAdd,
     RoomAddRequest,
+    RoomCalendar,
     RoomPatch,
     RoomPatchRequest,
     RoomWithRels,
@@ -19,6 +20,8 @@ from src.exceptions import (
     check_date_to_after_date_from,
 )
 from src.services.base import BaseService
+from src.services.facilities import parse_facility_ids
+from src.cache import CALENDAR_TAG, HOTEL_TAG, ROOM_TAG, SEARCH_TAG, invalidate_cache
 
 
 class RoomService(BaseService):
@@ -29,28 +32,51 @@ class RoomService(BaseService):
         date_to: date | None,
         page: int = 1,
         per_page: int = 20,
-    ) -> PaginatedResponse[RoomWithRels]:
+        cursor: str | None = None,
+        count: CountStrategy | None = None,
+        facilities: str | None = None,
+    ) -> PaginatedResponse[RoomWithRels] | CursorPage[RoomWithRels]:
         if date_from and date_to:
             check_date_to_after_date_from(date_from, date_to)
+        facility_ids = parse_facility_ids(facilities) if facilities else None
         await HotelService(self.db).get_hotel_with_check(hotel_id)
-
-        total = await self.db.rooms.count_filtered_by_time(
-            hotel_id=hotel_id, date_from=date_from, date_to=date_to
+        filters = dict(
+            hotel_id=hotel_id, date_from=date_from, date_to=date_to, facility_ids=facility_ids
         )
-        items = await self.db.rooms.get_filtered_by_time(
-            hotel_id=hotel_id,
-            date_from=date_from,
-            date_to=date_to,
-            limit=per_page,
-            offset=per_page * (page - 1),
+        if cursor is not None:
+            rows = await self.db.rooms.get_filtered_by_time(
+                **filters, limit=per_page + 1, after=self.cursor_position(cursor)
+            )
+            return CursorPage.from_rows(rows, per_page)
+        return await self.paginate(
+            page,
+            per_page,
+            count or self.default_count,
+            partial(self.db.rooms.get_filtered_by_time, **filters),
+            partial(self.db.rooms.count_filtered_by_time, **filters),
         )
-        return PaginatedResponse(
-            items=items,
-            total=total,
-            page=page,
-            per_page=per_page,
-            pages=max(1, math.ceil(total / per_page)),
+
+    async def get_calendar(
+        self,
+        hotel_id: int,
+        date_from: date | None,
+        days: int,
+        room_id: int | None = None,
+    ) -> list[RoomCalendar]:
+        rows = await self.db.rooms.get_calendar(
+            hotel_id, date_from or date.today(), days, room_id=room_id
         )
+        if not rows:
+            # Пустой результат — нет отеля/номера (или у отеля нет номеров)
+            await HotelService(self.db).get_hotel_with_check(hotel_id)
+            if room_id is not None:
+                raise RoomNotFoundException()
+        calendars: dict[int, list[CalendarDay]] = {}
+        for row in rows:
+            calendars.setdefault(row["room_id"], []).append(
+                CalendarDay(date=row["night"], available=row["available"], price=row["price"])
+            )
+        return [RoomCalendar(room_id=r_id, days=days_) for r_id, days_ in calendars.items()]
 
     async def get_room(self, room_id: int, hotel_id: int) -> RoomWithRels:
         await HotelService(self.db).get_hotel_with_check(hotel_id)
@@ -70,12 +96,14 @@ class RoomService(BaseService):
         _room_data = RoomAdd(hotel_id=hotel_id, **room_data.model_dump())
         room: Room = await self.db.rooms.add(_room_data)
 
-        rooms_facilities_data = [
-            RoomFacilityAdd(room_id=room.id, facility_id=f_id) for f_id in room_data.facilities_ids
-        ]
-        if rooms_facilities_data:
-            await self.db.rooms_facilities.add_bulk(rooms_facilities_data)
+        if room_data.facilities_ids:
+            await self.db.rooms_facilities.set_room_facilities(
+                room.id, facilities_ids=room_data.facilities_ids
+            )
+        await self.db.room_inventory.notify(room.id)
+        await self.db.hotel_summary.refresh(hotel_id)
         await self.db.commit()
+        await self._invalidate_cache(hotel_id, room.id)
         return await self.db.rooms.get_one_with_rels(id=room.id, hotel_id=hotel_id)
 
     async def room_put_update(
@@ -97,7 +125,10 @@ class RoomService(BaseService):
         await self.db.rooms_facilities.set_room_facilities(
             room_id, facilities_ids=room_data.facilities_ids
         )
+        await self.db.room_inventory.notify(room_id)
+        await self.db.hotel_summary.refresh(hotel_id)
         await self.db.commit()
+        await self._invalidate_cache(hotel_id, room_id)
         return await self.db.rooms.get_one_with_rels(id=room_id, hotel_id=hotel_id)
 
     async def room_patch_update(
@@ -121,7 +152,10 @@ class RoomService(BaseService):
             await self.db.rooms_facilities.set_room_facilities(
                 room_id, facilities_ids=_room_data_dict["facilities_ids"]
             )
+        await self.db.room_inventory.notify(room_id)
+        await self.db.hotel_summary.refresh(hotel_id)
         await self.db.commit()
+        await self._invalidate_cache(hotel_id, room_id)
         return await self.db.rooms.get_one_with_rels(id=room_id, hotel_id=hotel_id)
 
     async def delete_room(self, hotel_id: int, room_id: int) -> None:
@@ -131,7 +165,20 @@ class RoomService(BaseService):
         if bookings_count > 0:
             raise CannotDeleteRoomWithBookingsException()
         await self.db.rooms.delete(id=room_id, hotel_id=hotel_id)
+        await self.db.room_inventory.notify(room_id)
+        await self.db.hotel_summary.refresh(hotel_id)
         await self.db.commit()
+        await self._invalidate_cache(hotel_id, room_id)
+
+    @staticmethod
+    async def _invalidate_cache(hotel_id: int, room_id: int) -> None:
+        """Номер виден в отеле, его списке номеров, календарях и выдаче (цена, вместимость)."""
+        await invalidate_cache(
+            HOTEL_TAG.format(hotel_id=hotel_id),
+            ROOM_TAG.format(room_id=room_id),
+            CALENDAR_TAG.format(hotel_id=hotel_id),
+            SEARCH_TAG,
+        )
 
     async def get_room_with_check(self, room_id: int, hotel_id: int | None = None) -> Room:
         try:
@@ -0,0 +1,91 @@
+import asyncio
+import logging
+from datetime import date, timedelta
+
+from src.api.dependencies import PaginationParams
+from src.api.facilities import get_facilities
+from src.api.hotels import get_hotels, popular_locations
+from src.cache import CACHE_PREFIX, init_cache, refresh_cached
+from src.config import settings
+from src.database import async_session_maker_null_pool
+from src.init import redis_manager
+from src.tasks.celery_app import celery_instance
+from src.utils.db_manager import DBManager
+
+logger = logging.getLogger(__name__)
+
+# Прогрев при старте делает один воркер; остальные видят лок и пропускают
+_STARTUP_LOCK_KEY = f"{CACHE_PREFIX}:warmup"
+_STARTUP_LOCK_SECONDS = 60
+
+
+def upcoming_weekends(count: int, today: date | None = None) -> list[tuple[date, date]]:
+    """Ближайшие выходные: (пятница, воскресенье), начиная с этой пятницы или следующей."""
+    today = today or date.today()
+    friday = today + timedelta(days=(4 - today.weekday()) % 7)
+    return [
+        (friday + timedelta(weeks=week), friday + timedelta(weeks=week, days=2))
+        for week in range(count)
+    ]
+
+
+async def warm_cache() -> int:
+    """Пересчитывает горячие ответы кэша. Возвращает число записанных ответов.
+
+    Популярные локации, удобства, первая страница /hotels и она же для CACHE_WARM_CITIES
+    городов на CACHE_WARM_WEEKENDS ближайших выходных. Ответ кладёт сам @cached-эндпоинт —
+    ключ и теги те же, что у HTTP-запроса с такими параметрами.
+    """
+    first_page = PaginationParams()
+    requests = [
+        (popular_locations, {}),
+        (get_facilities, {"pagination": first_page}),
+        (get_hotels, {"pagination": first_page}),
+    ]
+    async with DBManager(session_factory=async_session_maker_null_pool) as db:
+        cities = await db.popular_locations.get_top(settings.CACHE_WARM_CITIES)
+    for city in cities:
+        for date_from, date_to in upcoming_weekends(settings.CACHE_WARM_WEEKENDS):
+            params = {"city": city, "date_from": date_from, "date_to": date_to}
+            requests.append((get_hotels, {"pagination": first_page, **params}))
+
+    warmed = 0
+    for endpoint, params in requests:
+        try:
+            # Своя сессия на ответ: ошибка одного не ломает транзакцию остальным
+            async with DBManager(session_factory=async_session_maker_null_pool) as db:
+                await refresh_cached(endpoint, db=db, **params)
+            warmed += 1
+        except Exception as exc:
+            logger.warning("Прогрев кэша %s %s не удался: %s", endpoint.__name__, params, exc)
+    return warmed
+
+
+async def warm_cache_on_startup() -> None:
+    """Прогрев после деплоя/рестарта Redis — фоновой задачей из lifespan."""
+    try:
+        if not await redis_manager.redis.set(
+            _STARTUP_LOCK_KEY, 1, nx=True, ex=_STARTUP_LOCK_SECONDS
+        ):
+            return
+        warmed = await warm_cache()
+        logger.info("Кэш прогрет при старте: %d ответов", warmed)
+    except Exception as exc:
+        logger.warning("Прогрев кэша при старте не удался: %s", exc)
+
+
+async def _warm_cache() -> int:
+    await redis_manager.connect()
+    try:
+        init_cache(redis_manager.redis)
+        warmed = await warm_cache()
+    finally:
+        await redis_manager.close()
+    logger.info("Кэш прогрет: %d ответов", warmed)
+    return warmed
+
+
+@celery_instance.task(name="warm_cache")
+def warm_cache_task() -> int:
+    """Celery task: обновляет горячие ответы кэша до истечения их TTL."""
+    return asyncio.run(_warm_cache())
@@ -6,7 +6,14 @@ from src.config import settings
 celery_instance = Celery(
     "tasks",
     broker=settings.REDIS_URL,
-    include=["src.tasks.tasks", "src.tasks.backup"],
+    include=[
+        "src.tasks.tasks",
+        "src.tasks.backup",
+        "src.tasks.inventory",
+        "src.tasks.locations",
+        "src.tasks.geo",
+        "src.tasks.cache",
+    ],
 )
 
 celery_instance.conf.beat_schedule = {
@@ -18,4 +25,16 @@ celery_instance.conf.beat_schedule = {
         "task": "backup_database",
         "schedule": crontab(hour=3, minute=0),  # ежедневно в 03:00 UTC
     },
+    "release-expired-booking-holds": {
+        "task": "release_expired_holds",
+        "schedule": settings.BOOKING_HOLDS_SWEEP_SECONDS,
+    },
+    "refresh-popular-locations": {
+        "task": "refresh_popular_locations",
+        "schedule": settings.POPULAR_LOCATIONS_REFRESH_SECONDS,
+    },
+    "warm-cache": {
+        "task": "warm_cache",
+        "schedule": settings.CACHE_WARM_INTERVAL_SECONDS,
+    },
 }
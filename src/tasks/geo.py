@@ -0,0 +1,99 @@
+import asyncio
+import logging
+import sys
+
+import httpx
+
+from src.cache import HOTEL_TAG, SEARCH_TAG, invalidate_cache_from_task
+from src.config import settings
+from src.database import async_session_maker_null_pool
+from src.geo import geocode
+from src.schemas.hotels import HotelCoordinates
+from src.tasks.celery_app import celery_instance
+from src.utils.db_manager import DBManager
+
+logger = logging.getLogger(__name__)
+
+
+async def _save_coordinates(points: dict[int, tuple[float, float]]) -> None:
+    async with DBManager(session_factory=async_session_maker_null_pool) as db:
+        for hotel_id, (lat, lon) in points.items():
+            await db.hotels.edit(HotelCoordinates(latitude=lat, longitude=lon), id=hotel_id)
+        await db.commit()
+    # Координаты видны в карточке отеля и в гео-выдаче поиска.
+    await invalidate_cache_from_task(
+        SEARCH_TAG, *(HOTEL_TAG.format(hotel_id=hotel_id) for hotel_id in points)
+    )
+
+
+async def _geocode_hotel(hotel_id: int) -> bool:
+    """Геокодирует текущий адрес отеля. False — отеля нет или адрес не найден."""
+    async with DBManager(session_factory=async_session_maker_null_pool) as db:
+        hotel = await db.hotels.get_one_or_none(id=hotel_id)
+    if hotel is None:
+        return False
+    point = await geocode(hotel.city, hotel.address)
+    if point is None:
+        logger.warning(
+            "Геокодер не нашёл адрес отеля %d: %s, %s", hotel_id, hotel.city, hotel.address
+        )
+        return False
+    await _save_coordinates({hotel_id: point})
+    return True
+
+
+async def _backfill_hotel_coordinates(batch_size: int = 100) -> int:
+    """Геокодирует отели без координат. Возвращает число заполненных.
+
+    Запросы к геокодеру идут вне транзакции, с паузой GEOCODER_MIN_INTERVAL_SECONDS;
+    координаты пачки записываются одной транзакцией.
+    """
+    updated, after_id = 0, 0
+    while True:
+        async with DBManager(session_factory=async_session_maker_null_pool) as db:
+            hotels = await db.hotels.get_without_coordinates(batch_size, after_id)
+        if not hotels:
+            break
+        points: dict[int, tuple[float, float]] = {}
+        for hotel in hotels:
+            try:
+                point = await geocode(hotel.city, hotel.address)
+            except httpx.HTTPError as exc:
+                logger.warning("Геокодер недоступен для отеля %d: %s", hotel.id, exc)
+                point = None
+            if point is not None:
+                points[hotel.id] = point
+            await asyncio.sleep(settings.GEOCODER_MIN_INTERVAL_SECONDS)
+        if points:
+            await _save_coordinates(points)
+        updated += len(points)
+        after_id = hotels[-1].id
+    logger.info("Координаты заполнены у %d отелей", updated)
+    return updated
+
+
+@celery_instance.task(
+    name="geocode_hotel",
+    autoretry_for=(httpx.HTTPError,),
+    max_retries=3,
+    default_retry_delay=60,
+)
+def geocode_hotel(hotel_id: int) -> bool:
+    """Celery task: координаты отеля по его адресу (после создания или смены адреса)."""
+    return asyncio.run(_geocode_hotel(hotel_id))
+
+
+@celery_instance.task(name="backfill_hotel_coordinates")
+def backfill_hotel_coordinates(batch_size: int = 100) -> int:
+    """Celery task: геокодирует все отели без координат."""
+    return asyncio.run(_backfill_hotel_coordinates(batch_size))
+
+
+if __name__ == "__main__":
+    # uv run python -m src.tasks.geo backfill
+    command = sys.argv[1] if len(sys.argv) > 1 else "backfill"
+    if command != "backfill":
+        sys.exit(f"Неизвестная команда: {command} (ожидается backfill)")
+    if not settings.GEOCODER_URL:
+        sys.exit("GEOCODER_URL не задан")
+    print(f"Заполнено координат: {asyncio.run(_backfill_hotel_coordinates())}")
@@ -0,0 +1,91 @@
+import asyncio
+import logging
+import sys
+from datetime import datetime, timedelta, timezone
+
+from src.cache import hotel_availability_tags, invalidate_cache_from_task
+from src.database import async_session_maker_null_pool
+from src.tasks.celery_app import celery_instance
+from src.utils.db_manager import DBManager
+
+logger = logging.getLogger(__name__)
+
+
+async def _rebuild_room_inventory() -> int:
+    async with DBManager(session_factory=async_session_maker_null_pool) as db:
+        rows = await db.room_inventory.rebuild()
+        hotel_ids = await db.rooms.get_hotel_ids()
+        await db.commit()
+    # Пересборка могла поменять занятость любого отеля
+    await invalidate_cache_from_task(*hotel_availability_tags(*hotel_ids))
+    logger.info("room_inventory пересобрана из bookings и холдов: %d ночей", rows)
+    return rows
+
+
+async def _verify_room_inventory(limit: int = 100, days: int | None = None) -> list[dict]:
+    date_from = date_to = None
+    if days is not None:
+        date_from = datetime.now(tz=timezone.utc).date()
+        date_to = date_from + timedelta(days=days)
+    async with DBManager(session_factory=async_session_maker_null_pool) as db:
+        mismatches = await db.room_inventory.find_mismatches(
+            limit=limit, date_from=date_from, date_to=date_to
+        )
+    if mismatches:
+        logger.error(
+            "room_inventory расходится с bookings: %d ночей (первые: %s)",
+            len(mismatches),
+            mismatches[:5],
+        )
+    else:
+        logger.info("room_inventory совпадает с bookings")
+    return mismatches
+
+
+async def _release_expired_holds() -> int:
+    async with DBManager(session_factory=async_session_maker_null_pool) as db:
+        hotel_ids = await db.booking_holds.release_expired()
+        await db.commit()
+    if hotel_ids:
+        await invalidate_cache_from_task(*hotel_availability_tags(*sorted(set(hotel_ids))))
+        logger.info("Сняты истёкшие холды: %d", len(hotel_ids))
+    return len(hotel_ids)
+
+
+@celery_instance.task(name="release_expired_holds")
+def release_expired_holds() -> int:
+    """Celery task: снимает истёкшие холды и освобождает их ночи в room_inventory."""
+    return asyncio.run(_release_expired_holds())
+
+
+@celery_instance.task(name="rebuild_room_inventory")
+def rebuild_room_inventory() -> int:
+    """Celery task: пересобирает room_inventory из bookings и booking_holds."""
+    return asyncio.run(_rebuild_room_inventory())
+
+
+@celery_instance.task(name="verify_room_inventory")
+def verify_room_inventory(limit: int = 100, days: int | None = None) -> list[dict]:
+    """Celery task: сверяет room_inventory с bookings, возвращает расхождения.
+
+    days — сверить только ближайшие N ночей (иначе все).
+    """
+    mismatches = asyncio.run(_verify_room_inventory(limit, days))
+    return [{**m, "night": m["night"].isoformat()} for m in mismatches]
+
+
+if __name__ == "__main__":
+    # uv run python -m src.tasks.inventory verify|rebuild
+    command = sys.argv[1] if len(sys.argv) > 1 else "verify"
+    if command == "rebuild":
+        print(f"Пересобрано ночей: {asyncio.run(_rebuild_room_inventory())}")
+    elif command == "verify":
+        found = asyncio.run(_verify_room_inventory())
+        for m in found:
+            print(
+                f"room_id={m['room_id']} {m['night']}: "
+                f"ожидалось {m['expected']}, есть {m['actual']}"
+            )
+        sys.exit(1 if found else 0)
+    else:
+        sys.exit(f"Неизвестная команда: {command} (ожидается verify или rebuild)")
@@ -0,0 +1,23 @@
+import asyncio
+import logging
+
+from src.config import settings
+from src.database import async_session_maker_null_pool
+from src.tasks.celery_app import celery_instance
+from src.utils.db_manager import DBManager
+
+logger = logging.getLogger(__name__)
+
+
+async def _refresh_popular_locations() -> int:
+    async with DBManager(session_factory=async_session_maker_null_pool) as db:
+        cities = await db.popular_locations.rebuild(settings.POPULAR_LOCATIONS_BOOKINGS_DAYS)
+        await db.commit()
+    logger.info("Рейтинг популярных локаций пересчитан: %d городов", cities)
+    return cities
+
+
+@celery_instance.task(name="refresh_popular_locations")
+def refresh_popular_locations() -> int:
+    """Celery task: пересчитывает рейтинг городов по броням и числу отелей."""
+    return asyncio.run(_refresh_popular_locations())
@@ -1,7 +1,11 @@
 from src.repositories.facilities import FacilitiesRepository, RoomsFacilitiesRepository
+from src.repositories.booking_holds import BookingHoldsRepository
 from src.repositories.bookings import BookingsRepository
 from src.repositories.hotel_images import HotelImagesRepository
+from src.repositories.hotel_summary import HotelSummaryRepository
 from src.repositories.hotels import HotelsRepository
+from src.repositories.popular_locations import PopularLocationsRepository
+from src.repositories.room_inventory import RoomInventoryRepository
 from src.repositories.rooms import RoomsRepository
 from src.repositories.users import UsersRepository
 
@@ -15,11 +19,15 @@ class DBManager:
 
         self.hotels = HotelsRepository(self.session)
         self.hotel_images = HotelImagesRepository(self.session)
+        self.hotel_summary = HotelSummaryRepository(self.session)
         self.rooms = RoomsRepository(self.session)
         self.users = UsersRepository(self.session)
         self.bookings = BookingsRepository(self.session)
+        self.booking_holds = BookingHoldsRepository(self.session)
+        self.room_inventory = RoomInventoryRepository(self.session)
         self.facilities = FacilitiesRepository(self.session)
         self.rooms_facilities = RoomsFacilitiesRepository(self.session)
+        self.popular_locations = PopularLocationsRepository(self.session)
 
         return self
 
@@ -29,3 +37,7 @@ class DBManager:
 
     async def commit(self):
         await self.session.commit()
+
+    def savepoint(self):
+        """SAVEPOINT внутри текущей транзакции: `async with db.savepoint(): ...`."""
+        return self.session.begin_nested()
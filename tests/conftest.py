@@ -19,7 +19,7 @@ from src.database import Base, engine_null_pool, async_session_maker_null_pool
 from src.config import settings
 from src.api.dependencies import get_db
 from src.init import redis_manager
-from sqlalchemy import update
+from sqlalchemy import text, update
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -60,6 +60,12 @@ app.dependency_overrides[get_db] = get_db_null_pool
 async def setup_database(check_test_mode):
     async with engine_null_pool.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
+        # GiST-индекс bookings (room_id, stay) требует btree_gist, поиск отелей — pg_trgm,
+        # гео-поиск — cube + earthdistance
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS cube"))
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS earthdistance"))
         await conn.run_sync(Base.metadata.create_all)
 
     with open("tests/mock_hotels.json", encoding="utf-8") as file_hotels:
@@ -73,6 +79,8 @@ async def setup_database(check_test_mode):
     async with DBManager(session_factory=async_session_maker_null_pool) as db_:
         await db_.hotels.add_bulk(hotels)
         await db_.rooms.add_bulk(rooms)
+        await db_.hotel_summary.refresh()
+        await db_.popular_locations.rebuild(bookings_days=90)
         await db_.commit()
 
 
@@ -246,6 +246,13 @@ async def test_patch_booking_dates(authenticated_ac: AsyncClient):
     )
     assert patch.status_code == 200
     assert patch.json()["date_to"] == new_d_to
+    # Бронь меняется на месте — ссылки клиента остаются валидными
+    assert patch.json()["id"] == booking_id
+
+    # Сокращение обратно освобождает добавленные ночи
+    patch = await authenticated_ac.patch(f"/api/v1/bookings/{booking_id}", json={"date_to": d_to})
+    assert patch.status_code == 200
+    assert patch.json()["id"] == booking_id
 
 
 async def test_patch_booking_invalid_dates(authenticated_ac: AsyncClient):
@@ -278,3 +285,123 @@ async def test_patch_booking_not_found(authenticated_ac: AsyncClient):
         json={"date_to": (date.today() + timedelta(days=5)).isoformat()},
     )
     assert response.status_code == 404
+
+
+# ──── POST /bookings/batch ───────────────────────────────────────────────────
+
+_BATCH_FROM = (date.today() + timedelta(days=200)).isoformat()
+_BATCH_TO = (date.today() + timedelta(days=203)).isoformat()
+_BATCH_FULL_FROM = (date.today() + timedelta(days=300)).isoformat()
+_BATCH_FULL_TO = (date.today() + timedelta(days=302)).isoformat()
+
+
+async def test_add_bookings_batch(authenticated_ac: AsyncClient):
+    response = await authenticated_ac.post(
+        "/api/v1/bookings/batch",
+        json={
+            "bookings": [
+                {"room_id": 1, "date_from": _BATCH_FROM, "date_to": _BATCH_TO},
+                {"room_id": 2, "date_from": _BATCH_FROM, "date_to": _BATCH_TO},
+                {"room_id": 1, "date_from": _BATCH_FROM, "date_to": _BATCH_TO},
+            ]
+        },
+    )
+    assert response.status_code == 201, response.text
+    data = response.json()
+    assert sorted(b["room_id"] for b in data) == [1, 1, 2]
+
+
+async def test_add_bookings_batch_all_or_nothing(authenticated_ac: AsyncClient):
+    before = (await authenticated_ac.get("/api/v1/bookings/me")).json()["total"]
+    # Номер 1 вмещает 5 единиц — шестая делает невозможной всю группу
+    batch = [{"room_id": 2, "date_from": _D2_FROM, "date_to": _D2_TO}] + [
+        {"room_id": 1, "date_from": _BATCH_FULL_FROM, "date_to": _BATCH_FULL_TO}
+    ] * 6
+    response = await authenticated_ac.post("/api/v1/bookings/batch", json={"bookings": batch})
+    assert response.status_code == 409
+    after = (await authenticated_ac.get("/api/v1/bookings/me")).json()["total"]
+    assert after == before
+
+
+async def test_add_bookings_batch_room_not_found(authenticated_ac: AsyncClient):
+    response = await authenticated_ac.post(
+        "/api/v1/bookings/batch",
+        json={
+            "bookings": [
+                {"room_id": 1, "date_from": _BATCH_FROM, "date_to": _BATCH_TO},
+                {"room_id": 999999, "date_from": _BATCH_FROM, "date_to": _BATCH_TO},
+            ]
+        },
+    )
+    assert response.status_code == 404
+
+
+async def test_add_bookings_batch_empty(authenticated_ac: AsyncClient):
+    response = await authenticated_ac.post("/api/v1/bookings/batch", json={"bookings": []})
+    assert response.status_code == 422
+
+
+# ──── /bookings/holds ────────────────────────────────────────────────────────
+
+_HOLD_FROM = (date.today() + timedelta(days=250)).isoformat()
+_HOLD_TO = (date.today() + timedelta(days=252)).isoformat()
+
+
+async def test_hold_blocks_availability_and_confirms(authenticated_ac: AsyncClient):
+    stay = {"room_id": 1, "date_from": _HOLD_FROM, "date_to": _HOLD_TO}
+    holds = []
+    # Номер 1 вмещает 5 единиц — все пять под холдами
+    for _ in range(5):
+        response = await authenticated_ac.post("/api/v1/bookings/holds", json=stay)
+        assert response.status_code == 201, response.text
+        holds.append(response.json())
+    assert holds[0]["expires_at"]
+
+    response = await authenticated_ac.post("/api/v1/bookings", json=stay)
+    assert response.status_code == 409
+
+    response = await authenticated_ac.post(f"/api/v1/bookings/holds/{holds[0]['id']}/confirm")
+    assert response.status_code == 201, response.text
+    assert response.json()["room_id"] == 1
+    # Холд подтверждён один раз
+    response = await authenticated_ac.post(f"/api/v1/bookings/holds/{holds[0]['id']}/confirm")
+    assert response.status_code == 404
+
+    # Отмена холда возвращает единицу номера
+    response = await authenticated_ac.delete(f"/api/v1/bookings/holds/{holds[1]['id']}")
+    assert response.status_code == 204
+    response = await authenticated_ac.post("/api/v1/bookings", json=stay)
+    assert response.status_code == 201, response.text
+
+    for hold in holds[2:]:
+        await authenticated_ac.delete(f"/api/v1/bookings/holds/{hold['id']}")
+
+
+async def test_hold_of_another_user(authenticated_ac: AsyncClient, admin_ac: AsyncClient):
+    response = await authenticated_ac.post(
+        "/api/v1/bookings/holds",
+        json={"room_id": 2, "date_from": _HOLD_FROM, "date_to": _HOLD_TO},
+    )
+    hold_id = response.json()["id"]
+    response = await admin_ac.post(f"/api/v1/bookings/holds/{hold_id}/confirm")
+    assert response.status_code == 404
+    response = await admin_ac.delete(f"/api/v1/bookings/holds/{hold_id}")
+    assert response.status_code == 404
+    await authenticated_ac.delete(f"/api/v1/bookings/holds/{hold_id}")
+
+
+async def test_cancel_hold_not_found(authenticated_ac: AsyncClient):
+    response = await authenticated_ac.delete("/api/v1/bookings/holds/999999")
+    assert response.status_code == 404
+
+
+# ──── /bookings/queue ────────────────────────────────────────────────────────
+
+
+async def test_enqueue_booking_disabled(authenticated_ac: AsyncClient):
+    # BOOKING_QUEUE_ENABLED=False по умолчанию — очередь не принимает заявки
+    response = await authenticated_ac.post(
+        "/api/v1/bookings/queue",
+        json={"room_id": 1, "date_from": _HOLD_FROM, "date_to": _HOLD_TO},
+    )
+    assert response.status_code == 503
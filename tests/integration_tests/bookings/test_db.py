@@ -1,5 +1,13 @@
+import asyncio
 from datetime import date
 
+from sqlalchemy import select, text
+
+from src.database import async_session_maker_null_pool
+from src.exceptions import AllRoomsAreBookedException
+from src.models.bookings import BookingsOrm
+from src.models.room_inventory import RoomInventoryOrm
+from src.repositories.utils import stay_overlaps
 from src.schemas.bookings import BookingAdd, Booking
 from src.utils.db_manager import DBManager
 
@@ -29,7 +37,7 @@ async def test_booking_crud(db: DBManager):
     update_booking_data = BookingAdd(
         user_id=user_id,
         room_id=room_id,
-        date_from=date(year=2025, month=8, day=10),
+        date_from=date(year=2025, month=1, day=10),
         date_to=update_date,
         price=100,
     )
@@ -43,3 +51,113 @@ async def test_booking_crud(db: DBManager):
     await db.bookings.delete(id=new_booking.id)
     booking: Booking | None = await db.bookings.get_one_or_none(id=new_booking.id)
     assert not booking
+
+
+async def test_room_inventory_follows_bookings(db: DBManager):
+    user_id = (await db.users.get_all())[0].id  # type: ignore
+    room_id = (await db.rooms.get_all())[0].id  # type: ignore
+    booking_data = BookingAdd(
+        user_id=user_id,
+        room_id=room_id,
+        date_from=date(year=2025, month=3, day=1),
+        date_to=date(year=2025, month=3, day=4),
+        price=100,
+    )
+    new_booking: Booking = await db.bookings.add(booking_data)
+
+    # бронь на 3 ночи → 3 строки room_inventory, ночь выезда не занята
+    result = await db.session.execute(
+        select(RoomInventoryOrm.night).filter(
+            RoomInventoryOrm.room_id == room_id, RoomInventoryOrm.booked_count > 0
+        )
+    )
+    assert set(result.scalars().all()) == {date(2025, 3, 1), date(2025, 3, 2), date(2025, 3, 3)}
+    assert await db.room_inventory.find_mismatches() == []
+
+    await db.bookings.delete(id=new_booking.id)
+    assert await db.room_inventory.find_mismatches() == []
+
+
+async def test_add_booking_concurrent_never_overbooks(db: DBManager):
+    user_id = (await db.users.get_all())[0].id  # type: ignore
+    room = (await db.rooms.get_all())[0]
+    date_from, date_to = date(2031, 7, 1), date(2031, 7, 4)
+
+    async def book() -> bool:
+        async with DBManager(session_factory=async_session_maker_null_pool) as db_:
+            try:
+                await db_.bookings.add_booking(user_id, room.id, date_from, date_to)
+            except AllRoomsAreBookedException:
+                return False
+            await db_.commit()
+            return True
+
+    results = await asyncio.gather(*(book() for _ in range(room.quantity + 3)))
+    assert sum(results) == room.quantity
+    assert await db.room_inventory.find_mismatches() == []
+
+    async with DBManager(session_factory=async_session_maker_null_pool) as db_:
+        await db_.bookings.delete(room_id=room.id, date_from=date_from)
+        await db_.commit()
+
+
+async def test_room_inventory_window_mismatches(db: DBManager):
+    user_id = (await db.users.get_all())[0].id  # type: ignore
+    room_id = (await db.rooms.get_all())[0].id  # type: ignore
+    booking = await db.bookings.add(
+        BookingAdd(
+            user_id=user_id,
+            room_id=room_id,
+            date_from=date(2032, 3, 1),
+            date_to=date(2032, 3, 6),
+            price=100,
+        )
+    )
+    # Портим одну ночь внутри окна и одну вне его
+    await db.room_inventory.release(room_id, date(2032, 3, 2), date(2032, 3, 3))
+    await db.room_inventory.release(room_id, date(2032, 3, 5), date(2032, 3, 6))
+
+    mismatches = await db.room_inventory.find_mismatches(
+        date_from=date(2032, 3, 1), date_to=date(2032, 3, 4)
+    )
+    assert [(m["night"], m["expected"], m["actual"]) for m in mismatches] == [
+        (date(2032, 3, 2), 1, 0)
+    ]
+    await db.bookings.delete(id=booking.id)
+
+
+async def test_stay_overlap_uses_gist_index():
+    """EXPLAIN: пересечение `room_id = ? AND stay && ?` идёт по GiST-индексу.
+
+    Объём не важен: после ANALYZE и с enable_seqscan=off планировщик выбирает
+    между индексами, и проверяется, что `&&` вообще покрыт ix_bookings_room_id_stay.
+    """
+    async with DBManager(session_factory=async_session_maker_null_pool) as db_:
+        user_id = (await db_.users.get_all())[0].id  # type: ignore
+        room_ids = [room.id for room in await db_.rooms.get_all()]
+        # Засев в транзакции без COMMIT — DBManager откатит его при выходе
+        await db_.session.execute(
+            text("""
+                INSERT INTO bookings (user_id, room_id, date_from, date_to, price)
+                SELECT :user_id,
+                       (CAST(:room_ids AS int[]))[1 + i % cardinality(CAST(:room_ids AS int[]))],
+                       DATE '2020-01-01' + (i % 3650),
+                       DATE '2020-01-01' + (i % 3650) + 1 + (i % 7),
+                       100
+                FROM generate_series(1, 5000) AS i
+            """),
+            {"user_id": user_id, "room_ids": room_ids},
+        )
+        await db_.session.execute(text("ANALYZE bookings"))
+        await db_.session.execute(text("SET LOCAL enable_seqscan = off"))
+
+        query = select(BookingsOrm.id).where(
+            BookingsOrm.room_id == room_ids[0],
+            stay_overlaps(date(2024, 6, 1), date(2024, 6, 8)),
+        )
+        compiled = query.compile(
+            dialect=db_.session.bind.dialect, compile_kwargs={"literal_binds": True}
+        )
+        plan = (await db_.session.execute(text(f"EXPLAIN {compiled}"))).scalars().all()
+
+    assert any("ix_bookings_room_id_stay" in line for line in plan), "\n".join(plan)
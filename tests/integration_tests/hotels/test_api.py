@@ -2,6 +2,8 @@ from datetime import date, timedelta
 
 from httpx import AsyncClient
 
+from src.config import settings
+
 
 def future(days: int) -> str:
     return (date.today() + timedelta(days=days)).isoformat()
@@ -40,6 +42,34 @@ async def test_get_hotels_pagination(ac: AsyncClient):
     assert len(r.json()["items"]) <= 1
 
 
+async def test_search_hotels_tolerates_typos(ac: AsyncClient, monkeypatch):
+    monkeypatch.setattr(settings, "HOTEL_SEARCH_MODE", "trigram")
+    # «Сирус» вместо «Сириус»: подстрокой не найти, по триграммам города — да
+    r = await ac.get("/api/v1/hotels", params={"search": "Сирус", "sort_by": "relevance"})
+    assert r.status_code == 200
+    assert [h["title"] for h in r.json()["items"]] == ["Bridge Resort"]
+
+
+async def test_search_hotels_ranks_by_similarity(ac: AsyncClient, monkeypatch):
+    monkeypatch.setattr(settings, "HOTEL_SEARCH_MODE", "trigram")
+    r = await ac.get("/api/v1/hotels", params={"search": "Skala", "sort_by": "relevance"})
+    assert r.status_code == 200
+    assert r.json()["items"][0]["title"] == "Skala"
+
+
+async def test_search_hotels_fts_matches_inflected_forms(ac: AsyncClient):
+    # Режим по умолчанию — fts: «в Сириусе» находит город «Сириус»
+    r = await ac.get("/api/v1/hotels", params={"search": "в Сириусе", "sort_by": "relevance"})
+    assert r.status_code == 200
+    assert [h["title"] for h in r.json()["items"]] == ["Bridge Resort"]
+
+
+async def test_search_hotels_fts_by_title(ac: AsyncClient):
+    r = await ac.get("/api/v1/hotels", params={"search": "skala", "sort_by": "relevance"})
+    assert r.status_code == 200
+    assert r.json()["items"][0]["title"] == "Skala"
+
+
 async def test_get_hotels_sort_by_title(ac: AsyncClient):
     response = await ac.get(
         "/api/v1/hotels",
@@ -51,6 +81,42 @@ async def test_get_hotels_sort_by_title(ac: AsyncClient):
     assert titles == sorted(titles)
 
 
+async def test_get_hotels_sort_by_price(ac: AsyncClient):
+    response = await ac.get("/api/v1/hotels", params={"sort_by": "price", "per_page": 100})
+    assert response.status_code == 200
+    prices = [h["min_price"] for h in response.json()["items"]]
+    assert None not in prices  # отели без номеров цены не имеют
+    assert prices == sorted(prices)
+
+
+async def test_get_hotels_price_max_filter(ac: AsyncClient):
+    response = await ac.get("/api/v1/hotels", params={"price_max": 5000, "per_page": 100})
+    assert response.status_code == 200
+    items = response.json()["items"]
+    # Из моков: отель 2 — от 4570, отель 3 — от 4350, отель 1 — от 22450
+    assert {2, 3} <= {h["id"] for h in items}
+    assert all(h["min_price"] <= 5000 for h in items)
+
+
+async def test_get_hotel_facets(ac: AsyncClient):
+    response = await ac.get("/api/v1/hotels/facets")
+    assert response.status_code == 200
+    data = response.json()
+    hotels = await ac.get("/api/v1/hotels", params={"per_page": 100})
+    assert data["total"] == hotels.json()["total"]
+    assert sum(c["count"] for c in data["cities"]) == data["total"]
+    assert [band["min"] for band in data["price"]] == settings.HOTEL_FACET_PRICE_BANDS
+
+
+async def test_get_hotel_facets_follow_filters(ac: AsyncClient):
+    response = await ac.get("/api/v1/hotels/facets", params={"price_max": 5000})
+    assert response.status_code == 200
+    price = response.json()["price"]
+    # Из моков: отели 2 и 3 — от 4570 и 4350, отель 1 (от 22450) отфильтрован
+    assert sum(band["count"] for band in price) == response.json()["total"]
+    assert all(band["count"] == 0 for band in price if band["min"] > 5000)
+
+
 async def test_get_hotels_invalid_date_range(ac: AsyncClient):
     response = await ac.get(
         "/api/v1/hotels",
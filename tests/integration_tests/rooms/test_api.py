@@ -64,6 +64,48 @@ async def test_get_room_wrong_hotel(ac: AsyncClient):
     assert response.status_code in (404, 422)
 
 
+# ──── GET /hotels/{hotel_id}/rooms[/{room_id}]/calendar ───────────────────────
+
+
+async def test_get_room_calendar(ac: AsyncClient):
+    response = await ac.get(
+        "/api/v1/hotels/1/rooms/1/calendar", params={"from": _DATE_FROM, "days": 10}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["room_id"] == 1
+    assert len(data["days"]) == 10
+    assert data["days"][0]["date"] == _DATE_FROM
+    assert all(day["available"] >= 0 for day in data["days"])
+
+
+async def test_get_hotel_calendar(ac: AsyncClient):
+    response = await ac.get("/api/v1/hotels/1/rooms/calendar", params={"days": 7})
+    assert response.status_code == 200
+    data = response.json()
+    assert all(item["days"] and len(item["days"]) == 7 for item in data)
+
+
+async def test_get_room_calendar_room_not_found(ac: AsyncClient):
+    response = await ac.get("/api/v1/hotels/1/rooms/999999/calendar")
+    assert response.status_code == 404
+
+
+async def test_get_hotel_calendar_hotel_not_found(ac: AsyncClient):
+    response = await ac.get("/api/v1/hotels/999999/rooms/calendar")
+    assert response.status_code == 404
+
+
+async def test_get_room_calendar_days_limit(ac: AsyncClient):
+    response = await ac.get("/api/v1/hotels/1/rooms/1/calendar", params={"days": 1000})
+    assert response.status_code == 422
+
+
+async def test_get_rooms_invalid_facilities(ac: AsyncClient):
+    response = await ac.get("/api/v1/hotels/1/rooms", params={"facilities": "1,wifi"})
+    assert response.status_code == 422
+
+
 # ──── POST /hotels/{hotel_id}/rooms (только admin) ────────────────────────────
 
 
@@ -208,3 +250,37 @@ async def test_delete_room(admin_ac: AsyncClient):
 async def test_delete_room_not_found(admin_ac: AsyncClient):
     response = await admin_ac.delete("/api/v1/hotels/1/rooms/999999")
     assert response.status_code == 404
+
+
+async def test_filter_rooms_and_hotels_by_facilities(admin_ac: AsyncClient):
+    facility_ids = []
+    for title in ("Бассейн у номера", "Парковка у номера"):
+        response = await admin_ac.post("/api/v1/facilities", json={"title": title})
+        assert response.status_code == 201
+        facility_ids.append(response.json()["id"])
+    response = await admin_ac.post(
+        "/api/v1/hotels/2/rooms",
+        json={
+            "title": "Room With Facilities",
+            "description": None,
+            "price": 7000,
+            "quantity": 1,
+            "facilities_ids": facility_ids,
+        },
+    )
+    assert response.status_code == 201
+    room_id = response.json()["id"]
+    facilities = ",".join(map(str, facility_ids))
+
+    rooms = await admin_ac.get("/api/v1/hotels/2/rooms", params={"facilities": facilities})
+    assert [r["id"] for r in rooms.json()["items"]] == [room_id]
+    hotels = await admin_ac.get("/api/v1/hotels", params={"facilities": facilities})
+    assert [h["id"] for h in hotels.json()["items"]] == [2]
+
+    # Снятое удобство уходит и из rooms.facility_ids
+    response = await admin_ac.patch(
+        f"/api/v1/hotels/2/rooms/{room_id}", json={"facilities_ids": facility_ids[:1]}
+    )
+    assert response.status_code == 200
+    rooms = await admin_ac.get("/api/v1/hotels/2/rooms", params={"facilities": facilities})
+    assert rooms.json()["items"] == []
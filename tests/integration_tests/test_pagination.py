@@ -4,6 +4,7 @@
 
 from datetime import date, timedelta
 
+import pytest
 from httpx import AsyncClient
 
 
@@ -103,3 +104,43 @@ async def test_rooms_pagination(ac: AsyncClient):
     assert "total" in data
     assert "has_prev" in data
     assert len(data["items"]) <= 1
+
+
+# ──── CursorPage — keyset-пагинация ──────────────────────────────────────────
+
+
+async def test_hotels_cursor_walks_all_pages(ac: AsyncClient):
+    params = {"date_from": _DATE_FROM, "date_to": _DATE_TO, "sort_by": "title"}
+    r_all = await ac.get("/api/v1/hotels", params={**params, "per_page": 100})
+    expected = [h["id"] for h in r_all.json()["items"]]
+
+    seen, cursor = [], ""
+    while cursor is not None:
+        r = await ac.get("/api/v1/hotels", params={**params, "per_page": 1, "cursor": cursor})
+        assert r.status_code == 200
+        data = r.json()
+        assert "total" not in data
+        seen += [h["id"] for h in data["items"]]
+        cursor = data["next_cursor"]
+    assert seen == expected
+
+
+async def test_cursor_for_other_sort_rejected(ac: AsyncClient):
+    r = await ac.get("/api/v1/facilities", params={"per_page": 1, "cursor": ""})
+    cursor = r.json()["next_cursor"]
+    if cursor is None:
+        return
+    r = await ac.get("/api/v1/hotels", params={"sort_by": "title", "cursor": cursor})
+    assert r.status_code == 400
+
+
+@pytest.mark.parametrize("count", ["exact", "window", "estimate", "capped"])
+async def test_hotels_count_strategies_agree_on_small_data(ac: AsyncClient, count: str):
+    params = {"date_from": _DATE_FROM, "date_to": _DATE_TO, "per_page": 1}
+    exact = (await ac.get("/api/v1/hotels", params={**params, "count": "exact"})).json()
+    r = await ac.get("/api/v1/hotels", params={**params, "count": count})
+    assert r.status_code == 200
+    data = r.json()
+    # Тестовых отелей меньше порогов estimate/capped — везде точный total
+    assert data["total"] == exact["total"]
+    assert data["total_is_exact"] is True
@@ -0,0 +1,123 @@
+"""Unit tests for availability/engine.py and availability/client.py."""
+
+import json
+from datetime import date
+from unittest.mock import AsyncMock, patch
+
+from src.availability.client import apply_event, get_availability_engine
+from src.availability.engine import AvailabilityEngine
+
+START = date(2026, 5, 1)
+
+
+def _engine(window_days: int = 30) -> AvailabilityEngine:
+    engine = AvailabilityEngine(start=START, window_days=window_days)
+    engine.set_room(1, hotel_id=10, quantity=2, capacity=2)
+    engine.set_room(2, hotel_id=10, quantity=1, capacity=4)
+    engine.set_room(3, hotel_id=20, quantity=1, capacity=2)
+    engine.ready = True
+    return engine
+
+
+class TestAvailabilityEngine:
+    def test_not_ready_returns_none(self):
+        engine = _engine()
+        engine.ready = False
+        assert engine.available_room_ids(date(2026, 5, 2), date(2026, 5, 4)) is None
+        assert engine.available_hotel_ids(date(2026, 5, 2), date(2026, 5, 4)) is None
+
+    def test_outside_window_returns_none(self):
+        engine = _engine(window_days=30)
+        assert engine.available_room_ids(date(2026, 4, 30), date(2026, 5, 2)) is None
+        assert engine.available_room_ids(date(2026, 5, 29), date(2026, 6, 2)) is None
+
+    def test_all_free(self):
+        engine = _engine()
+        assert engine.available_room_ids(date(2026, 5, 2), date(2026, 5, 4)) == [1, 2, 3]
+        assert engine.available_room_ids(date(2026, 5, 2), date(2026, 5, 4), hotel_id=10) == [1, 2]
+
+    def test_fully_booked_night_excludes_room(self):
+        engine = _engine()
+        engine.set_booked(2, date(2026, 5, 3), 1)
+        assert engine.available_room_ids(date(2026, 5, 2), date(2026, 5, 4), hotel_id=10) == [1]
+
+    def test_checkout_day_is_free(self):
+        engine = _engine()
+        engine.set_booked(2, date(2026, 5, 3), 1)
+        # Ночь 3→4 занята, выезд 3-го — номер свободен
+        assert engine.available_room_ids(date(2026, 5, 1), date(2026, 5, 3), hotel_id=10) == [1, 2]
+
+    def test_partially_booked_room_still_available(self):
+        engine = _engine()
+        engine.set_booked(1, date(2026, 5, 3), 1)
+        assert 1 in engine.available_room_ids(date(2026, 5, 2), date(2026, 5, 4))
+
+    def test_guests_filter(self):
+        engine = _engine()
+        assert engine.available_room_ids(date(2026, 5, 2), date(2026, 5, 4), guests=3) == [2]
+        assert engine.available_hotel_ids(date(2026, 5, 2), date(2026, 5, 4), guests=3) == [10]
+
+    def test_hotel_ids(self):
+        engine = _engine()
+        engine.set_booked(3, date(2026, 5, 2), 1)
+        assert engine.available_hotel_ids(date(2026, 5, 2), date(2026, 5, 4)) == [10]
+
+    def test_set_room_moves_between_hotels(self):
+        engine = _engine()
+        engine.set_room(3, hotel_id=10, quantity=1, capacity=2)
+        assert engine.hotel_rooms[10] == {1, 2, 3}
+        assert engine.hotel_rooms[20] == set()
+
+    def test_remove_room(self):
+        engine = _engine()
+        engine.remove_room(1)
+        assert engine.available_room_ids(date(2026, 5, 2), date(2026, 5, 4)) == [2, 3]
+
+    def test_clear_booked_resets_range(self):
+        engine = _engine()
+        engine.set_booked(2, date(2026, 5, 3), 1)
+        engine.clear_booked(2, date(2026, 5, 1), date(2026, 5, 10))
+        assert 2 in engine.available_room_ids(date(2026, 5, 2), date(2026, 5, 4))
+
+
+class TestApplyEvent:
+    async def test_booking_event_refetches_nights(self):
+        engine = _engine()
+        engine.set_booked(2, date(2026, 5, 5), 1)  # устаревшее значение
+        conn = AsyncMock()
+        conn.fetch.return_value = [{"night": date(2026, 5, 3), "booked_count": 1}]
+        payload = json.dumps({"room_id": 2, "date_from": "2026-05-03", "date_to": "2026-05-06"})
+
+        assert await apply_event(conn, engine, payload) is True
+        assert engine.available_room_ids(date(2026, 5, 3), date(2026, 5, 4), hotel_id=10) == [1]
+        assert engine.available_room_ids(date(2026, 5, 5), date(2026, 5, 6), hotel_id=10) == [1, 2]
+
+    async def test_room_event_updates_meta(self):
+        engine = _engine()
+        conn = AsyncMock()
+        conn.fetchrow.return_value = {"hotel_id": 10, "quantity": 5, "capacity": 6}
+
+        assert await apply_event(conn, engine, json.dumps({"room_id": 3})) is True
+        assert engine.rooms[3].capacity == 6
+        assert 3 in engine.hotel_rooms[10]
+
+    async def test_room_event_removes_deleted_room(self):
+        engine = _engine()
+        conn = AsyncMock()
+        conn.fetchrow.return_value = None
+
+        assert await apply_event(conn, engine, json.dumps({"room_id": 3})) is True
+        assert 3 not in engine.rooms
+
+    async def test_empty_event_requests_reload(self):
+        conn = AsyncMock()
+        assert await apply_event(conn, _engine(), json.dumps({})) is False
+        conn.fetch.assert_not_called()
+
+
+def test_get_availability_engine_only_when_ready():
+    engine = _engine()
+    with patch("src.availability.client._engine", engine):
+        assert get_availability_engine() is engine
+        engine.ready = False
+        assert get_availability_engine() is None
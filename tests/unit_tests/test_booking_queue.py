@@ -0,0 +1,217 @@
+"""Unit tests for services/booking_queue.py and booking_queue/consumer.py."""
+
+import json
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.exceptions import BookingQueueDisabledException, BookingTicketNotFoundException
+from src.schemas.bookings import BookingAddRequest
+from src.services.booking_queue import READY_KEY, BookingQueueService, ticket_key
+
+_STAY = BookingAddRequest(room_id=5, date_from=date(2027, 5, 1), date_to=date(2027, 5, 3))
+
+
+def _make_redis(stored: dict | None = None):
+    """RedisManager mock: get/set поверх dict, сырой клиент — AsyncMock."""
+    stored = {} if stored is None else stored
+    manager = MagicMock()
+    manager.redis = AsyncMock()
+    manager.get = AsyncMock(side_effect=lambda key: stored.get(key))
+
+    async def _set(key, value, expire=None):
+        stored[key] = value
+
+    manager.set = AsyncMock(side_effect=_set)
+    return manager
+
+
+def _service(redis=None, enabled=True):
+    return BookingQueueService(redis=redis or _make_redis(), enabled=enabled, result_ttl=900)
+
+
+class TestBookingQueueService:
+    async def test_enqueue_disabled(self):
+        with pytest.raises(BookingQueueDisabledException):
+            await _service(enabled=False).enqueue(1, _STAY)
+
+    async def test_enqueue_appends_to_room_stream(self):
+        stored = {}
+        redis = _make_redis(stored)
+
+        ticket = await _service(redis).enqueue(1, _STAY)
+
+        assert ticket.status == "pending"
+        assert json.loads(stored[ticket_key(ticket.ticket)]) == {"user_id": 1, "status": "pending"}
+        stream, fields = redis.redis.xadd.call_args.args
+        assert stream == "booking_queue:room:5"
+        assert fields["ticket"] == ticket.ticket
+        assert fields["date_from"] == "2027-05-01"
+        redis.redis.rpush.assert_awaited_once_with(READY_KEY, 5)
+
+    async def test_get_status_not_found(self):
+        with pytest.raises(BookingTicketNotFoundException):
+            await _service().get_status(1, "missing")
+
+    async def test_get_status_of_another_user(self):
+        stored = {ticket_key("t1"): json.dumps({"user_id": 2, "status": "pending"})}
+        with pytest.raises(BookingTicketNotFoundException):
+            await _service(_make_redis(stored)).get_status(1, "t1")
+
+    async def test_get_status_pending_without_wait(self):
+        stored = {ticket_key("t1"): json.dumps({"user_id": 1, "status": "pending"})}
+        result = await _service(_make_redis(stored)).get_status(1, "t1")
+        assert result.status == "pending"
+        assert result.booking is None
+
+    async def test_get_status_long_poll_returns_result(self):
+        booking = {
+            "id": 7,
+            "user_id": 1,
+            "room_id": 5,
+            "date_from": "2027-05-01",
+            "date_to": "2027-05-03",
+            "price": 1000,
+        }
+        answers = iter(
+            [
+                json.dumps({"user_id": 1, "status": "pending"}),
+                json.dumps({"user_id": 1, "status": "confirmed", "booking": booking}),
+            ]
+        )
+        redis = _make_redis()
+        redis.get = AsyncMock(side_effect=lambda key: next(answers))
+
+        with patch("src.services.booking_queue._POLL_INTERVAL_SECONDS", 0):
+            result = await _service(redis).get_status(1, "t1", wait=5)
+
+        assert result.status == "confirmed"
+        assert result.booking.id == 7
+
+
+def _make_client(messages):
+    client = MagicMock()
+    client.set = AsyncMock(return_value=True)
+    client.xrange = AsyncMock(side_effect=[messages, []])
+    client.xlen = AsyncMock(return_value=0)
+    client.eval = AsyncMock()
+    client.rpush = AsyncMock()
+    pipe = MagicMock()
+    pipe.execute = AsyncMock()
+    client.pipeline.return_value = pipe
+    return client, pipe
+
+
+class TestConsumer:
+    async def test_drain_room_skips_locked_room(self):
+        from src.booking_queue.consumer import drain_room
+
+        client, _ = _make_client([])
+        client.set.return_value = None
+
+        assert await drain_room(client, 5, batch_size=10) == 0
+        client.xrange.assert_not_called()
+        client.eval.assert_not_called()
+
+    async def test_drain_room_applies_batch_and_stores_results(self):
+        from src.booking_queue.consumer import drain_room
+
+        messages = [
+            (
+                b"1-0",
+                {
+                    b"ticket": b"t1",
+                    b"user_id": b"1",
+                    b"date_from": b"2027-05-01",
+                    b"date_to": b"2027-05-03",
+                },
+            ),
+            (
+                b"2-0",
+                {
+                    b"ticket": b"t2",
+                    b"user_id": b"2",
+                    b"date_from": b"2027-05-01",
+                    b"date_to": b"2027-05-03",
+                },
+            ),
+        ]
+        client, pipe = _make_client(messages)
+        results = {
+            "t1": {"user_id": 1, "status": "confirmed"},
+            "t2": {"user_id": 2, "status": "rejected", "detail": "x"},
+        }
+        service = MagicMock()
+        service.apply_queued_batch = AsyncMock(return_value=results)
+
+        with (
+            patch("src.booking_queue.consumer.DBManager"),
+            patch("src.booking_queue.consumer.BookingService", return_value=service),
+        ):
+            assert await drain_room(client, 5, batch_size=10) == 2
+
+        room_id, entries = service.apply_queued_batch.call_args.args
+        assert room_id == 5
+        assert [e["user_id"] for e in entries] == [1, 2]
+        assert {c.args[0] for c in pipe.set.call_args_list} == {ticket_key("t1"), ticket_key("t2")}
+        pipe.xdel.assert_called_once_with("booking_queue:room:5", b"1-0", b"2-0")
+        client.eval.assert_awaited_once()
+        client.rpush.assert_not_called()
+
+    async def test_drain_room_drops_malformed_entries(self):
+        from src.booking_queue.consumer import drain_room
+
+        messages = [
+            (b"1-0", {b"ticket": b"t1", b"user_id": b"nope"}),
+            (b"2-0", {b"user_id": b"2"}),
+        ]
+        client, pipe = _make_client(messages)
+        service = MagicMock()
+        service.apply_queued_batch = AsyncMock(return_value={})
+
+        with (
+            patch("src.booking_queue.consumer.DBManager"),
+            patch("src.booking_queue.consumer.BookingService", return_value=service),
+        ):
+            assert await drain_room(client, 5, batch_size=10) == 2
+
+        assert service.apply_queued_batch.call_args.args == (5, [])
+        # Повреждённые заявки удаляются, а не блокируют очередь номера
+        pipe.xdel.assert_called_once_with("booking_queue:room:5", b"1-0", b"2-0")
+
+    async def test_keep_lock_renews_until_lock_is_lost(self):
+        from src.booking_queue.consumer import _keep_lock
+
+        client = MagicMock()
+        client.eval = AsyncMock(side_effect=[1, 1, 0])
+
+        with patch("src.booking_queue.consumer._LOCK_RENEW_SECONDS", 0):
+            await _keep_lock(client, "booking_queue:lock:5", "token")
+
+        assert client.eval.await_count == 3
+        assert client.eval.call_args.args[2:] == ("booking_queue:lock:5", "token", 30)
+
+    async def test_drain_room_requeues_late_entries(self):
+        from src.booking_queue.consumer import drain_room
+
+        client, _ = _make_client([])
+        client.xlen.return_value = 1
+
+        await drain_room(client, 5, batch_size=10)
+        client.rpush.assert_awaited_once_with(READY_KEY, 5)
+
+    async def test_requeue_pending_rooms(self):
+        from src.booking_queue.consumer import requeue_pending_rooms
+
+        async def _scan(match):
+            for key in (b"booking_queue:room:5", b"booking_queue:room:6"):
+                yield key
+
+        client = MagicMock()
+        client.scan_iter = _scan
+        client.xlen = AsyncMock(side_effect=[3, 0])
+        client.rpush = AsyncMock()
+
+        assert await requeue_pending_rooms(client) == 1
+        client.rpush.assert_awaited_once_with(READY_KEY, 5)
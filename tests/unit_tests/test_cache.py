@@ -0,0 +1,485 @@
+"""Unit tests for src/cache.py."""
+
+import asyncio
+import importlib.util
+import time
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+from fastapi import FastAPI, Query
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+
+from src.api.dependencies import PaginationDep, PaginationParams
+from src.cache import (
+    AVAILABILITY_TAG,
+    HOTEL_TAG,
+    SEARCH_TAG,
+    LocalLRU,
+    PendingResponse,
+    StaleWhileRevalidateBackend,
+    TaggedBackend,
+    TwoTierBackend,
+    _pending_response,
+    cache_control,
+    cached,
+    calendar_key_builder,
+    etag_matches,
+    invalidate_cache,
+    invalidate_cache_from_task,
+    invalidate_hotel_availability,
+    payload_etag,
+    refresh_cached,
+    query_key_builder,
+    response_tags,
+    single_flight,
+)
+
+
+async def get_room_calendar(): ...
+
+
+def _key(**kwargs) -> str:
+    return calendar_key_builder(get_room_calendar, "fastapi-cache:calendar", kwargs=kwargs)
+
+
+def test_calendar_key_contains_hotel_id():
+    key = _key(hotel_id=5, room_id=1, date_from=date(2026, 5, 1), days=60, db=object())
+    assert key.startswith("fastapi-cache:calendar:5:")
+
+
+def test_calendar_key_ignores_db_dependency():
+    params = {"hotel_id": 5, "room_id": 1, "date_from": date(2026, 5, 1), "days": 60}
+    assert _key(**params, db=object()) == _key(**params, db=object())
+
+
+def test_calendar_key_depends_on_params():
+    base = {"hotel_id": 5, "room_id": 1, "date_from": date(2026, 5, 1), "days": 60}
+    assert _key(**base) != _key(**{**base, "days": 90})
+    assert _key(**base) != _key(**{**base, "room_id": 2})
+
+
+async def get_hotels(): ...
+
+
+def _hotels_key(**kwargs) -> str:
+    return query_key_builder(get_hotels, "fastapi-cache:", kwargs=kwargs)
+
+
+def test_hotels_key_ignores_db_and_text_case():
+    pagination = PaginationParams(page=2, per_page=10)
+    key = _hotels_key(db=object(), pagination=pagination, city="Сочи ", search=None)
+    same = _hotels_key(db=object(), pagination=pagination.model_copy(), city="сочи", search=None)
+    assert key == same
+
+
+def test_hotels_key_depends_on_filters():
+    assert _hotels_key(city="Сочи", price_max=5000) != _hotels_key(city="Сочи", price_max=6000)
+    assert _hotels_key(pagination=PaginationParams(page=1)) != _hotels_key(
+        pagination=PaginationParams(page=2)
+    )
+
+
+def test_response_tags_fill_templates_and_add_availability():
+    assert response_tags((HOTEL_TAG,), {"hotel_id": 5, "db": object()}) == ("hotel:5",)
+    tags = response_tags(
+        (SEARCH_TAG,), {"date_from": date(2026, 5, 1), "date_to": date(2026, 5, 3)}
+    )
+    assert tags == (SEARCH_TAG, AVAILABILITY_TAG)
+
+
+def test_response_tags_hotel_dates_use_calendar_tag():
+    kwargs = {"hotel_id": 5, "date_from": date(2026, 5, 1), "date_to": date(2026, 5, 3)}
+    assert response_tags((HOTEL_TAG,), kwargs) == ("hotel:5", "calendar:5")
+
+
+def _pending(key: str, *tags: str, started_at: float | None = None, expire: int = 360) -> None:
+    started_at = time.time() if started_at is None else started_at
+    _pending_response.set(PendingResponse(key, tags, started_at, expire))
+
+
+async def test_tagged_backend_invalidates_only_tagged_keys():
+    backend = TaggedBackend(InMemoryBackend())
+    _pending("k:hotel5", "hotel:5", SEARCH_TAG)
+    await backend.set("k:hotel5", b"1", 300)
+    _pending("k:hotel6", "hotel:6")
+    await backend.set("k:hotel6", b"2", 300)
+
+    await backend.invalidate("hotel:5")
+
+    assert await backend.get("k:hotel5") is None
+    assert await backend.get("k:hotel6") == b"2"
+
+
+async def test_tagged_backend_skips_tags_of_other_key():
+    backend = TaggedBackend(InMemoryBackend(), redis=MagicMock(eval=AsyncMock()))
+    _pending("k:other", "hotel:5")
+    await backend.set("k:direct", b"1", 300)
+    backend._redis.eval.assert_not_awaited()
+
+
+async def test_tagged_backend_registers_tags_in_redis():
+    redis = MagicMock(eval=AsyncMock(side_effect=[1, [b"fastapi-cache::abc"]]))
+    backend = TaggedBackend(MagicMock(set=AsyncMock()), redis=redis)
+    _pending("fastapi-cache::abc", "hotel:5", SEARCH_TAG, started_at=100.0)
+    with patch("src.cache.FastAPICache.get_prefix", return_value="fastapi-cache"):
+        await backend.set("fastapi-cache::abc", b"1", 300)
+        assert await backend.invalidate("hotel:5") == 1
+
+    args = redis.eval.await_args_list[0].args
+    assert args[1:] == (
+        4,
+        "fastapi-cache:tag:hotel:5",
+        "fastapi-cache:tag:search",
+        "fastapi-cache:tag-invalidated:hotel:5",
+        "fastapi-cache:tag-invalidated:search",
+        "fastapi-cache::abc",
+        300,
+        99.0,  # начало вычисления с запасом на расхождение часов
+        "fastapi-cache:invalidate",
+    )
+    assert redis.eval.await_args_list[1].args[1:] == (
+        2,
+        "fastapi-cache:tag:hotel:5",
+        "fastapi-cache:tag-invalidated:hotel:5",
+        "fastapi-cache:invalidate",
+        360,
+    )
+
+
+async def test_tagged_backend_drops_response_computed_before_invalidation():
+    backend = TaggedBackend(InMemoryBackend())
+    # GET начал считать выдачу, тем временем бронь сбросила availability
+    _pending("k:search", SEARCH_TAG, AVAILABILITY_TAG, started_at=time.time() - 5)
+    await backend.invalidate(AVAILABILITY_TAG)
+    await backend.set("k:search", b"old", 300)
+    assert await backend.get("k:search") is None
+
+    # Запрос, начавшийся после сброса, кэшируется как обычно
+    with patch("src.cache.time.time", return_value=time.time() + 5):
+        _pending("k:search", SEARCH_TAG, AVAILABILITY_TAG)
+    await backend.set("k:search", b"new", 300)
+    assert await backend.get("k:search") == b"new"
+
+
+async def test_tagged_backend_drops_stale_response_from_own_l1():
+    l1_backend, _, _ = _two_tier()
+    redis = MagicMock(eval=AsyncMock(return_value=0))  # скрипт нашёл более поздний сброс
+    backend = TaggedBackend(l1_backend, redis=redis)
+    _pending("fastapi-cache::abc", AVAILABILITY_TAG)
+    with patch("src.cache.FastAPICache.get_prefix", return_value="fastapi-cache"):
+        await backend.set("fastapi-cache::abc", b"old", 300)
+    assert l1_backend.l1.get("fastapi-cache::abc") is None
+
+
+async def test_tagged_backend_removes_response_if_tagging_fails():
+    inner = MagicMock(set=AsyncMock(), clear=AsyncMock(return_value=1))
+    redis = MagicMock(eval=AsyncMock(side_effect=ConnectionError()))
+    backend = TaggedBackend(inner, redis=redis)
+    _pending("fastapi-cache::abc", "hotel:5")
+    with (
+        patch("src.cache.FastAPICache.get_prefix", return_value="fastapi-cache"),
+        pytest.raises(ConnectionError),
+    ):
+        await backend.set("fastapi-cache::abc", b"1", 300)
+    inner.clear.assert_awaited_once_with(key="fastapi-cache::abc")
+
+
+def test_local_lru_evicts_least_recent_by_size():
+    lru = LocalLRU(max_bytes=10)
+    lru.set("a", b"1234", 60)
+    lru.set("b", b"1234", 60)
+    lru.get("a")
+    lru.set("c", b"1234", 60)
+
+    assert lru.get("b") is None
+    assert lru.get("a") == (60, b"1234")
+    assert lru.size == 8
+
+
+def test_local_lru_expires_entries():
+    lru = LocalLRU(max_bytes=10)
+    with patch("src.cache.time.monotonic", return_value=100.0):
+        lru.set("a", b"1", 5)
+    with patch("src.cache.time.monotonic", return_value=105.0):
+        assert lru.get("a") is None
+    assert lru.size == 0
+
+
+def _two_tier(l2_value=b"v", l2_ttl=300):
+    l2 = MagicMock(
+        get_with_ttl=AsyncMock(return_value=(l2_ttl, l2_value)),
+        set=AsyncMock(),
+        clear=AsyncMock(return_value=1),
+    )
+    redis = MagicMock(publish=AsyncMock())
+    return TwoTierBackend(l2, redis, max_bytes=1024, max_ttl=30), l2, redis
+
+
+async def test_two_tier_serves_repeat_reads_from_l1():
+    backend, l2, _ = _two_tier()
+
+    assert await backend.get_with_ttl("k") == (300, b"v")
+    assert await backend.get_with_ttl("k") == (30, b"v")  # TTL L1 ограничен max_ttl
+    l2.get_with_ttl.assert_awaited_once_with("k")
+
+
+async def test_two_tier_set_keeps_only_fresh_part_in_l1():
+    backend, _, _ = _two_tier()
+    with patch("src.cache.settings.CACHE_STALE_SECONDS", 60):
+        await backend.set("fresh", b"1", 80)
+        await backend.set("stale", b"2", 60)
+
+    assert 0 < backend.l1.get("fresh")[0] <= 20
+    assert backend.l1.get("stale") is None
+
+
+async def test_two_tier_does_not_cache_value_deleted_during_read():
+    backend, l2, _ = _two_tier()
+
+    async def read_then_invalidated(key):
+        backend._drop(b"k")
+        return 300, b"old"
+
+    l2.get_with_ttl.side_effect = read_then_invalidated
+    await backend.get_with_ttl("k")
+    assert backend.l1.get("k") is None
+
+
+async def test_two_tier_drops_published_keys():
+    backend, _, _ = _two_tier()
+    await backend.set("a", b"1", 300)
+    await backend.set("b", b"2", 300)
+
+    backend._drop(b"a\nz")
+    assert backend.l1.get("a") is None
+    assert backend.l1.get("b") is not None
+
+    backend._drop(b"*")
+    assert len(backend.l1) == 0
+
+
+async def test_two_tier_clear_key_publishes_it():
+    backend, l2, redis = _two_tier()
+    await backend.set("a", b"1", 300)
+    with patch("src.cache.FastAPICache.get_prefix", return_value="fastapi-cache"):
+        await backend.clear(key="a")
+
+    assert backend.l1.get("a") is None
+    redis.publish.assert_awaited_once_with("fastapi-cache:invalidate", "a")
+
+
+async def test_tagged_backend_invalidate_drops_own_l1():
+    l1_backend, _, _ = _two_tier()
+    await l1_backend.set("fastapi-cache::abc", b"1", 300)
+    redis = MagicMock(eval=AsyncMock(return_value=[b"fastapi-cache::abc"]))
+    backend = TaggedBackend(l1_backend, redis=redis)
+    with patch("src.cache.FastAPICache.get_prefix", return_value="fastapi-cache"):
+        await backend.invalidate("hotel:5")
+    assert l1_backend.l1.get("fastapi-cache::abc") is None
+
+
+async def test_invalidate_hotel_availability_tags():
+    backend = TaggedBackend(InMemoryBackend())
+    backend.invalidate = AsyncMock()
+    with patch("src.cache.FastAPICache.get_backend", return_value=backend):
+        await invalidate_hotel_availability(5)
+    backend.invalidate.assert_awaited_once_with("calendar:5", AVAILABILITY_TAG)
+
+
+async def test_invalidate_cache_swallows_errors():
+    with patch("src.cache.FastAPICache.get_backend", side_effect=AssertionError()):
+        await invalidate_cache(SEARCH_TAG)
+
+
+async def test_invalidate_cache_from_task_connects_and_closes():
+    manager = MagicMock(connect=AsyncMock(), close=AsyncMock())
+    with (
+        patch("src.cache.redis_manager", manager),
+        patch("src.cache.init_cache") as init,
+        patch("src.cache.invalidate_cache", AsyncMock(side_effect=ConnectionError())),
+    ):
+        await invalidate_cache_from_task(SEARCH_TAG)
+    init.assert_called_once_with(manager.redis)
+    manager.close.assert_awaited_once()
+
+
+def _swr(ttl, value=b"v", redis=None):
+    inner = MagicMock(get_with_ttl=AsyncMock(return_value=(ttl, value)), set=AsyncMock())
+    return StaleWhileRevalidateBackend(inner, redis, grace=60, lock_ttl=10)
+
+
+async def test_swr_fresh_value_ttl_excludes_grace():
+    assert await _swr(ttl=200).get_with_ttl("k") == (140, b"v")
+
+
+async def test_swr_stale_value_recomputed_by_one_request():
+    backend = _swr(ttl=30)
+
+    assert await backend.get_with_ttl("k") == (0, None)  # этот запрос пересчитывает
+    assert await backend.get_with_ttl("k") == (0, b"v")  # остальным — устаревший
+    await backend.set("k", b"new", 360)
+    assert await backend.get_with_ttl("k") == (0, None)  # отметка снята записью
+
+
+async def test_swr_lock_held_by_other_process_serves_stale():
+    redis = MagicMock(set=AsyncMock(return_value=None), delete=AsyncMock())
+    backend = _swr(ttl=30, redis=redis)
+
+    assert await backend.get_with_ttl("k") == (0, b"v")
+    redis.set.assert_awaited_once_with("k:refresh", 1, nx=True, ex=10)
+    await backend.set("k", b"new", 360)
+    redis.delete.assert_not_awaited()  # лок не наш
+
+
+async def test_stale_response_not_served_after_its_tags_were_invalidated():
+    inner = MagicMock(get_with_ttl=AsyncMock(return_value=(0, b"old")))
+    backend = TaggedBackend(inner)
+    _pending("k", AVAILABILITY_TAG)
+    assert await backend.get_with_ttl("k") == (0, b"old")  # сбросов не было
+
+    await backend.invalidate(AVAILABILITY_TAG)
+    _pending("k", AVAILABILITY_TAG)
+    assert await backend.get_with_ttl("k") == (0, None)  # бронь после записи ответа
+
+
+async def test_stale_check_reads_marks_from_redis():
+    inner = MagicMock(get_with_ttl=AsyncMock(return_value=(0, b"old")))
+    redis = MagicMock(mget=AsyncMock(return_value=[None, str(time.time() - 1000).encode()]))
+    backend = TaggedBackend(inner, redis=redis)
+    _pending("k", "hotel:5", AVAILABILITY_TAG, expire=360)
+    with patch("src.cache.FastAPICache.get_prefix", return_value="fastapi-cache"):
+        # Сброс раньше, чем ответ мог быть записан, — устаревший ответ отдаётся
+        assert await backend.get_with_ttl("k") == (0, b"old")
+        redis.mget.return_value = [None, str(time.time() - 10).encode()]
+        assert await backend.get_with_ttl("k") == (0, None)
+    redis.mget.assert_awaited_with(
+        ["fastapi-cache:tag-invalidated:hotel:5", "fastapi-cache:tag-invalidated:availability"]
+    )
+
+
+async def test_stale_refresh_started_before_invalidation_is_not_stored():
+    backend = TaggedBackend(StaleWhileRevalidateBackend(InMemoryBackend(), grace=60, lock_ttl=10))
+    _pending("k", AVAILABILITY_TAG)
+    await backend.set("k", b"old", 30)  # осталось меньше grace — устаревший
+    assert await backend.get_with_ttl("k") == (0, None)  # этот запрос пересчитывает
+
+    await backend.invalidate(AVAILABILITY_TAG)  # бронь, пока идёт пересчёт
+    await backend.set("k", b"pre-write", 360)
+    assert await backend.get("k") is None
+
+
+async def test_single_flight_coalesces_identical_misses():
+    calls = 0
+    release = asyncio.Event()
+
+    @single_flight
+    async def endpoint():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return {"n": calls}
+
+    async def request():
+        _pending("k")
+        return await endpoint()
+
+    tasks = [asyncio.create_task(request()) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*tasks) == [{"n": 1}] * 5
+    assert calls == 1
+
+
+async def test_single_flight_shares_errors():
+    @single_flight
+    async def endpoint():
+        await asyncio.sleep(0)
+        raise ValueError()
+
+    async def request():
+        _pending("k")
+        return await endpoint()
+
+    results = await asyncio.gather(request(), request(), return_exceptions=True)
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_etag_matches_list_weak_and_star():
+    etag = payload_etag(b"{}")
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+
+
+def test_cache_control_with_cdn_max_age():
+    with patch("src.cache.settings.CACHE_CDN_MAX_AGE_SECONDS", 0):
+        assert cache_control() == "public, no-cache"
+    with patch("src.cache.settings.CACHE_CDN_MAX_AGE_SECONDS", 120):
+        assert cache_control() == "public, max-age=0, s-maxage=120"
+
+
+@pytest.fixture
+def real_cache_decorator(monkeypatch):
+    """Настоящий @cache в src.cache: tests/conftest.py подменяет его заглушкой до импорта src."""
+    spec = importlib.util.find_spec("fastapi_cache.decorator")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    monkeypatch.setattr("src.cache.cache", module.cache)
+
+
+@pytest.mark.usefixtures("real_cache_decorator")
+async def test_cached_endpoint_answers_304_for_matching_etag():
+    app = FastAPI()
+    calls = 0
+
+    @app.get("/hotels/{hotel_id}")
+    @cached(300, HOTEL_TAG)
+    async def get_hotel(hotel_id: int):
+        nonlocal calls
+        calls += 1
+        return {"id": hotel_id}
+
+    FastAPICache.init(TaggedBackend(InMemoryBackend()), prefix="test")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        first = await client.get("/hotels/5")
+        repeat = await client.get("/hotels/5", headers={"If-None-Match": first.headers["ETag"]})
+
+    assert first.headers["ETag"] == payload_etag(b'{"id": 5}')
+    assert first.headers["Surrogate-Key"] == "hotel:5"
+    assert repeat.status_code == 304
+    assert repeat.content == b""
+    assert repeat.headers["ETag"] == first.headers["ETag"]
+    assert calls == 1
+
+
+@pytest.mark.usefixtures("real_cache_decorator")
+async def test_refresh_cached_fills_key_of_http_request():
+    app = FastAPI()
+    calls = 0
+
+    @app.get("/hotels")
+    @cached(300, SEARCH_TAG)
+    async def get_hotels(
+        pagination: PaginationDep,
+        city: str | None = Query(None),
+        order: str = Query("asc"),
+    ):
+        nonlocal calls
+        calls += 1
+        return {"city": city, "calls": calls}
+
+    FastAPICache.init(TaggedBackend(InMemoryBackend()), prefix="test")
+    await refresh_cached(get_hotels, pagination=PaginationParams(), city="Сочи")
+    await refresh_cached(get_hotels, pagination=PaginationParams(), city="Сочи")  # пересчёт
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/hotels", params={"city": "сочи"})
+
+    assert response.headers["X-FastAPI-Cache"] == "HIT"
+    assert response.json() == {"city": "Сочи", "calls": 2}
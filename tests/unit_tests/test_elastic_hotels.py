@@ -10,6 +10,7 @@ from src.elastic.hotels import (
     index_hotel,
     remove_hotel,
     autocomplete,
+    search_ids,
     INDEX,
 )
 
@@ -112,3 +113,33 @@ async def test_autocomplete_no_results(es):
     result = await autocomplete(es, "xyz")
     assert result["locations"] == []
     assert result["hotels"] == []
+
+
+async def test_search_ids_ranked_ids_without_source(es):
+    es.search.return_value = {"hits": {"total": {"value": 2}, "hits": [{"_id": "7"}, {"_id": "3"}]}}
+    assert await search_ids(es, search="Москва", limit=50) == [7, 3]
+    kwargs = es.search.call_args.kwargs
+    assert kwargs["size"] == 50
+    assert kwargs["track_total_hits"] == 51
+    assert kwargs["source"] is False
+    must = kwargs["query"]["bool"]["must"][0]["multi_match"]
+    assert must["fields"] == ["title^3", "city^2", "address"]
+    assert kwargs["query"]["bool"]["filter"] == []
+
+
+async def test_search_ids_city_title_filters_without_search(es):
+    es.search.return_value = {"hits": {"total": {"value": 0}, "hits": []}}
+    await search_ids(es, city="Сочи", title="Grand")
+    query = es.search.call_args.kwargs["query"]["bool"]
+    assert query["must"] == []
+    assert query["filter"] == [
+        {"match": {"city": {"query": "Сочи", "operator": "and"}}},
+        {"match": {"title": {"query": "Grand", "operator": "and"}}},
+    ]
+
+
+async def test_search_ids_over_limit_returns_none(es):
+    es.search.return_value = {
+        "hits": {"total": {"value": 51, "relation": "gte"}, "hits": [{"_id": "1"}] * 50}
+    }
+    assert await search_ids(es, search="отель", limit=50) is None
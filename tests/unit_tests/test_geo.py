@@ -0,0 +1,63 @@
+"""Unit tests for src.geo: разбор near и геокодирование."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.exceptions import InvalidGeoPointException
+from src.geo import geocode, parse_geo_point
+
+
+class TestParseGeoPoint:
+    def test_valid_point(self):
+        assert parse_geo_point("43.58,39.72") == (43.58, 39.72)
+
+    def test_spaces_allowed(self):
+        assert parse_geo_point(" -33.9, 151.2 ") == (-33.9, 151.2)
+
+    @pytest.mark.parametrize(
+        "value", ["", "43.58", "43.58,39.72,1", "abc,def", "91,0", "0,181", "nan,0", "inf,0"]
+    )
+    def test_invalid_point(self, value):
+        with pytest.raises(InvalidGeoPointException):
+            parse_geo_point(value)
+
+
+def _mock_client(payload):
+    response = MagicMock()
+    response.json.return_value = payload
+    client = AsyncMock()
+    client.get.return_value = response
+    ctx = MagicMock()
+    ctx.__aenter__ = AsyncMock(return_value=client)
+    ctx.__aexit__ = AsyncMock(return_value=False)
+    return ctx, client
+
+
+class TestGeocode:
+    @patch("src.geo.settings")
+    async def test_not_configured(self, mock_settings):
+        mock_settings.GEOCODER_URL = None
+        assert await geocode("Сочи", "ул. Морская, 1") is None
+
+    @patch("src.geo.settings")
+    @patch("src.geo.httpx.AsyncClient")
+    async def test_found(self, mock_async_client, mock_settings):
+        mock_settings.GEOCODER_URL = "http://geo/search"
+        ctx, client = _mock_client([{"lat": "43.58", "lon": "39.72"}])
+        mock_async_client.return_value = ctx
+
+        assert await geocode("Сочи", "ул. Морская, 1") == (43.58, 39.72)
+        params = client.get.call_args.kwargs["params"]
+        assert params["q"] == "ул. Морская, 1, Сочи"
+        assert params["limit"] == 1
+
+    @patch("src.geo.settings")
+    @patch("src.geo.httpx.AsyncClient")
+    async def test_not_found(self, mock_async_client, mock_settings):
+        mock_settings.GEOCODER_URL = "http://geo/search"
+        ctx, client = _mock_client([])
+        mock_async_client.return_value = ctx
+
+        assert await geocode("Сочи", None) is None
+        assert client.get.call_args.kwargs["params"]["q"] == "Сочи"
@@ -46,7 +46,11 @@ def _make_orm_hotel(id=1, title="Test Hotel", city="Moscow", address="Addr"):
     m.title = title
     m.city = city
     m.address = address
+    m.latitude = None
+    m.longitude = None
     m.cover_image_url = None
+    m.min_price = None
+    m.distance_km = None
     return m
 
 
@@ -290,80 +294,308 @@ class TestBookingsRepository:
         result = await repo.get_paginated_by_user(user_id=1, limit=10, offset=0)
         assert result == []
 
+    async def test_get_paginated_by_user_keyset(self):
+        from sqlalchemy.dialects import postgresql
+
+        session = _make_session()
+        session.execute.return_value = _scalars_result([])
+
+        repo = self._make_repo(session)
+        await repo.get_paginated_by_user(user_id=1, limit=11, after=["2027-05-01", 7])
+        sql = str(
+            session.execute.call_args.args[0].compile(
+                dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+            )
+        )
+        assert "(bookings.date_from, bookings.id) < ('2027-05-01', 7)" in sql
+        assert "ORDER BY bookings.date_from DESC, bookings.id DESC" in sql
+        assert "OFFSET" not in sql
+
     async def test_add_booking_room_not_found(self):
         from src.exceptions import RoomNotFoundException
-        from src.schemas.bookings import BookingAdd
 
         session = _make_session()
-        # First execute (FOR UPDATE lock) returns None
-        lock_result = MagicMock()
-        lock_result.scalar_one_or_none.return_value = None
-        session.execute.return_value = lock_result
+        # Call 1: conditional upsert reserves nothing
+        reserve_result = MagicMock()
+        reserve_result.all.return_value = []
+        # Call 2: room lookup on the failure path
+        exists_result = MagicMock()
+        exists_result.scalar_one_or_none.return_value = None
+        session.execute.side_effect = [reserve_result, exists_result]
 
         repo = self._make_repo(session)
-        data = BookingAdd(
-            user_id=1,
-            room_id=99,
-            date_from=date(2026, 5, 1),
-            date_to=date(2026, 5, 5),
-            price=1000,
-        )
         with pytest.raises(RoomNotFoundException):
-            await repo.add_booking(data, hotel_id=1)
+            await repo.add_booking(1, 99, date(2026, 5, 1), date(2026, 5, 5))
 
     async def test_add_booking_no_rooms_available(self):
         from src.exceptions import AllRoomsAreBookedException
-        from src.schemas.bookings import BookingAdd
 
         session = _make_session()
-        orm_room = _make_orm_room(id=5)
+        # Only 2 of 4 nights had spare quantity
+        reserve_result = MagicMock()
+        reserve_result.all.return_value = [(date(2026, 5, 1),), (date(2026, 5, 2),)]
+        session.execute.return_value = reserve_result
 
-        # Call 1: FOR UPDATE returns the room (exists)
-        lock_result = MagicMock()
-        lock_result.scalar_one_or_none.return_value = orm_room
-        # Call 2: rooms_ids CTE returns empty list (no available rooms)
-        ids_result = _scalars_result([])
+        repo = self._make_repo(session)
+        with pytest.raises(AllRoomsAreBookedException):
+            await repo.add_booking(1, 5, date(2026, 5, 1), date(2026, 5, 5))
+        assert session.execute.call_count == 1
+
+    async def test_add_booking_success(self):
+        from sqlalchemy.dialects import postgresql
+
+        session = _make_session()
+        # Call 1: conditional upsert reserves all 4 nights
+        reserve_result = MagicMock()
+        reserve_result.all.return_value = [(date(2026, 5, d),) for d in range(1, 5)]
+        # Call 2: INSERT ... SELECT price FROM rooms RETURNING + hotel_id
+        insert_result = MagicMock()
+        insert_result.mappings.return_value.one.return_value = {
+            "id": 100,
+            "user_id": 1,
+            "room_id": 5,
+            "date_from": date(2026, 5, 1),
+            "date_to": date(2026, 5, 5),
+            "price": 1000,
+            "hotel_id": 10,
+        }
+        session.execute.side_effect = [reserve_result, insert_result]
 
-        session.execute.side_effect = [lock_result, ids_result]
+        repo = self._make_repo(session)
+        booking, hotel_id = await repo.add_booking(1, 5, date(2026, 5, 1), date(2026, 5, 5))
+        assert booking.id == 100
+        assert booking.price == 1000
+        assert hotel_id == 10
+        assert session.execute.call_count == 2
+
+        reserve_sql = str(
+            session.execute.call_args_list[0].args[0].compile(dialect=postgresql.dialect())
+        )
+        assert "ON CONFLICT (room_id, night) DO UPDATE" in reserve_sql
+        assert "FOR UPDATE" not in reserve_sql
+
+    async def test_add_booking_stores_queue_ticket(self):
+        from sqlalchemy.dialects import postgresql
+
+        session = _make_session()
+        reserve_result = MagicMock()
+        reserve_result.all.return_value = [(date(2026, 5, 1),)]
+        insert_result = MagicMock()
+        insert_result.mappings.return_value.one.return_value = {
+            "id": 100,
+            "user_id": 1,
+            "room_id": 5,
+            "date_from": date(2026, 5, 1),
+            "date_to": date(2026, 5, 2),
+            "price": 1000,
+            "hotel_id": 10,
+        }
+        session.execute.side_effect = [reserve_result, insert_result]
 
         repo = self._make_repo(session)
-        data = BookingAdd(
+        await repo.add_booking(1, 5, date(2026, 5, 1), date(2026, 5, 2), queue_ticket="t1")
+        compiled = session.execute.call_args.args[0].compile(dialect=postgresql.dialect())
+        assert "price, queue_ticket)" in str(compiled)
+        assert "t1" in compiled.params.values()
+
+    async def test_get_by_queue_tickets(self):
+        from sqlalchemy.dialects import postgresql
+
+        session = _make_session()
+        model = MagicMock(queue_ticket="t1")
+        session.execute.return_value = _scalars_result([model])
+
+        repo = self._make_repo(session)
+        with patch.object(repo.mapper, "map_to_domain_entity", return_value="booking"):
+            assert await repo.get_by_queue_tickets(["t1", "t2"]) == {"t1": "booking"}
+        sql = str(session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "bookings.queue_ticket = any(" in sql
+
+    async def test_change_dates_extend_checks_only_added_nights(self):
+        from sqlalchemy.dialects import postgresql
+
+        from src.schemas.bookings import Booking
+
+        session = _make_session()
+        # Продление на 1 ночь: upsert одной ночи
+        reserve_result = MagicMock()
+        reserve_result.all.return_value = [(date(2026, 5, 5),)]
+        update_result = MagicMock()
+        update_result.mappings.return_value.one.return_value = {
+            "id": 7,
+            "user_id": 1,
+            "room_id": 5,
+            "date_from": date(2026, 5, 1),
+            "date_to": date(2026, 5, 6),
+            "price": 1000,
+            "hotel_id": 10,
+        }
+        session.execute.side_effect = [reserve_result, update_result]
+
+        repo = self._make_repo(session)
+        booking = Booking(
+            id=7,
             user_id=1,
             room_id=5,
             date_from=date(2026, 5, 1),
             date_to=date(2026, 5, 5),
             price=1000,
         )
-        with pytest.raises(AllRoomsAreBookedException):
-            await repo.add_booking(data, hotel_id=1)
+        updated, hotel_id = await repo.change_dates(booking, date(2026, 5, 1), date(2026, 5, 6))
+
+        assert (updated.id, updated.date_to, hotel_id) == (7, date(2026, 5, 6), 10)
+        assert session.execute.call_count == 2
+        reserve_params = (
+            session.execute.call_args_list[0]
+            .args[0]
+            .compile(dialect=postgresql.dialect())
+            .params.values()
+        )
+        assert date(2026, 5, 5) in reserve_params
+        assert date(2026, 5, 1) not in reserve_params
+        update_sql = str(
+            session.execute.call_args_list[1].args[0].compile(dialect=postgresql.dialect())
+        )
+        assert "UPDATE bookings" in update_sql
 
-    async def test_add_booking_success(self):
-        from src.schemas.bookings import BookingAdd
+    async def test_change_dates_shift_reserves_and_releases(self):
+        from src.schemas.bookings import Booking
 
         session = _make_session()
-        orm_room = _make_orm_room(id=5)
-        orm_booking = _make_orm_booking(id=100, room_id=5)
+        reserve_result = MagicMock()
+        reserve_result.all.return_value = [(date(2026, 5, 5),)]
+        update_result = MagicMock()
+        update_result.mappings.return_value.one.return_value = {
+            "id": 7,
+            "user_id": 1,
+            "room_id": 5,
+            "date_from": date(2026, 5, 2),
+            "date_to": date(2026, 5, 6),
+            "price": 1000,
+            "hotel_id": 10,
+        }
+        # upsert добавленной ночи, UPDATE room_inventory убранной, UPDATE bookings
+        session.execute.side_effect = [reserve_result, MagicMock(), update_result]
 
-        # Call 1: FOR UPDATE lock
-        lock_result = MagicMock()
-        lock_result.scalar_one_or_none.return_value = orm_room
-        # Call 2: available room IDs includes room_id=5
-        ids_result = _scalars_result([5])
-        # Call 3: INSERT booking (via BaseRepository.add)
-        insert_result = _scalars_result([orm_booking])
+        repo = self._make_repo(session)
+        booking = Booking(
+            id=7,
+            user_id=1,
+            room_id=5,
+            date_from=date(2026, 5, 1),
+            date_to=date(2026, 5, 5),
+            price=1000,
+        )
+        await repo.change_dates(booking, date(2026, 5, 2), date(2026, 5, 6))
+        assert session.execute.call_count == 3
 
-        session.execute.side_effect = [lock_result, ids_result, insert_result]
+    async def test_change_dates_unavailable(self):
+        from src.exceptions import AllRoomsAreBookedException
+        from src.schemas.bookings import Booking
+
+        session = _make_session()
+        reserve_result = MagicMock()
+        reserve_result.all.return_value = []
+        exists_result = MagicMock()
+        exists_result.scalar_one_or_none.return_value = 5
+        session.execute.side_effect = [reserve_result, exists_result]
 
         repo = self._make_repo(session)
-        data = BookingAdd(
+        booking = Booking(
+            id=7,
             user_id=1,
             room_id=5,
             date_from=date(2026, 5, 1),
             date_to=date(2026, 5, 5),
             price=1000,
         )
-        result = await repo.add_booking(data, hotel_id=1)
-        assert result.id == 100
+        with pytest.raises(AllRoomsAreBookedException):
+            await repo.change_dates(booking, date(2026, 5, 1), date(2026, 5, 8))
+
+    async def test_add_bookings_room_not_found(self):
+        from src.exceptions import RoomNotFoundException
+
+        session = _make_session()
+        existing = MagicMock()
+        existing.scalars.return_value.all.return_value = [5]
+        session.execute.return_value = existing
+
+        repo = self._make_repo(session)
+        stays = [(5, date(2026, 5, 1), date(2026, 5, 3)), (99, date(2026, 5, 1), date(2026, 5, 3))]
+        with pytest.raises(RoomNotFoundException):
+            await repo.add_bookings(1, stays)
+        assert session.execute.call_count == 1
+
+    async def test_add_bookings_not_all_nights_available(self):
+        from src.exceptions import AllRoomsAreBookedException
+
+        session = _make_session()
+        existing = MagicMock()
+        existing.scalars.return_value.all.return_value = [5, 6]
+        # 2 проживания по 2 ночи, занять удалось 3 из 4 (room_id, night)
+        reserve_result = MagicMock()
+        reserve_result.all.return_value = [
+            (5, date(2026, 5, 1)),
+            (5, date(2026, 5, 2)),
+            (6, date(2026, 5, 1)),
+        ]
+        session.execute.side_effect = [existing, reserve_result]
+
+        repo = self._make_repo(session)
+        stays = [(5, date(2026, 5, 1), date(2026, 5, 3)), (6, date(2026, 5, 1), date(2026, 5, 3))]
+        with pytest.raises(AllRoomsAreBookedException):
+            await repo.add_bookings(1, stays)
+        assert session.execute.call_count == 2
+
+    async def test_add_bookings_success(self):
+        from sqlalchemy.dialects import postgresql
+
+        session = _make_session()
+        existing = MagicMock()
+        existing.scalars.return_value.all.return_value = [5]
+        # Две единицы одного номера: потребность складывается по (room_id, night)
+        reserve_result = MagicMock()
+        reserve_result.all.return_value = [(5, date(2026, 5, 1)), (5, date(2026, 5, 2))]
+        rows = [
+            {
+                "id": i,
+                "user_id": 1,
+                "room_id": 5,
+                "date_from": date(2026, 5, 1),
+                "date_to": date(2026, 5, 3),
+                "price": 1000,
+                "hotel_id": 10,
+            }
+            for i in (1, 2)
+        ]
+        insert_result = MagicMock()
+        insert_result.mappings.return_value.all.return_value = rows
+        session.execute.side_effect = [existing, reserve_result, insert_result]
+
+        repo = self._make_repo(session)
+        stay = (5, date(2026, 5, 1), date(2026, 5, 3))
+        created = await repo.add_bookings(1, [stay, stay])
+
+        assert [(b.id, hotel_id) for b, hotel_id in created] == [(1, 10), (2, 10)]
+        reserve_sql = str(
+            session.execute.call_args_list[1].args[0].compile(dialect=postgresql.dialect())
+        )
+        assert "GROUP BY requested.room_id" in reserve_sql
+        assert "ORDER BY needed.room_id, needed.night" in reserve_sql
+
+    async def test_delete_releases_inventory_for_each_booking(self):
+        session = _make_session()
+        deleted = MagicMock()
+        deleted.all.return_value = [
+            (5, date(2026, 5, 1), date(2026, 5, 5)),
+            (6, date(2026, 5, 2), date(2026, 5, 3)),
+        ]
+        session.execute.side_effect = [deleted, MagicMock(), MagicMock()]
+
+        repo = self._make_repo(session)
+        await repo.delete(user_id=1)
+        # DELETE ... RETURNING + по одному UPDATE room_inventory на бронь
+        assert session.execute.call_count == 3
 
     async def test_get_today_checkins_with_emails(self):
         session = _make_session()
@@ -382,6 +614,130 @@ class TestBookingsRepository:
         assert rows[0]["email"] == "guest@test.com"
 
 
+# ─── BookingHoldsRepository ───────────────────────────────────────────────────
+
+
+def _make_orm_hold(id=1, user_id=1, room_id=5):
+    from datetime import datetime
+
+    m = MagicMock()
+    m.id = id
+    m.user_id = user_id
+    m.room_id = room_id
+    m.date_from = date(2026, 5, 1)
+    m.date_to = date(2026, 5, 5)
+    m.expires_at = datetime(2026, 4, 1, 12, 10)
+    return m
+
+
+class TestBookingHoldsRepository:
+    def _make_repo(self, session=None):
+        from src.repositories.booking_holds import BookingHoldsRepository
+
+        return BookingHoldsRepository(session=session or _make_session())
+
+    async def test_add_hold_no_rooms_available(self):
+        from src.exceptions import AllRoomsAreBookedException
+
+        session = _make_session()
+        reserve_result = MagicMock()
+        reserve_result.all.return_value = [(date(2026, 5, 1),)]
+        session.execute.return_value = reserve_result
+
+        repo = self._make_repo(session)
+        with pytest.raises(AllRoomsAreBookedException):
+            await repo.add_hold(1, 5, date(2026, 5, 1), date(2026, 5, 5), ttl_minutes=10)
+        assert session.execute.call_count == 1
+
+    async def test_add_hold_success(self):
+        from datetime import datetime
+
+        from sqlalchemy.dialects import postgresql
+
+        session = _make_session()
+        reserve_result = MagicMock()
+        reserve_result.all.return_value = [(date(2026, 5, d),) for d in range(1, 5)]
+        insert_result = MagicMock()
+        insert_result.mappings.return_value.one.return_value = {
+            "id": 3,
+            "user_id": 1,
+            "room_id": 5,
+            "date_from": date(2026, 5, 1),
+            "date_to": date(2026, 5, 5),
+            "expires_at": datetime(2026, 4, 1, 12, 10),
+            "created_at": datetime(2026, 4, 1, 12, 0),
+            "hotel_id": 10,
+        }
+        session.execute.side_effect = [reserve_result, insert_result]
+
+        repo = self._make_repo(session)
+        hold, hotel_id = await repo.add_hold(
+            1, 5, date(2026, 5, 1), date(2026, 5, 5), ttl_minutes=10
+        )
+        assert (hold.id, hotel_id) == (3, 10)
+        insert_sql = str(
+            session.execute.call_args_list[1].args[0].compile(dialect=postgresql.dialect())
+        )
+        assert "INSERT INTO booking_holds" in insert_sql
+        assert "timezone" in insert_sql
+
+    async def test_pop_active_returns_none_for_expired(self):
+        session = _make_session()
+        session.execute.return_value = _scalars_result([])
+
+        repo = self._make_repo(session)
+        assert await repo.pop_active(hold_id=1, user_id=1) is None
+        # Ночи не освобождаются: их заберёт бронь или уборщик истёкших холдов
+        assert session.execute.call_count == 1
+
+    async def test_pop_active_keeps_inventory(self):
+        session = _make_session()
+        session.execute.return_value = _scalars_result([_make_orm_hold()])
+
+        repo = self._make_repo(session)
+        hold = await repo.pop_active(hold_id=1, user_id=1)
+        assert hold.room_id == 5
+        assert session.execute.call_count == 1
+
+    async def test_cancel_releases_inventory(self):
+        session = _make_session()
+        session.execute.side_effect = [_scalars_result([_make_orm_hold()]), MagicMock()]
+
+        repo = self._make_repo(session)
+        hold = await repo.cancel(hold_id=1, user_id=1)
+        assert hold.id == 1
+        # DELETE ... RETURNING + UPDATE room_inventory
+        assert session.execute.call_count == 2
+
+    async def test_cancel_not_found(self):
+        session = _make_session()
+        session.execute.return_value = _scalars_result([])
+
+        repo = self._make_repo(session)
+        assert await repo.cancel(hold_id=1, user_id=1) is None
+        assert session.execute.call_count == 1
+
+    async def test_release_expired(self):
+        from sqlalchemy.dialects import postgresql
+
+        session = _make_session()
+        deleted = MagicMock()
+        deleted.all.return_value = [
+            (5, date(2026, 5, 1), date(2026, 5, 5), 1),
+            (6, date(2026, 5, 2), date(2026, 5, 3), 1),
+        ]
+        session.execute.side_effect = [deleted, MagicMock(), MagicMock()]
+
+        repo = self._make_repo(session)
+        assert await repo.release_expired() == [1, 1]
+        assert session.execute.call_count == 3
+        delete_sql = str(
+            session.execute.call_args_list[0].args[0].compile(dialect=postgresql.dialect())
+        )
+        assert "FOR UPDATE SKIP LOCKED" in delete_sql
+        assert "RETURNING" in delete_sql and "JOIN rooms" in delete_sql
+
+
 # ─── HotelsRepository ─────────────────────────────────────────────────────────
 
 
@@ -401,12 +757,10 @@ class TestHotelsRepository:
 
     async def test_get_filtered_by_time_with_hotels_no_images(self):
         session = _make_session()
-        orm_hotel = _make_orm_hotel(id=1)
-        # Call 1: hotels query, Call 2: cover image query (returns empty)
-        hotels_result = _scalars_result([orm_hotel])
-        covers_result = MagicMock()
-        covers_result.all.return_value = []
-        session.execute.side_effect = [hotels_result, covers_result]
+        row = _make_orm_hotel(id=1)  # строка страницы: колонки отеля + cover_image_url
+        result_mock = MagicMock()
+        result_mock.all.return_value = [row]
+        session.execute.return_value = result_mock
 
         repo = self._make_repo(session)
         result = await repo.get_filtered_by_time(date_from=None, date_to=None)
@@ -414,16 +768,39 @@ class TestHotelsRepository:
         assert result[0].cover_image_url is None
 
     async def test_get_filtered_by_time_with_cover_image(self):
+        from sqlalchemy.dialects import postgresql
+
         session = _make_session()
-        orm_hotel = _make_orm_hotel(id=1)
-        hotels_result = _scalars_result([orm_hotel])
-        covers_result = MagicMock()
-        covers_result.all.return_value = [(1, "photo.jpg")]
-        session.execute.side_effect = [hotels_result, covers_result]
+        row = _make_orm_hotel(id=1)
+        row.cover_image_url = "/static/images/photo.jpg"
+        row.min_price = 3500
+        result_mock = MagicMock()
+        result_mock.all.return_value = [row]
+        session.execute.return_value = result_mock
 
         repo = self._make_repo(session)
         result = await repo.get_filtered_by_time(date_from=None, date_to=None)
         assert result[0].cover_image_url == "/static/images/photo.jpg"
+        assert result[0].min_price == 3500
+        # Обложка и цена «от» — из hotel_summary в том же запросе
+        session.execute.assert_called_once()
+        sql = str(session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "hotel_summary.cover_image_url, hotel_summary.min_price" in sql
+        assert "LEFT OUTER JOIN hotel_summary ON hotel_summary.hotel_id = hotels.id" in sql
+        assert "hotel_images" not in sql
+
+    async def test_get_filtered_by_time_window_total(self):
+        session = _make_session()
+        row = _make_orm_hotel(id=1)
+        row.total = 31
+        result_mock = MagicMock()
+        result_mock.all.return_value = [row]
+        session.execute.return_value = result_mock
+
+        repo = self._make_repo(session)
+        hotels, total = await repo.get_filtered_by_time(None, None, limit=1, with_total=True)
+        assert [h.id for h in hotels] == [1]
+        assert total == 31
 
     async def test_count_filtered_by_time(self):
         session = _make_session()
@@ -446,16 +823,6 @@ class TestHotelsRepository:
         assert result["locations"] == ["Moscow", "Москва"]
         assert result["hotels"][0]["title"] == "Grand Hotel"
 
-    async def test_get_popular_locations(self):
-        session = _make_session()
-        result_mock = MagicMock()
-        result_mock.all.return_value = [("Moscow",), ("SPB",), ("Kazan",)]
-        session.execute.return_value = result_mock
-
-        repo = self._make_repo(session)
-        result = await repo.get_popular_locations(limit=3)
-        assert result == ["Moscow", "SPB", "Kazan"]
-
     async def test_get_filtered_by_time_with_city_filter(self):
         session = _make_session()
         session.execute.return_value = _scalars_result([])
@@ -473,6 +840,390 @@ class TestHotelsRepository:
         result = await repo.get_filtered_by_time(date_from=None, date_to=None, search="grand")
         assert result == []
 
+    async def test_search_trigram_uses_indexed_expressions(self):
+        from sqlalchemy.dialects import postgresql
+
+        session = _make_session()
+        session.execute.return_value = _scalars_result([])
+
+        repo = self._make_repo(session)
+        with patch("src.repositories.hotels.settings") as settings:
+            settings.HOTEL_SEARCH_MODE = "trigram"
+            settings.HOTEL_SEARCH_SIMILARITY_THRESHOLD = 0.4
+            await repo.get_filtered_by_time(
+                date_from=None, date_to=None, search=" Москв ", sort_by="relevance"
+            )
+        threshold, page = (
+            str(
+                c.args[0].compile(
+                    dialect=postgresql.asyncpg.dialect(), compile_kwargs={"literal_binds": True}
+                )
+            )
+            for c in session.execute.call_args_list
+        )
+        assert "set_config('pg_trgm.word_similarity_threshold', '0.4', true)" in threshold
+        assert "'москв' <% lower(hotels.city)" in page
+        assert "lower(hotels.title) LIKE '%' || 'москв' || '%'" in page
+        assert "strpos" not in page
+        assert "ORDER BY greatest(word_similarity('москв', lower(hotels.title))" in page
+
+    async def test_search_fts_ranks_by_ts_rank(self):
+        from sqlalchemy.dialects import postgresql
+
+        session = _make_session()
+        session.execute.return_value = _scalars_result([])
+
+        repo = self._make_repo(session)
+        with patch("src.repositories.hotels.settings") as settings:
+            settings.HOTEL_SEARCH_MODE = "fts"
+            await repo.get_filtered_by_time(
+                date_from=None, date_to=None, search="в Москве", sort_by="relevance"
+            )
+        session.execute.assert_called_once()  # порог pg_trgm не нужен
+        sql = str(
+            session.execute.call_args.args[0].compile(
+                dialect=postgresql.asyncpg.dialect(), compile_kwargs={"literal_binds": True}
+            )
+        )
+        tsquery = "websearch_to_tsquery('russian'::regconfig, 'в москве')"
+        assert f"hotels.search_vector @@ {tsquery}" in sql
+        assert f"ORDER BY ts_rank(hotels.search_vector, {tsquery}) DESC, hotels.id" in sql
+        assert "hotels.search_vector," not in sql.split("FROM")[0]
+
+    async def test_es_ids_replace_text_filters(self):
+        from sqlalchemy.dialects import postgresql
+
+        session = _make_session()
+        session.execute.return_value = _scalars_result([])
+
+        repo = self._make_repo(session)
+        await repo.get_filtered_by_time(
+            date_from=None, date_to=None, search="ignored", ids=[7, 3], sort_by="relevance"
+        )
+        session.execute.assert_called_once()
+        sql = str(
+            session.execute.call_args.args[0].compile(
+                dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+            )
+        )
+        assert "hotels.id = any(ARRAY[7, 3])" in sql
+        assert "search_vector" not in sql
+        assert "ORDER BY array_position(ARRAY[7, 3], hotels.id)" in sql
+
+    async def test_price_and_capacity_filters_use_summary(self):
+        from sqlalchemy.dialects import postgresql
+
+        session = _make_session()
+        session.execute.return_value = _scalars_result([])
+
+        repo = self._make_repo(session)
+        await repo.get_filtered_by_time(
+            None,
+            None,
+            sort_by="min_price",
+            order="desc",
+            after=[4000, 12],
+            price_min=0,
+            price_max=5000,
+            capacity=3,
+        )
+        sql = str(
+            session.execute.call_args.args[0].compile(
+                dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+            )
+        )
+        assert "hotel_summary.min_price >= 0" in sql
+        assert "hotel_summary.min_price <= 5000" in sql
+        assert "hotel_summary.max_capacity >= 3" in sql
+        assert "(hotel_summary.min_price, hotels.id) < (4000, 12)" in sql
+        assert "ORDER BY hotel_summary.min_price DESC, hotels.id DESC" in sql
+
+    async def test_near_filters_by_radius_and_sorts_by_distance(self):
+        from sqlalchemy.dialects import postgresql
+
+        session = _make_session()
+        session.execute.return_value = _scalars_result([])
+
+        repo = self._make_repo(session)
+        await repo.get_filtered_by_time(
+            None,
+            None,
+            sort_by="distance_km",
+            after=[1.5, 4],
+            near=(55.75, 37.62),
+            radius_km=10,
+        )
+        sql = str(
+            session.execute.call_args.args[0].compile(
+                dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+            )
+        )
+        earth = "ll_to_earth(hotels.latitude, hotels.longitude)"
+        distance = f"earth_distance(ll_to_earth(55.75, 37.62), {earth})"
+        assert f"earth_box(ll_to_earth(55.75, 37.62), 10000) @> {earth}" in sql
+        assert f"{distance} <= 10000" in sql
+        assert "AS distance_km" in sql
+        assert f"ORDER BY {distance} / CAST(1000.0 AS FLOAT) ASC, hotels.id ASC" in sql
+
+    async def test_get_facets_grouping_sets(self):
+        from sqlalchemy.dialects import postgresql
+
+        facets_by = ("city", "capacity", "price", "facility")
+
+        def row(by, **values):
+            fields = dict.fromkeys(
+                ("city", "capacity_band", "price_band", "facility_id", "facility_title")
+            )
+            grouping = {f"by_{name}": int(name != by) for name in facets_by}
+            return MagicMock(**grouping, **{**fields, **values})
+
+        session = _make_session()
+        result = MagicMock()
+        result.all.return_value = [
+            row("city", city="Сочи", hotels=2),
+            row("city", city="Казань", hotels=3),
+            row("capacity", capacity_band=3, hotels=4),
+            row("capacity", capacity_band=None, hotels=1),
+            row("price", price_band=1, hotels=4),
+            row("facility", facility_id=7, facility_title="Wi-Fi", hotels=2),
+            row("facility", facility_id=None, hotels=3),
+            row(None, hotels=5),
+        ]
+        session.execute.return_value = result
+
+        repo = self._make_repo(session)
+        facets = await repo.get_facets(None, None, ids=[1, 2, 3, 4, 5])
+        assert facets.total == 5
+        assert [(c.value, c.count) for c in facets.cities] == [("Казань", 3), ("Сочи", 2)]
+        assert [(b.min, b.max, b.count) for b in facets.capacity] == [
+            (1, 1, 0),
+            (2, 2, 0),
+            (3, 4, 4),
+            (5, None, 0),
+        ]
+        assert facets.price[0].count == 4 and facets.price[-1].max is None
+        assert [(f.id, f.title, f.count) for f in facets.facilities] == [(7, "Wi-Fi", 2)]
+
+        sql = str(
+            session.execute.call_args.args[0].compile(
+                dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+            )
+        )
+        assert "LEFT OUTER JOIN LATERAL unnest(hotel_summary.facility_ids)" in sql
+        assert "count(DISTINCT hotels.id) AS hotels" in sql
+        assert "GROUP BY GROUPING SETS((hotels.city), (width_bucket(" in sql
+        assert "(hotel_facility.facility_id, facilities.title), ())" in sql
+
+    async def test_facilities_filter_uses_room_containment(self):
+        from sqlalchemy.dialects import postgresql
+
+        session = _make_session()
+        session.execute.return_value = _scalars_result([])
+
+        repo = self._make_repo(session)
+        engine = MagicMock()
+        with patch("src.repositories.hotels.get_availability_engine", return_value=engine):
+            await repo.get_filtered_by_time(
+                date(2026, 5, 1), date(2026, 5, 10), facility_ids=[1, 4]
+            )
+        sql = str(
+            session.execute.call_args.args[0].compile(
+                dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+            )
+        )
+        # Свободный номер и удобства проверяются на одном номере — движок не используется
+        engine.available_hotel_ids.assert_not_called()
+        assert "rooms.quantity > coalesce(" in sql
+        assert "rooms.facility_ids @> ARRAY[1, 4]" in sql
+
+    async def test_engine_hotel_ids_bound_as_one_array(self):
+        from sqlalchemy.dialects import postgresql
+
+        session = _make_session()
+        session.execute.return_value = _scalars_result([])
+
+        repo = self._make_repo(session)
+        engine = MagicMock()
+        engine.available_hotel_ids.return_value = list(range(1, 40001))
+        with patch("src.repositories.hotels.get_availability_engine", return_value=engine):
+            await repo.get_filtered_by_time(date(2026, 5, 1), date(2026, 5, 10))
+        compiled = session.execute.call_args.args[0].compile(dialect=postgresql.dialect())
+        # 40 000 id — один параметр, а не 40 000 (лимит asyncpg — 32767)
+        assert "hotels.id = any(%(param_1)s::INTEGER[])" in str(compiled)
+        assert compiled.params["param_1"] == list(range(1, 40001))
+
+    async def test_facilities_filter_without_dates(self):
+        from sqlalchemy.dialects import postgresql
+
+        session = _make_session()
+        session.execute.return_value = _scalars_result([])
+
+        repo = self._make_repo(session)
+        await repo.get_filtered_by_time(None, None, facility_ids=[3])
+        sql = str(
+            session.execute.call_args.args[0].compile(
+                dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+            )
+        )
+        assert "hotels.id IN (SELECT rooms.hotel_id" in sql
+        assert "WHERE (rooms.facility_ids @> ARRAY[3]))" in sql
+
+    async def test_get_without_coordinates(self):
+        from sqlalchemy.dialects import postgresql
+
+        session = _make_session()
+        session.execute.return_value = _scalars_result([_make_orm_hotel(id=5)])
+
+        repo = self._make_repo(session)
+        result = await repo.get_without_coordinates(limit=50, after_id=4)
+        assert [h.id for h in result] == [5]
+        sql = str(
+            session.execute.call_args.args[0].compile(
+                dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+            )
+        )
+        assert "hotels.latitude IS NULL AND hotels.id > 4" in sql
+        assert "LIMIT 50" in sql
+
+    async def test_search_substring_mode_skips_threshold(self):
+        session = _make_session()
+        session.execute.return_value = _scalar_result(2)
+
+        repo = self._make_repo(session)
+        with patch("src.repositories.hotels.settings") as settings:
+            settings.HOTEL_SEARCH_MODE = "substring"
+            assert await repo.count_filtered_by_time(None, None, search="grand") == 2
+        session.execute.assert_called_once()
+        assert "strpos" in str(session.execute.call_args.args[0])
+
+
+# ─── HotelSummaryRepository ───────────────────────────────────────────────────
+
+
+class TestHotelSummaryRepository:
+    def _make_repo(self, session=None):
+        from src.repositories.hotel_summary import HotelSummaryRepository
+
+        return HotelSummaryRepository(session=session or _make_session())
+
+    @staticmethod
+    def _sql(call) -> str:
+        from sqlalchemy.dialects import postgresql
+
+        return str(
+            call.args[0].compile(
+                dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+            )
+        )
+
+    async def test_refresh_locks_hotel_then_upserts(self):
+        session = _make_session()
+        repo = self._make_repo(session)
+
+        await repo.refresh(5)
+        lock, upsert = (self._sql(c) for c in session.execute.call_args_list)
+        assert "WHERE hotels.id = 5 FOR NO KEY UPDATE" in lock
+        assert upsert.startswith("INSERT INTO hotel_summary")
+        assert "min(rooms.price)" in upsert
+        assert "max(rooms.capacity)" in upsert
+        assert "array_agg(DISTINCT rooms_facilities.facility_id)" in upsert
+        assert "WHERE hotels.id = 5 GROUP BY hotels.id" in upsert
+        assert "ON CONFLICT (hotel_id) DO UPDATE SET min_price = excluded.min_price" in upsert
+
+    async def test_refresh_all_without_lock(self):
+        session = _make_session()
+        repo = self._make_repo(session)
+
+        await repo.refresh()
+        session.execute.assert_called_once()
+        sql = self._sql(session.execute.call_args)
+        assert "FROM hotels LEFT OUTER JOIN rooms ON rooms.hotel_id = hotels.id GROUP BY" in sql
+
+    async def test_refresh_with_facility(self):
+        session = _make_session()
+        repo = self._make_repo(session)
+
+        await repo.refresh_with_facility(4)
+        sql = self._sql(session.execute.call_args)
+        assert "hotel_summary.facility_ids @> ARRAY[4]" in sql
+
+    async def test_rooms_count(self):
+        session = _make_session()
+        result = MagicMock()
+        result.scalar_one_or_none.return_value = 3
+        session.execute.return_value = result
+
+        repo = self._make_repo(session)
+        assert await repo.rooms_count(1) == 3
+
+
+# ─── PopularLocationsRepository ───────────────────────────────────────────────
+
+
+class TestPopularLocationsRepository:
+    def _make_repo(self, session=None):
+        from src.repositories.popular_locations import PopularLocationsRepository
+
+        return PopularLocationsRepository(session=session or _make_session())
+
+    @staticmethod
+    def _sql(call) -> str:
+        from sqlalchemy.dialects import postgresql
+
+        return str(
+            call.args[0].compile(
+                dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+            )
+        )
+
+    async def test_get_top_reads_ranked_rows(self):
+        session = _make_session()
+        session.execute.return_value = _scalars_result(["Сочи", "Москва"])
+
+        repo = self._make_repo(session)
+        assert await repo.get_top(limit=2) == ["Сочи", "Москва"]
+        sql = self._sql(session.execute.call_args)
+        assert (
+            "ORDER BY popular_locations.bookings_count DESC, "
+            "popular_locations.hotels_count DESC, popular_locations.city" in sql
+        )
+        assert "LIMIT 2" in sql
+        assert "hotels" not in sql.replace("hotels_count", "")
+
+    async def test_rebuild_weights_by_recent_bookings(self):
+        session = _make_session()
+        insert_result = MagicMock(rowcount=4)
+        session.execute.side_effect = [MagicMock(), insert_result]
+
+        repo = self._make_repo(session)
+        with patch("src.repositories.popular_locations.date") as mock_date:
+            mock_date.today.return_value = date(2026, 10, 18)
+            assert await repo.rebuild(bookings_days=30) == 4
+        delete_sql, insert_sql = (self._sql(c) for c in session.execute.call_args_list)
+        assert delete_sql == "DELETE FROM popular_locations"
+        assert "bookings.date_from >= '2026-09-18'" in insert_sql
+        assert "coalesce(bookings.bookings_count, 0)" in insert_sql
+
+    async def test_adjust_hotels_increment(self):
+        session = _make_session()
+        repo = self._make_repo(session)
+
+        await repo.adjust_hotels("Сочи", 1)
+        session.execute.assert_called_once()
+        sql = self._sql(session.execute.call_args)
+        assert (
+            "ON CONFLICT (city) DO UPDATE SET hotels_count = (popular_locations.hotels_count + 1)"
+            in sql
+        )
+
+    async def test_adjust_hotels_decrement_drops_empty_city(self):
+        session = _make_session()
+        repo = self._make_repo(session)
+
+        await repo.adjust_hotels("Сочи", -1)
+        _, cleanup = (self._sql(c) for c in session.execute.call_args_list)
+        assert "popular_locations.hotels_count <= 0" in cleanup
+
 
 # ─── FacilitiesRepository / RoomsFacilitiesRepository ─────────────────────────
 
@@ -511,6 +1262,61 @@ class TestFacilitiesRepository:
         result = await repo.get_paginated(limit=10, offset=0)
         assert result == []
 
+    async def test_get_paginated_with_window_total(self):
+        from sqlalchemy.dialects import postgresql
+
+        from src.models.facilities import FacilitiesOrm
+
+        session = _make_session()
+        orm_f = MagicMock(spec=FacilitiesOrm)
+        orm_f.id = 1
+        orm_f.title = "WiFi"
+        result = MagicMock()
+        result.all.return_value = [(orm_f, 42)]
+        session.execute.return_value = result
+
+        repo = self._make_repo(session)
+        items, total = await repo.get_paginated(limit=10, offset=0, with_total=True)
+        assert [f.title for f in items] == ["WiFi"]
+        assert total == 42
+        sql = str(session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "count(*) OVER ()" in sql
+
+    async def test_count_capped_limits_subquery(self):
+        from sqlalchemy.dialects import postgresql
+
+        session = _make_session()
+        session.execute.return_value = _scalar_result(1001)
+
+        repo = self._make_repo(session)
+        assert await repo.count(strategy="capped") == 1001
+        sql = str(
+            session.execute.call_args.args[0].compile(
+                dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+            )
+        )
+        assert "LIMIT 1001" in sql
+
+    async def test_count_estimate_uses_planner_rows(self):
+        session = _make_session()
+        conn = session.connection.return_value
+        conn.exec_driver_sql.return_value = _scalar_result('[{"Plan": {"Plan Rows": 250000}}]')
+
+        repo = self._make_repo(session)
+        assert await repo.count(strategy="estimate") == 250000
+        session.execute.assert_not_called()
+        sql = conn.exec_driver_sql.call_args.args[0]
+        assert sql.startswith("EXPLAIN (FORMAT JSON) SELECT facilities.id")
+
+    async def test_count_estimate_small_falls_back_to_exact(self):
+        session = _make_session()
+        conn = session.connection.return_value
+        conn.exec_driver_sql.return_value = _scalar_result([{"Plan": {"Plan Rows": 12}}])
+        session.execute.return_value = _scalar_result(9)
+
+        repo = self._make_repo(session)
+        assert await repo.count(strategy="estimate") == 9
+
 
 class TestRoomsFacilitiesRepository:
     def _make_repo(self, session=None):
@@ -523,12 +1329,15 @@ class TestRoomsFacilitiesRepository:
         session = _make_session()
         # Current facilities: [1, 2] → new: [2, 3] → delete [1], insert [3]
         existing = _scalars_result([1, 2])
-        session.execute.side_effect = [existing, MagicMock(), MagicMock()]
+        session.execute.side_effect = [existing, MagicMock(), MagicMock(), MagicMock()]
 
         repo = self._make_repo(session)
-        await repo.set_room_facilities(room_id=5, facilities_ids=[2, 3])
-        # Should have 3 executes: SELECT + DELETE + INSERT
-        assert session.execute.call_count == 3
+        await repo.set_room_facilities(room_id=5, facilities_ids=[3, 2])
+        # SELECT + DELETE + INSERT + UPDATE rooms.facility_ids
+        assert session.execute.call_count == 4
+        sync = session.execute.call_args.args[0]
+        assert sync.table.name == "rooms"
+        assert sync.compile().params["facility_ids"] == [2, 3]
 
     async def test_set_room_facilities_no_changes(self):
         """Same IDs → no delete/insert."""
@@ -544,11 +1353,126 @@ class TestRoomsFacilitiesRepository:
         """Pass [] → delete all existing, insert nothing."""
         session = _make_session()
         existing = _scalars_result([1, 2])
-        session.execute.side_effect = [existing, MagicMock()]
+        session.execute.side_effect = [existing, MagicMock(), MagicMock()]
 
         repo = self._make_repo(session)
         await repo.set_room_facilities(room_id=5, facilities_ids=[])
-        assert session.execute.call_count == 2  # SELECT + DELETE
+        assert session.execute.call_count == 3  # SELECT + DELETE + UPDATE
+        assert session.execute.call_args.args[0].compile().params["facility_ids"] == []
+
+    async def test_remove_facility_from_rooms(self):
+        from sqlalchemy.dialects import postgresql
+
+        session = _make_session()
+        session.execute.return_value = MagicMock(all=MagicMock(return_value=[(3, 1)]))
+        repo = self._make_repo(session)
+        assert await repo.remove_facility(7) == [(3, 1)]
+        sql = str(
+            session.execute.call_args.args[0].compile(
+                dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+            )
+        )
+        assert "SET facility_ids=array_remove(rooms.facility_ids, 7)" in sql
+        assert "WHERE rooms.facility_ids @> ARRAY[7] RETURNING rooms.id, rooms.hotel_id" in sql
+
+
+# ─── RoomInventoryRepository ──────────────────────────────────────────────────
+
+
+class TestRoomInventoryRepository:
+    def _make_repo(self, session=None):
+        from src.repositories.room_inventory import RoomInventoryRepository
+
+        return RoomInventoryRepository(session=session or _make_session())
+
+    def test_stay_nights_excludes_checkout_day(self):
+        from src.repositories.utils import stay_nights
+
+        assert stay_nights(date(2026, 5, 1), date(2026, 5, 4)) == [
+            date(2026, 5, 1),
+            date(2026, 5, 2),
+            date(2026, 5, 3),
+        ]
+        assert stay_nights(date(2026, 5, 1), date(2026, 5, 1)) == []
+
+    def test_uncovered_ranges(self):
+        from src.repositories.utils import uncovered_ranges
+
+        d = lambda day: date(2026, 5, day)  # noqa: E731
+        # Продление с обеих сторон — два куска
+        assert uncovered_ranges(d(1), d(10), d(3), d(5)) == [(d(1), d(3)), (d(5), d(10))]
+        # Сдвиг на день
+        assert uncovered_ranges(d(2), d(6), d(1), d(5)) == [(d(5), d(6))]
+        # Сокращение — добавлять нечего
+        assert uncovered_ranges(d(1), d(3), d(1), d(5)) == []
+        # Без пересечения — весь период
+        assert uncovered_ranges(d(10), d(12), d(1), d(5)) == [(d(10), d(12))]
+
+    async def test_reserve_single_upsert_for_all_nights(self):
+        from sqlalchemy.dialects import postgresql
+
+        session = _make_session()
+        repo = self._make_repo(session)
+        await repo.reserve(room_id=5, date_from=date(2026, 5, 1), date_to=date(2026, 5, 4))
+
+        session.execute.assert_called_once()
+        sql = str(session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (room_id, night) DO UPDATE" in sql
+
+    async def test_reserve_empty_stay_is_noop(self):
+        session = _make_session()
+        repo = self._make_repo(session)
+        await repo.reserve(room_id=5, date_from=date(2026, 5, 1), date_to=date(2026, 5, 1))
+        session.execute.assert_not_called()
+
+    async def test_release(self):
+        session = _make_session()
+        repo = self._make_repo(session)
+        await repo.release(room_id=5, date_from=date(2026, 5, 1), date_to=date(2026, 5, 4))
+        session.execute.assert_called_once()
+
+    async def test_rebuild_returns_rowcount(self):
+        session = _make_session()
+        insert_result = MagicMock(rowcount=12)
+        session.execute.side_effect = [MagicMock(), insert_result]
+
+        repo = self._make_repo(session)
+        assert await repo.rebuild() == 12
+        assert session.execute.call_count == 2  # DELETE + INSERT ... SELECT
+
+    async def test_find_mismatches(self):
+        session = _make_session()
+        row = {"room_id": 5, "night": date(2026, 5, 1), "expected": 2, "actual": 1}
+        result_mock = MagicMock()
+        result_mock.mappings.return_value.all.return_value = [row]
+        session.execute.return_value = result_mock
+
+        repo = self._make_repo(session)
+        assert await repo.find_mismatches() == [row]
+
+    async def test_find_mismatches_window_uses_stay_overlap(self):
+        from sqlalchemy.dialects import postgresql
+
+        session = _make_session()
+        result_mock = MagicMock()
+        result_mock.mappings.return_value.all.return_value = []
+        session.execute.return_value = result_mock
+
+        repo = self._make_repo(session)
+        await repo.find_mismatches(date_from=date(2026, 5, 1), date_to=date(2026, 6, 1))
+        sql = str(session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "bookings.stay && daterange(" in sql
+        assert "room_inventory.night >=" in sql
+
+    def test_rooms_ids_for_booking_uses_inventory(self):
+        from sqlalchemy.dialects import postgresql
+
+        from src.repositories.utils import rooms_ids_for_booking
+
+        query = rooms_ids_for_booking(date(2026, 5, 1), date(2026, 5, 4), hotel_id=1, guests=2)
+        sql = str(query.compile(dialect=postgresql.dialect()))
+        assert "room_inventory" in sql
+        assert "bookings" not in sql
 
 
 # ─── RoomsRepository ──────────────────────────────────────────────────────────
@@ -606,6 +1530,41 @@ class TestRoomsRepository:
         )
         assert count == 2
 
+    async def test_engine_room_ids_bound_as_one_array(self):
+        from sqlalchemy.dialects import postgresql
+
+        session = _make_session()
+        session.execute.return_value = _scalars_result([])
+
+        repo = self._make_repo(session)
+        engine = MagicMock()
+        engine.available_room_ids.return_value = list(range(1, 40001))
+        with patch("src.repositories.rooms.get_availability_engine", return_value=engine):
+            await repo.get_filtered_by_time(
+                hotel_id=1, date_from=date(2026, 5, 1), date_to=date(2026, 5, 10)
+            )
+        compiled = session.execute.call_args.args[0].compile(dialect=postgresql.dialect())
+        assert "rooms.id = any(%(param_1)s::INTEGER[])" in str(compiled)
+        assert compiled.params["param_1"] == list(range(1, 40001))
+
+    async def test_get_filtered_by_time_with_facilities(self):
+        from sqlalchemy.dialects import postgresql
+
+        session = _make_session()
+        session.execute.return_value = _scalars_result([])
+
+        repo = self._make_repo(session)
+        await repo.get_filtered_by_time(
+            hotel_id=1, date_from=None, date_to=None, facility_ids=[1, 4, 7]
+        )
+        sql = str(
+            session.execute.call_args.args[0].compile(
+                dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+            )
+        )
+        assert "rooms.facility_ids @> ARRAY[1, 4, 7]" in sql
+        assert "rooms_facilities" not in sql.split("FROM", 1)[1]
+
     async def test_get_by_fields_found(self):
         session = _make_session()
         orm_room = _make_orm_room(id=3)
@@ -630,3 +1589,22 @@ class TestRoomsRepository:
             hotel_id=1, title="Nope", description=None, price=999, quantity=1
         )
         assert result is None
+
+    async def test_get_calendar_single_query(self):
+        from sqlalchemy.dialects import postgresql
+
+        session = _make_session()
+        row = {"room_id": 1, "night": date(2026, 5, 1), "available": 2, "price": 1000}
+        result_mock = MagicMock()
+        result_mock.mappings.return_value.all.return_value = [row]
+        session.execute.return_value = result_mock
+
+        repo = self._make_repo(session)
+        result = await repo.get_calendar(hotel_id=1, date_from=date(2026, 5, 1), days=60, room_id=1)
+
+        assert result == [row]
+        assert session.execute.call_count == 1
+        sql = str(session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "generate_series" in sql
+        assert "LEFT OUTER JOIN room_inventory" in sql
+        assert "bookings" not in sql
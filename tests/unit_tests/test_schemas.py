@@ -79,3 +79,36 @@ class TestUserSchema:
 
         u = UserWithHashedPassword.model_validate(orm, from_attributes=True)
         assert u.has_password is True
+
+
+class TestCursorPage:
+    def test_cursor_roundtrip(self):
+        from src.schemas.common import decode_cursor, encode_cursor
+
+        cursor = encode_cursor("title", "desc", ["Отель", 12])
+        assert decode_cursor(cursor, "title", "desc") == ["Отель", 12]
+        assert decode_cursor("", "title", "desc") is None
+
+    def test_cursor_for_other_sort_rejected(self):
+        from src.schemas.common import decode_cursor, encode_cursor
+
+        cursor = encode_cursor("title", "asc", ["A", 1])
+        with pytest.raises(ValueError):
+            decode_cursor(cursor, "city", "asc")
+        with pytest.raises(ValueError):
+            decode_cursor("%%%", "title", "asc")
+
+    def test_from_rows_sets_next_cursor_only_when_more_rows(self):
+        from types import SimpleNamespace
+
+        from src.schemas.common import CursorPage, decode_cursor
+
+        rows = [SimpleNamespace(id=i, date_from=date(2027, 1, i)) for i in range(1, 4)]
+        page = CursorPage.from_rows(rows, 2, "date_from", "desc")
+        assert len(page.items) == 2
+        assert page.has_next
+        assert decode_cursor(page.next_cursor, "date_from", "desc") == ["2027-01-02", 2]
+
+        last = CursorPage.from_rows(rows, 3)
+        assert last.next_cursor is None
+        assert not last.has_next
@@ -6,6 +6,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 
 from src.exceptions import (
+    AllRoomsAreBookedException,
     CannotDeleteHotelWithRoomsException,
     CannotDeleteRoomWithBookingsException,
     CorruptedImageException,
@@ -33,6 +34,11 @@ def _make_db(**overrides):
     db.facilities = AsyncMock()
     db.rooms_facilities = AsyncMock()
     db.hotel_images = AsyncMock()
+    db.room_inventory = AsyncMock()
+    db.booking_holds = AsyncMock()
+    db.hotel_summary = AsyncMock()
+    db.hotel_summary.rooms_count.return_value = None
+    db.popular_locations = AsyncMock()
     db.commit = AsyncMock()
     for k, v in overrides.items():
         setattr(db, k, v)
@@ -50,33 +56,223 @@ class TestBookingService:
 
     async def test_add_booking_room_not_found(self):
         db = _make_db()
-        db.rooms.get_one.side_effect = ObjectNotFoundException()
+        db.bookings.add_booking.side_effect = RoomNotFoundException()
         svc = self._make_service(db)
 
         from src.schemas.bookings import BookingAddRequest
 
-        data = BookingAddRequest(room_id=999, date_from=date(2026, 5, 1), date_to=date(2026, 5, 5))
+        data = BookingAddRequest(room_id=999, date_from=date(2027, 5, 1), date_to=date(2027, 5, 5))
         with pytest.raises(RoomNotFoundException):
             await svc.add_booking(user_id=1, booking_data=data)
+        db.commit.assert_not_called()
 
     async def test_add_booking_success(self):
         db = _make_db()
-        mock_room = MagicMock(id=1, hotel_id=10, price=5000)
-        mock_hotel = MagicMock(id=10)
         mock_booking = MagicMock(id=100)
-        db.rooms.get_one.return_value = mock_room
-        db.hotels.get_one.return_value = mock_hotel
-        db.bookings.add_booking.return_value = mock_booking
+        db.bookings.add_booking.return_value = (mock_booking, 10)
 
         svc = self._make_service(db)
 
         from src.schemas.bookings import BookingAddRequest
 
-        data = BookingAddRequest(room_id=1, date_from=date(2026, 5, 1), date_to=date(2026, 5, 5))
-        result = await svc.add_booking(user_id=1, booking_data=data)
+        data = BookingAddRequest(room_id=1, date_from=date(2027, 5, 1), date_to=date(2027, 5, 5))
+        with patch("src.services.bookings.invalidate_hotel_availability") as invalidate:
+            result = await svc.add_booking(user_id=1, booking_data=data)
         assert result is mock_booking
+        db.bookings.add_booking.assert_called_once_with(1, 1, date(2027, 5, 1), date(2027, 5, 5))
+        db.rooms.get_one.assert_not_called()
+        db.hotels.get_one.assert_not_called()
+        db.commit.assert_called_once()
+        invalidate.assert_awaited_once_with(10)
+
+    async def test_add_bookings_batch_single_commit(self):
+        from src.schemas.bookings import BookingBatchRequest
+
+        db = _make_db()
+        b1, b2, b3 = MagicMock(id=1), MagicMock(id=2), MagicMock(id=3)
+        db.bookings.add_bookings.return_value = [(b1, 10), (b2, 20), (b3, 10)]
+        svc = self._make_service(db)
+
+        data = BookingBatchRequest(
+            bookings=[
+                {"room_id": r, "date_from": date(2027, 5, 1), "date_to": date(2027, 5, 3)}
+                for r in (1, 2, 3)
+            ]
+        )
+        with patch("src.services.bookings.invalidate_hotel_availability") as invalidate:
+            result = await svc.add_bookings_batch(user_id=1, batch_data=data)
+
+        assert result == [b1, b2, b3]
+        db.commit.assert_called_once()
+        assert [c.args[0] for c in invalidate.await_args_list] == [10, 20]
+
+    async def test_add_bookings_batch_failure_does_not_commit(self):
+        from src.schemas.bookings import BookingBatchRequest
+
+        db = _make_db()
+        db.bookings.add_bookings.side_effect = AllRoomsAreBookedException()
+        svc = self._make_service(db)
+
+        data = BookingBatchRequest(
+            bookings=[{"room_id": 1, "date_from": date(2027, 5, 1), "date_to": date(2027, 5, 3)}]
+        )
+        with pytest.raises(AllRoomsAreBookedException):
+            await svc.add_bookings_batch(user_id=1, batch_data=data)
+        db.commit.assert_not_called()
+
+    async def test_apply_queued_batch_rejection_does_not_abort_batch(self):
+        db = _make_db()
+        db.savepoint = MagicMock()
+        db.savepoint.return_value.__aexit__.return_value = False
+        booking = MagicMock()
+        booking.model_dump.return_value = {"id": 100}
+        db.bookings.get_by_queue_tickets.return_value = {}
+        db.bookings.add_booking.side_effect = [(booking, 10), AllRoomsAreBookedException()]
+        svc = self._make_service(db)
+
+        entries = [
+            {"ticket": t, "user_id": u, "date_from": "2027-05-01", "date_to": "2027-05-03"}
+            for t, u in (("t1", 1), ("t2", 2))
+        ]
+        with patch("src.services.bookings.invalidate_hotel_availability") as invalidate:
+            results = await svc.apply_queued_batch(room_id=5, entries=entries)
+
+        assert results["t1"] == {"user_id": 1, "status": "confirmed", "booking": {"id": 100}}
+        assert results["t2"]["status"] == "rejected"
+        assert db.savepoint.call_count == 2
+        db.commit.assert_called_once()
+        invalidate.assert_awaited_once_with(10)
+        assert db.bookings.add_booking.call_args.kwargs == {"queue_ticket": "t2"}
+
+    async def test_apply_queued_batch_skips_already_applied_tickets(self):
+        db = _make_db()
+        db.savepoint = MagicMock()
+        booking = MagicMock()
+        booking.model_dump.return_value = {"id": 100}
+        # Пачку уже закоммитил прошлый consumer, но XDEL не дошёл — заявку прочитали повторно
+        db.bookings.get_by_queue_tickets.return_value = {"t1": booking}
+        svc = self._make_service(db)
+
+        entries = [
+            {"ticket": "t1", "user_id": 1, "date_from": "2027-05-01", "date_to": "2027-05-03"}
+        ]
+        with patch("src.services.bookings.invalidate_hotel_availability") as invalidate:
+            results = await svc.apply_queued_batch(room_id=5, entries=entries)
+
+        assert results["t1"] == {"user_id": 1, "status": "confirmed", "booking": {"id": 100}}
+        db.bookings.get_by_queue_tickets.assert_awaited_once_with(["t1"])
+        db.bookings.add_booking.assert_not_called()
+        invalidate.assert_not_awaited()
+
+    async def test_apply_queued_batch_rejects_poison_entry_and_continues(self):
+        db = _make_db()
+        db.savepoint = MagicMock()
+        db.savepoint.return_value.__aexit__.return_value = False
+        booking = MagicMock()
+        booking.model_dump.return_value = {"id": 100}
+        db.bookings.get_by_queue_tickets.return_value = {}
+        db.bookings.add_booking.return_value = (booking, 10)
+        svc = self._make_service(db)
+
+        entries = [
+            {"ticket": "t1", "user_id": 1, "date_from": "не дата", "date_to": "2027-05-03"},
+            {"ticket": "t2", "user_id": 2, "date_to": "2027-05-03"},
+            {"ticket": "t3", "user_id": 3, "date_from": "2027-05-01", "date_to": "2027-05-03"},
+        ]
+        with patch("src.services.bookings.invalidate_hotel_availability"):
+            results = await svc.apply_queued_batch(room_id=5, entries=entries)
+
+        assert results["t1"]["status"] == "rejected"
+        assert results["t2"]["status"] == "rejected"
+        assert results["t3"]["status"] == "confirmed"
+        db.commit.assert_called_once()
+
+    async def test_apply_queued_batch_duplicate_ticket_reports_existing_booking(self):
+        from sqlalchemy.exc import IntegrityError
+
+        db = _make_db()
+        db.savepoint = MagicMock()
+        db.savepoint.return_value.__aexit__.return_value = False
+        booking = MagicMock()
+        booking.model_dump.return_value = {"id": 100}
+        # Ту же заявку параллельно применил consumer, у которого истёк лок
+        db.bookings.get_by_queue_tickets.side_effect = [{}, {"t1": booking}]
+        db.bookings.add_booking.side_effect = IntegrityError("INSERT", {}, Exception("uq"))
+        svc = self._make_service(db)
+
+        entries = [
+            {"ticket": "t1", "user_id": 1, "date_from": "2027-05-01", "date_to": "2027-05-03"}
+        ]
+        with patch("src.services.bookings.invalidate_hotel_availability"):
+            results = await svc.apply_queued_batch(room_id=5, entries=entries)
+
+        assert results["t1"] == {"user_id": 1, "status": "confirmed", "booking": {"id": 100}}
+
+    async def test_add_hold_commits_and_invalidates(self):
+        from src.schemas.bookings import BookingAddRequest
+
+        db = _make_db()
+        hold = MagicMock(id=3)
+        db.booking_holds.add_hold.return_value = (hold, 10)
+        svc = self._make_service(db)
+
+        data = BookingAddRequest(room_id=1, date_from=date(2027, 5, 1), date_to=date(2027, 5, 5))
+        with patch("src.services.bookings.invalidate_hotel_availability") as invalidate:
+            assert await svc.add_hold(user_id=1, hold_data=data) is hold
+        db.booking_holds.add_hold.assert_called_once_with(
+            1, 1, date(2027, 5, 1), date(2027, 5, 5), ttl_minutes=10
+        )
+        db.commit.assert_called_once()
+        invalidate.assert_awaited_once_with(10)
+
+    async def test_confirm_hold_expired(self):
+        from src.exceptions import BookingHoldNotFoundException
+
+        db = _make_db()
+        db.booking_holds.pop_active.return_value = None
+        svc = self._make_service(db)
+
+        with pytest.raises(BookingHoldNotFoundException):
+            await svc.confirm_hold(user_id=1, hold_id=3)
+        db.bookings.add_reserved.assert_not_called()
+        db.commit.assert_not_called()
+
+    async def test_confirm_hold_reuses_reserved_nights(self):
+        db = _make_db()
+        db.booking_holds.pop_active.return_value = MagicMock(
+            room_id=5, date_from=date(2027, 5, 1), date_to=date(2027, 5, 5)
+        )
+        booking = MagicMock(id=100)
+        db.bookings.add_reserved.return_value = (booking, 10)
+        svc = self._make_service(db)
+
+        assert await svc.confirm_hold(user_id=1, hold_id=3) is booking
+        db.bookings.add_reserved.assert_called_once_with(1, 5, date(2027, 5, 1), date(2027, 5, 5))
+        db.bookings.add_booking.assert_not_called()
         db.commit.assert_called_once()
 
+    async def test_cancel_hold_not_found(self):
+        from src.exceptions import BookingHoldNotFoundException
+
+        db = _make_db()
+        db.booking_holds.cancel.return_value = None
+        svc = self._make_service(db)
+
+        with pytest.raises(BookingHoldNotFoundException):
+            await svc.cancel_hold(user_id=1, hold_id=3)
+        db.commit.assert_not_called()
+
+    async def test_cancel_hold_success(self):
+        db = _make_db()
+        db.booking_holds.cancel.return_value = MagicMock(room_id=5)
+        db.rooms.get_one.return_value = MagicMock(hotel_id=10)
+        svc = self._make_service(db)
+
+        with patch("src.services.bookings.invalidate_hotel_availability") as invalidate:
+            await svc.cancel_hold(user_id=1, hold_id=3)
+        db.commit.assert_called_once()
+        invalidate.assert_awaited_once_with(10)
+
     async def test_get_my_bookings(self):
         db = _make_db()
         db.bookings.count_by_user.return_value = 25
@@ -88,6 +284,21 @@ class TestBookingService:
         assert result.page == 2
         assert result.pages == 3
 
+    async def test_get_my_bookings_cursor(self):
+        from src.schemas.common import encode_cursor
+
+        db = _make_db()
+        db.bookings.get_paginated_by_user.return_value = [MagicMock(id=3)]
+        svc = self._make_service(db)
+
+        cursor = encode_cursor("date_from", "desc", ["2027-05-01", 7])
+        result = await svc.get_my_bookings(user_id=1, per_page=10, cursor=cursor)
+        db.bookings.count_by_user.assert_not_called()
+        db.bookings.get_paginated_by_user.assert_called_once_with(
+            user_id=1, limit=11, after=["2027-05-01", 7]
+        )
+        assert result.next_cursor is None
+
     async def test_get_booking_not_found(self):
         db = _make_db()
         db.bookings.get_one_or_none.return_value = None
@@ -115,7 +326,7 @@ class TestBookingService:
 
     async def test_patch_booking_not_found(self):
         db = _make_db()
-        db.bookings.get_one_or_none.return_value = None
+        db.bookings.get_for_update.return_value = None
         svc = self._make_service(db)
 
         from src.schemas.bookings import BookingPatchRequest
@@ -130,7 +341,7 @@ class TestBookingService:
         mock_booking = MagicMock(
             id=1, room_id=10, date_from=date(2027, 5, 1), date_to=date(2027, 5, 5)
         )
-        db.bookings.get_one_or_none.return_value = mock_booking
+        db.bookings.get_for_update.return_value = mock_booking
         svc = self._make_service(db)
 
         from src.schemas.bookings import BookingPatchRequest
@@ -188,11 +399,17 @@ class TestFacilityService:
     async def test_delete_success(self):
         db = _make_db()
         db.facilities.get_one.return_value = MagicMock(id=1)
+        db.rooms_facilities.remove_facility.return_value = [(3, 1), (4, 1)]
         svc = self._make_service(db)
 
-        await svc.facility_delete(1)
+        with patch("src.services.facilities.invalidate_cache") as invalidate:
+            await svc.facility_delete(1)
         db.facilities.delete.assert_called_once()
+        db.rooms_facilities.remove_facility.assert_awaited_once_with(1)
+        db.hotel_summary.refresh_with_facility.assert_awaited_once_with(1)
         db.commit.assert_called_once()
+        tags = invalidate.await_args.args
+        assert set(tags) == {"facilities", "search", "room:3", "room:4", "hotel:1"}
 
     async def test_get_facilities_pagination(self):
         db = _make_db()
@@ -242,28 +459,45 @@ class TestHotelService:
 
         result = await svc.add_hotel(HotelAdd(title="New Hotel", city="Moscow"))
         assert result is mock_hotel
+        db.hotel_summary.refresh.assert_awaited_once_with(1)
+        db.popular_locations.adjust_hotels.assert_awaited_once_with("Moscow", 1)
         db.commit.assert_called_once()
 
     async def test_delete_hotel_with_rooms(self):
         db = _make_db()
         db.hotels.get_one.return_value = MagicMock(id=1)
-        db.rooms.count_by_hotel.return_value = 5
+        db.hotel_summary.rooms_count.return_value = 5
         svc = self._make_service(db)
 
         with pytest.raises(CannotDeleteHotelWithRoomsException):
             await svc.delete_hotel(1)
+        db.rooms.count_by_hotel.assert_not_called()
 
     @patch("src.services.hotels.get_es_client", return_value=None)
     async def test_delete_hotel_success(self, _):
         db = _make_db()
         db.hotels.get_one.return_value = MagicMock(id=1)
-        db.rooms.count_by_hotel.return_value = 0
+        db.hotel_summary.rooms_count.return_value = 0
         svc = self._make_service(db)
 
         await svc.delete_hotel(1)
+        db.rooms.count_by_hotel.assert_not_called()
         db.hotels.delete.assert_called_once()
+        db.popular_locations.adjust_hotels.assert_awaited_once_with(
+            db.hotels.get_one.return_value.city, -1
+        )
         db.commit.assert_called_once()
 
+    async def test_delete_hotel_without_summary_counts_rooms(self):
+        db = _make_db()
+        db.hotels.get_one.return_value = MagicMock(id=1)
+        db.rooms.count_by_hotel.return_value = 2
+        svc = self._make_service(db)
+
+        with pytest.raises(CannotDeleteHotelWithRoomsException):
+            await svc.delete_hotel(1)
+        db.rooms.count_by_hotel.assert_awaited_once_with(1)
+
     @patch("src.services.hotels.get_es_client", return_value=None)
     async def test_autocomplete_no_es(self, _):
         db = _make_db()
@@ -299,9 +533,65 @@ class TestHotelService:
         await svc.autocomplete_combined("test")
         db.hotels.get_autocomplete_combined.assert_called_once()
 
+    @patch("src.services.hotels.get_es_client")
+    @patch("src.services.hotels.es_hotels")
+    async def test_get_filtered_by_time_search_via_es(self, mock_es_hotels, mock_get_client):
+        mock_get_client.return_value = AsyncMock()
+        mock_es_hotels.search_ids = AsyncMock(return_value=[7, 3])
+        db = _make_db()
+        db.hotels.get_filtered_by_time.return_value = [MagicMock(), MagicMock()]
+        db.hotels.count_filtered_by_time.return_value = 2
+        svc = self._make_service(db)
+
+        pagination = MagicMock(page=1, per_page=10, cursor=None, count="exact")
+        await svc.get_filtered_by_time(
+            pagination, city=None, title=None, date_from=None, date_to=None, search="Москва"
+        )
+        kwargs = db.hotels.get_filtered_by_time.call_args.kwargs
+        assert kwargs["ids"] == [7, 3]
+        assert "search" not in kwargs
+        assert db.hotels.count_filtered_by_time.call_args.kwargs["ids"] == [7, 3]
+
+    @patch("src.services.hotels.get_es_client")
+    @patch("src.services.hotels.es_hotels")
+    async def test_get_filtered_by_time_es_fallback(self, mock_es_hotels, mock_get_client):
+        mock_get_client.return_value = AsyncMock()
+        mock_es_hotels.search_ids = AsyncMock(side_effect=Exception("ES down"))
+        db = _make_db()
+        db.hotels.get_filtered_by_time.return_value = []
+        db.hotels.count_filtered_by_time.return_value = 0
+        svc = self._make_service(db)
+
+        pagination = MagicMock(page=1, per_page=10, cursor=None, count="exact")
+        await svc.get_filtered_by_time(
+            pagination, city=None, title=None, date_from=None, date_to=None, search="Москва"
+        )
+        kwargs = db.hotels.get_filtered_by_time.call_args.kwargs
+        assert kwargs["search"] == "Москва"
+        assert "ids" not in kwargs
+
+    @patch("src.services.hotels.get_es_client")
+    @patch("src.services.hotels.es_hotels")
+    async def test_get_filtered_by_time_es_over_cap_uses_pg(self, mock_es_hotels, mock_get_client):
+        mock_get_client.return_value = AsyncMock()
+        # Совпадений больше ES_SEARCH_MAX_HITS — список ES был бы обрезан
+        mock_es_hotels.search_ids = AsyncMock(return_value=None)
+        db = _make_db()
+        db.hotels.get_filtered_by_time.return_value = []
+        db.hotels.count_filtered_by_time.return_value = 0
+        svc = self._make_service(db)
+
+        pagination = MagicMock(page=1, per_page=10, cursor=None, count="exact")
+        await svc.get_filtered_by_time(
+            pagination, city="Москва", title=None, date_from=None, date_to=None
+        )
+        kwargs = db.hotels.get_filtered_by_time.call_args.kwargs
+        assert kwargs["city"] == "Москва"
+        assert "ids" not in kwargs
+
     async def test_popular_locations(self):
         db = _make_db()
-        db.hotels.get_popular_locations.return_value = ["Moscow", "SPB"]
+        db.popular_locations.get_top.return_value = ["Moscow", "SPB"]
         svc = self._make_service(db)
 
         result = await svc.popular_locations(limit=5)
@@ -528,6 +818,7 @@ class TestImagesService:
         assert result.width == 100
         assert result.height == 80
         db.hotel_images.add.assert_called_once()
+        db.hotel_summary.refresh.assert_awaited_once_with(1)
         db.commit.assert_called_once()
         mock_resize.delay.assert_called_once()
 
@@ -766,6 +1057,17 @@ class TestRoomServiceCRUD:
         assert result.total == 3
         assert result.pages == 1
 
+    async def test_get_filtered_by_time_facilities(self):
+        db = _make_db()
+        db.hotels.get_one.return_value = MagicMock(id=1)
+        db.rooms.get_filtered_by_time.return_value = [MagicMock(id=4)]
+        svc = self._make_service(db)
+
+        await svc.get_filtered_by_time(
+            hotel_id=1, date_from=None, date_to=None, cursor="", facilities="4,1"
+        )
+        assert db.rooms.get_filtered_by_time.call_args.kwargs["facility_ids"] == [1, 4]
+
     async def test_get_room_success(self):
         db = _make_db()
         db.hotels.get_one.return_value = MagicMock(id=1)
@@ -793,7 +1095,8 @@ class TestRoomServiceCRUD:
         )
         result = await svc.create_room(hotel_id=1, room_data=data)
         assert result is mock_room_rels
-        db.rooms_facilities.add_bulk.assert_called_once()
+        db.rooms_facilities.set_room_facilities.assert_awaited_once_with(1, facilities_ids=[10])
+        db.hotel_summary.refresh.assert_awaited_once_with(1)
         db.commit.assert_called_once()
 
     async def test_create_room_no_facilities(self):
@@ -810,7 +1113,7 @@ class TestRoomServiceCRUD:
             title="Room 1", description="Desc", price=1000, quantity=2, facilities_ids=[]
         )
         await svc.create_room(hotel_id=1, room_data=data)
-        db.rooms_facilities.add_bulk.assert_not_called()
+        db.rooms_facilities.set_room_facilities.assert_not_called()
 
     async def test_room_put_update_success(self):
         from src.schemas.rooms import RoomAddRequest
@@ -890,6 +1193,39 @@ class TestRoomServiceCRUD:
         with pytest.raises(ObjectNotFoundException):
             await svc.room_patch_update(hotel_id=1, room_id=5, room_data=data)
 
+    async def test_get_calendar_groups_nights_by_room(self):
+        db = _make_db()
+        db.rooms.get_calendar.return_value = [
+            {"room_id": 1, "night": date(2026, 5, 1), "available": 2, "price": 1000},
+            {"room_id": 1, "night": date(2026, 5, 2), "available": 0, "price": 1000},
+            {"room_id": 2, "night": date(2026, 5, 1), "available": 1, "price": 3000},
+        ]
+        svc = self._make_service(db)
+
+        result = await svc.get_calendar(hotel_id=1, date_from=date(2026, 5, 1), days=2)
+
+        assert [c.room_id for c in result] == [1, 2]
+        assert [d.available for d in result[0].days] == [2, 0]
+        db.hotels.get_one.assert_not_called()
+
+    async def test_get_calendar_room_not_found(self):
+        db = _make_db()
+        db.rooms.get_calendar.return_value = []
+        db.hotels.get_one.return_value = MagicMock(id=1)
+        svc = self._make_service(db)
+
+        with pytest.raises(RoomNotFoundException):
+            await svc.get_calendar(hotel_id=1, date_from=None, days=30, room_id=999)
+
+    async def test_get_calendar_hotel_not_found(self):
+        db = _make_db()
+        db.rooms.get_calendar.return_value = []
+        db.hotels.get_one.side_effect = ObjectNotFoundException()
+        svc = self._make_service(db)
+
+        with pytest.raises(HotelNotFoundException):
+            await svc.get_calendar(hotel_id=999, date_from=None, days=30)
+
 
 # ─── HotelService (put / patch / es_index / es_remove) ──────────────────────
 
@@ -912,6 +1248,7 @@ class TestHotelServiceCRUD:
         result = await svc.hotel_put_update(1, HotelAdd(title="Updated", city="SPB"))
         assert result is mock_hotel
         db.hotels.edit.assert_called_once()
+        db.popular_locations.adjust_hotels.assert_not_called()  # город не менялся
         db.commit.assert_called_once()
 
     @patch("src.services.hotels.get_es_client", return_value=None)
@@ -926,8 +1263,25 @@ class TestHotelServiceCRUD:
         result = await svc.hotel_patch_update(1, HotelPatch(title="Patched"), exclude_unset=True)
         assert result is mock_hotel
         db.hotels.edit.assert_called_once()
+        db.popular_locations.adjust_hotels.assert_not_called()
         db.commit.assert_called_once()
 
+    @patch("src.services.hotels.get_es_client", return_value=None)
+    async def test_hotel_patch_city_moves_popular_location(self, _):
+        from unittest.mock import call
+
+        from src.schemas.hotels import HotelPatch
+
+        db = _make_db()
+        db.hotels.get_one.return_value = MagicMock(id=1, title="H", city="Moscow", address=None)
+        svc = self._make_service(db)
+
+        await svc.hotel_patch_update(1, HotelPatch(city="Сочи"), exclude_unset=True)
+        assert db.popular_locations.adjust_hotels.await_args_list == [
+            call("Moscow", -1),
+            call("Сочи", 1),
+        ]
+
     @patch("src.services.hotels.es_hotels")
     @patch("src.services.hotels.get_es_client")
     async def test_es_index_success(self, mock_get_client, mock_es_hotels):
@@ -999,13 +1353,222 @@ class TestHotelServiceCRUD:
         db.hotels.count_filtered_by_time.return_value = 15
         svc = self._make_service(db)
 
-        pagination = MagicMock(page=1, per_page=5)
+        pagination = MagicMock(page=1, per_page=5, cursor=None, count="exact")
         result = await svc.get_filtered_by_time(
             pagination, city="Moscow", title=None, date_from=None, date_to=None
         )
         assert result.total == 15
         assert result.pages == 3
 
+    async def test_get_filtered_by_time_window_count_by_default(self):
+        db = _make_db()
+        db.hotels.get_filtered_by_time.return_value = ([MagicMock()] * 5, 15)
+        svc = self._make_service(db)
+
+        pagination = MagicMock(page=1, per_page=5, cursor=None, count=None)
+        result = await svc.get_filtered_by_time(
+            pagination, city=None, title=None, date_from=None, date_to=None
+        )
+        assert db.hotels.get_filtered_by_time.call_args.kwargs["with_total"] is True
+        db.hotels.count_filtered_by_time.assert_not_called()
+        assert result.total == 15
+        assert result.pages == 3
+
+    async def test_get_filtered_by_time_window_past_last_page(self):
+        db = _make_db()
+        db.hotels.get_filtered_by_time.return_value = ([], None)
+        db.hotels.count_filtered_by_time.return_value = 7
+        svc = self._make_service(db)
+
+        pagination = MagicMock(page=9, per_page=5, cursor=None, count="window")
+        result = await svc.get_filtered_by_time(
+            pagination, city=None, title=None, date_from=None, date_to=None
+        )
+        assert db.hotels.count_filtered_by_time.call_args.kwargs["strategy"] == "exact"
+        assert result.total == 7
+        assert result.items == []
+
+    async def test_get_filtered_by_time_capped_count(self):
+        db = _make_db()
+        db.hotels.get_filtered_by_time.return_value = [MagicMock()] * 5
+        db.hotels.count_filtered_by_time.return_value = 1001
+        svc = self._make_service(db)
+
+        pagination = MagicMock(page=1, per_page=5, cursor=None, count="capped")
+        result = await svc.get_filtered_by_time(
+            pagination, city=None, title=None, date_from=None, date_to=None
+        )
+        assert result.total == 1000
+        assert result.total_is_exact is False
+        assert result.has_next is True
+
+    async def test_get_filtered_by_time_cursor_skips_count(self):
+        from src.schemas.common import decode_cursor
+
+        db = _make_db()
+        db.hotels.get_filtered_by_time.return_value = [
+            MagicMock(id=i, title=f"Hotel {i}") for i in range(1, 7)
+        ]
+        svc = self._make_service(db)
+
+        pagination = MagicMock(page=1, per_page=5, cursor="")
+        result = await svc.get_filtered_by_time(
+            pagination, city=None, title=None, date_from=None, date_to=None, sort_by="title"
+        )
+        db.hotels.count_filtered_by_time.assert_not_called()
+        kwargs = db.hotels.get_filtered_by_time.call_args.kwargs
+        assert kwargs["limit"] == 6
+        assert kwargs["after"] is None
+        assert len(result.items) == 5
+        assert decode_cursor(result.next_cursor, "title", "asc") == ["Hotel 5", 5]
+
+    async def test_get_filtered_by_time_sort_by_price(self):
+        db = _make_db()
+        db.hotels.get_filtered_by_time.return_value = ([MagicMock()], 1)
+        svc = self._make_service(db)
+
+        pagination = MagicMock(page=1, per_page=10, cursor=None, count=None)
+        await svc.get_filtered_by_time(
+            pagination,
+            city=None,
+            title=None,
+            date_from=None,
+            date_to=None,
+            sort_by="price",
+            price_max=5000,
+            capacity=3,
+        )
+        kwargs = db.hotels.get_filtered_by_time.call_args.kwargs
+        assert kwargs["sort_by"] == "min_price"
+        # Отели без номеров (без цены) в сортировке по цене не участвуют
+        assert kwargs["price_min"] == 0
+        assert kwargs["price_max"] == 5000
+        assert kwargs["capacity"] == 3
+
+    async def test_get_filtered_by_time_price_cursor(self):
+        from src.schemas.common import decode_cursor
+
+        db = _make_db()
+        db.hotels.get_filtered_by_time.return_value = [
+            MagicMock(id=i, min_price=1000 * i) for i in range(1, 4)
+        ]
+        svc = self._make_service(db)
+
+        pagination = MagicMock(page=1, per_page=2, cursor="")
+        result = await svc.get_filtered_by_time(
+            pagination, city=None, title=None, date_from=None, date_to=None, sort_by="price"
+        )
+        assert decode_cursor(result.next_cursor, "min_price", "asc") == [2000, 2]
+
+    @patch("src.services.hotels.settings")
+    async def test_get_filtered_by_time_near_sorts_by_distance(self, mock_settings):
+        mock_settings.GEO_DEFAULT_RADIUS_KM = 50
+        db = _make_db()
+        db.hotels.get_filtered_by_time.return_value = ([MagicMock()], 1)
+        svc = self._make_service(db)
+
+        pagination = MagicMock(page=1, per_page=10, cursor=None, count=None)
+        await svc.get_filtered_by_time(
+            pagination,
+            city=None,
+            title=None,
+            date_from=None,
+            date_to=None,
+            sort_by=None,
+            near="43.58,39.72",
+        )
+        kwargs = db.hotels.get_filtered_by_time.call_args.kwargs
+        assert kwargs["sort_by"] == "distance_km"
+        assert kwargs["near"] == (43.58, 39.72)
+        assert kwargs["radius_km"] == 50
+
+    async def test_get_facets_uses_list_filters(self):
+        db = _make_db()
+        svc = self._make_service(db)
+
+        result = await svc.get_facets(
+            city="Сочи", title=None, date_from=None, date_to=None, guests=2, price_max=5000
+        )
+        assert result is db.hotels.get_facets.return_value
+        kwargs = db.hotels.get_facets.call_args.kwargs
+        assert kwargs["city"] == "Сочи"
+        assert kwargs["guests"] == 2
+        assert kwargs["price_max"] == 5000
+        assert kwargs["near"] is None
+
+    async def test_get_filtered_by_time_facilities(self):
+        from src.exceptions import InvalidFacilityIdsException
+
+        db = _make_db()
+        db.hotels.get_filtered_by_time.return_value = ([MagicMock()], 1)
+        svc = self._make_service(db)
+
+        pagination = MagicMock(page=1, per_page=10, cursor=None, count=None)
+        await svc.get_filtered_by_time(
+            pagination, city=None, title=None, date_from=None, date_to=None, facilities="7,1,7"
+        )
+        assert db.hotels.get_filtered_by_time.call_args.kwargs["facility_ids"] == [1, 7]
+
+        with pytest.raises(InvalidFacilityIdsException):
+            await svc.get_filtered_by_time(
+                pagination, city=None, title=None, date_from=None, date_to=None, facilities="1,x"
+            )
+
+    async def test_get_filtered_by_time_invalid_near(self):
+        from src.exceptions import InvalidGeoPointException
+
+        svc = self._make_service(_make_db())
+        pagination = MagicMock(page=1, per_page=5, cursor=None, count=None)
+        with pytest.raises(InvalidGeoPointException):
+            await svc.get_filtered_by_time(
+                pagination, city=None, title=None, date_from=None, date_to=None, near="x,y"
+            )
+
+    async def test_get_filtered_by_time_distance_requires_near(self):
+        from src.exceptions import GeoPointRequiredException
+
+        svc = self._make_service(_make_db())
+        pagination = MagicMock(page=1, per_page=5, cursor=None, count=None)
+        with pytest.raises(GeoPointRequiredException):
+            await svc.get_filtered_by_time(
+                pagination,
+                city=None,
+                title=None,
+                date_from=None,
+                date_to=None,
+                sort_by="distance",
+            )
+
+    @patch("src.services.hotels.geocode_hotel")
+    @patch("src.services.hotels.settings")
+    @patch("src.services.hotels.get_es_client", return_value=None)
+    async def test_add_hotel_without_coordinates_schedules_geocode(
+        self, _, mock_settings, mock_geocode
+    ):
+        from src.schemas.hotels import HotelAdd
+
+        mock_settings.GEOCODER_URL = "http://geo/search"
+        db = _make_db()
+        db.hotels.add.return_value = MagicMock(id=7, title="H", city="Сочи", address=None)
+        svc = self._make_service(db)
+
+        await svc.add_hotel(HotelAdd(title="H", city="Сочи"))
+        mock_geocode.delay.assert_called_once_with(7)
+
+        mock_geocode.reset_mock()
+        await svc.add_hotel(HotelAdd(title="H", city="Сочи", latitude=43.58, longitude=39.72))
+        mock_geocode.delay.assert_not_called()
+
+    async def test_get_filtered_by_time_invalid_cursor(self):
+        from src.exceptions import InvalidCursorException
+
+        svc = self._make_service(_make_db())
+        pagination = MagicMock(page=1, per_page=5, cursor="not-a-cursor")
+        with pytest.raises(InvalidCursorException):
+            await svc.get_filtered_by_time(
+                pagination, city=None, title=None, date_from=None, date_to=None
+            )
+
 
 # ─── BookingService (patch success) ─────────────────────────────────────────
 
@@ -1023,22 +1586,37 @@ class TestBookingServicePatch:
         mock_booking = MagicMock(
             id=1, room_id=10, date_from=date(2027, 5, 1), date_to=date(2027, 5, 10)
         )
-        db.bookings.get_one_or_none.return_value = mock_booking
-        mock_room = MagicMock(id=10, hotel_id=20, price=5000)
-        db.rooms.get_one.return_value = mock_room
-        mock_hotel = MagicMock(id=20)
-        db.hotels.get_one.return_value = mock_hotel
-        mock_new_booking = MagicMock(id=2)
-        db.bookings.add_booking.return_value = mock_new_booking
+        db.bookings.get_for_update.return_value = mock_booking
+        mock_updated = MagicMock(id=1)
+        db.bookings.change_dates.return_value = (mock_updated, 20)
         svc = self._make_service(db)
 
-        result = await svc.patch_booking(
-            user_id=1, booking_id=1, data=BookingPatchRequest(date_to=date(2027, 5, 8))
+        with patch("src.services.bookings.invalidate_hotel_availability") as invalidate:
+            result = await svc.patch_booking(
+                user_id=1, booking_id=1, data=BookingPatchRequest(date_to=date(2027, 5, 8))
+            )
+        assert result is mock_updated
+        db.bookings.change_dates.assert_called_once_with(
+            mock_booking, date(2027, 5, 1), date(2027, 5, 8)
         )
-        assert result is mock_new_booking
-        db.bookings.delete.assert_called_once()
-        db.bookings.add_booking.assert_called_once()
+        db.bookings.delete.assert_not_called()
+        db.bookings.add_booking.assert_not_called()
         db.commit.assert_called_once()
+        invalidate.assert_awaited_once_with(20)
+
+    async def test_patch_booking_unavailable_does_not_commit(self):
+        from src.schemas.bookings import BookingPatchRequest
+
+        db = _make_db()
+        db.bookings.get_for_update.return_value = MagicMock(
+            id=1, room_id=10, date_from=date(2027, 5, 1), date_to=date(2027, 5, 5)
+        )
+        db.bookings.change_dates.side_effect = AllRoomsAreBookedException()
+        svc = self._make_service(db)
+
+        with pytest.raises(AllRoomsAreBookedException):
+            await svc.patch_booking(1, 1, BookingPatchRequest(date_to=date(2027, 5, 7)))
+        db.commit.assert_not_called()
 
     async def test_get_booking_success(self):
         db = _make_db()
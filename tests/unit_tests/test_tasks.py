@@ -241,6 +241,86 @@ async def test_get_bookings_and_notify():
     assert mock_task.delay.call_count == 2
 
 
+async def test_verify_room_inventory_reports_mismatches():
+    from datetime import date
+    from unittest.mock import AsyncMock
+
+    from src.tasks.inventory import _verify_room_inventory
+
+    mismatch = {"room_id": 1, "night": date(2026, 5, 1), "expected": 2, "actual": 1}
+    mock_db_inner = AsyncMock()
+    mock_db_inner.room_inventory.find_mismatches.return_value = [mismatch]
+
+    mock_ctx = AsyncMock()
+    mock_ctx.__aenter__.return_value = mock_db_inner
+
+    with patch("src.tasks.inventory.DBManager", return_value=mock_ctx):
+        result = await _verify_room_inventory()
+
+    assert result == [mismatch]
+
+
+async def test_verify_room_inventory_window():
+    from unittest.mock import AsyncMock
+
+    from src.tasks.inventory import _verify_room_inventory
+
+    mock_db_inner = AsyncMock()
+    mock_db_inner.room_inventory.find_mismatches.return_value = []
+
+    mock_ctx = AsyncMock()
+    mock_ctx.__aenter__.return_value = mock_db_inner
+
+    with patch("src.tasks.inventory.DBManager", return_value=mock_ctx):
+        await _verify_room_inventory(days=30)
+
+    kwargs = mock_db_inner.room_inventory.find_mismatches.call_args.kwargs
+    assert (kwargs["date_to"] - kwargs["date_from"]).days == 30
+
+
+async def test_rebuild_room_inventory_commits():
+    from unittest.mock import AsyncMock
+
+    from src.tasks.inventory import _rebuild_room_inventory
+
+    mock_db_inner = AsyncMock()
+    mock_db_inner.room_inventory.rebuild.return_value = 30
+    mock_db_inner.rooms.get_hotel_ids.return_value = [1, 2]
+
+    mock_ctx = AsyncMock()
+    mock_ctx.__aenter__.return_value = mock_db_inner
+
+    with (
+        patch("src.tasks.inventory.DBManager", return_value=mock_ctx),
+        patch("src.tasks.inventory.invalidate_cache_from_task", AsyncMock()) as invalidate,
+    ):
+        assert await _rebuild_room_inventory() == 30
+
+    mock_db_inner.commit.assert_called_once()
+    invalidate.assert_awaited_once_with("calendar:1", "calendar:2", "availability")
+
+
+async def test_release_expired_holds_commits():
+    from unittest.mock import AsyncMock
+
+    from src.tasks.inventory import _release_expired_holds
+
+    mock_db_inner = AsyncMock()
+    mock_db_inner.booking_holds.release_expired.return_value = [3, 3]
+
+    mock_ctx = AsyncMock()
+    mock_ctx.__aenter__.return_value = mock_db_inner
+
+    with (
+        patch("src.tasks.inventory.DBManager", return_value=mock_ctx),
+        patch("src.tasks.inventory.invalidate_cache_from_task", AsyncMock()) as invalidate,
+    ):
+        assert await _release_expired_holds() == 2
+
+    mock_db_inner.commit.assert_called_once()
+    invalidate.assert_awaited_once_with("calendar:3", "availability")
+
+
 def test_send_confirmation_email_no_smtp():
     """Если SMTP_HOST не задан — просто логирует и возвращает без ошибки."""
     with patch("src.config.settings") as mock_settings:
@@ -339,3 +419,106 @@ async def test_get_bookings_and_notify_error_logged():
     ):
         mock_task.delay.side_effect = Exception("Celery down")
         await _get_bookings_and_notify()  # should not raise
+
+
+async def test_refresh_popular_locations_commits():
+    from unittest.mock import AsyncMock
+
+    from src.config import settings
+    from src.tasks.locations import _refresh_popular_locations
+
+    mock_db_inner = AsyncMock()
+    mock_db_inner.popular_locations.rebuild.return_value = 12
+
+    mock_ctx = AsyncMock()
+    mock_ctx.__aenter__.return_value = mock_db_inner
+
+    with patch("src.tasks.locations.DBManager", return_value=mock_ctx):
+        assert await _refresh_popular_locations() == 12
+
+    mock_db_inner.popular_locations.rebuild.assert_awaited_once_with(
+        settings.POPULAR_LOCATIONS_BOOKINGS_DAYS
+    )
+    mock_db_inner.commit.assert_called_once()
+
+
+async def test_backfill_hotel_coordinates_saves_found_points():
+    from unittest.mock import AsyncMock
+
+    from src.tasks.geo import _backfill_hotel_coordinates
+
+    batches = [[MagicMock(id=1, city="Сочи", address=None), MagicMock(id=2, city="?")], []]
+    mock_db_inner = AsyncMock()
+    mock_db_inner.hotels.get_without_coordinates.side_effect = batches
+
+    mock_ctx = AsyncMock()
+    mock_ctx.__aenter__.return_value = mock_db_inner
+
+    with (
+        patch("src.tasks.geo.DBManager", return_value=mock_ctx),
+        patch("src.tasks.geo.geocode", AsyncMock(side_effect=[(43.58, 39.72), None])),
+        patch("src.tasks.geo.asyncio.sleep", AsyncMock()),
+        patch("src.tasks.geo.invalidate_cache_from_task", AsyncMock()) as invalidate,
+    ):
+        assert await _backfill_hotel_coordinates(batch_size=2) == 1
+
+    assert mock_db_inner.hotels.get_without_coordinates.await_args_list[1].args == (2, 2)
+    mock_db_inner.hotels.edit.assert_awaited_once()
+    assert mock_db_inner.hotels.edit.await_args.kwargs == {"id": 1}
+    mock_db_inner.commit.assert_called_once()
+    invalidate.assert_awaited_once_with("search", "hotel:1")
+
+
+def test_upcoming_weekends_start_from_this_friday():
+    from datetime import date
+
+    from src.tasks.cache import upcoming_weekends
+
+    assert upcoming_weekends(2, today=date(2026, 10, 14)) == [
+        (date(2026, 10, 16), date(2026, 10, 18)),
+        (date(2026, 10, 23), date(2026, 10, 25)),
+    ]
+    # В субботу эти выходные уже идут — начинаем со следующих
+    assert upcoming_weekends(1, today=date(2026, 10, 17))[0][0] == date(2026, 10, 23)
+
+
+async def test_warm_cache_refreshes_hot_requests():
+    from unittest.mock import AsyncMock
+
+    from src.api.hotels import get_hotels
+    from src.tasks.cache import warm_cache
+
+    mock_db_inner = AsyncMock()
+    mock_db_inner.popular_locations.get_top.return_value = ["Сочи", "Казань"]
+
+    mock_ctx = AsyncMock()
+    mock_ctx.__aenter__.return_value = mock_db_inner
+
+    refresh = AsyncMock(side_effect=[None, ConnectionError()] + [None] * 10)
+    with (
+        patch("src.tasks.cache.DBManager", return_value=mock_ctx),
+        patch("src.tasks.cache.refresh_cached", refresh),
+        patch("src.tasks.cache.settings.CACHE_WARM_WEEKENDS", 2),
+    ):
+        assert await warm_cache() == 6  # 3 общих + 2 города × 2 выходных, один упал
+
+    assert refresh.await_count == 7
+    city_calls = [c for c in refresh.await_args_list if c.kwargs.get("city")]
+    assert {c.kwargs["city"] for c in city_calls} == {"Сочи", "Казань"}
+    assert all(c.args == (get_hotels,) and c.kwargs["date_from"] for c in city_calls)
+
+
+async def test_warm_cache_on_startup_skips_when_lock_taken():
+    from unittest.mock import AsyncMock
+
+    from src.tasks.cache import warm_cache_on_startup
+
+    redis = MagicMock(set=AsyncMock(return_value=None))
+    with (
+        patch("src.tasks.cache.redis_manager", MagicMock(redis=redis)),
+        patch("src.tasks.cache.warm_cache", AsyncMock()) as warm,
+    ):
+        await warm_cache_on_startup()
+
+    assert redis.set.await_args.args[0] == "fastapi-cache:warmup"
+    warm.assert_not_awaited()